@@ -1,28 +1,13 @@
 # main driver tying everything together
-from PyQt6 import QtWidgets
+from message import show_error
 import re
-from dict import line_edit_dict, condition_dict, condition_memory_dict, twos_complement_to_signed
+from collections import namedtuple
+from enum import IntEnum
+from cpu import cpu_state, register_index_dict, register_names, MASK_32
+from guest_memory import guest_memory
+from mnemonic import (parse_mnemonic, DATA_PROCESSING, TEST, SINGLE_DATA_TRANSFER, MULTIPLY, SATURATE, REVERSE,
+                      BRANCH, STACKED)
 import dict
-from encoder import Encoder
-from decoder import Decoder
-
-# core instructions
-VALID_COMMAND_REGEX = re.compile(r"(MOV|LSR|LSL|AND|BIC|ORR|ORN|EOR|ADD|ADC|SUB|SBC|RSB)", re.IGNORECASE)
-VALID_COMMAND_REGEX_BIT_OP_SPECIAL = re.compile(r"(AND|BIC|ORR|ORN|EOR)", re.IGNORECASE)
-VALID_COMMAND_REGEX_ARITHMETIC_ADD_SUB = re.compile(r"(ADD|ADC|SUB|SBC|RSB)", re.IGNORECASE)
-VALID_COMMAND_REGEX_BIT_OP = re.compile(r"(MOV|AND|BIC|ORR|ORN|EOR)", re.IGNORECASE)
-VALID_COMMAND_REGEX_TEST = re.compile(r"(CMP|CMN|TST|TEQ)", re.IGNORECASE)
-VALID_COMMAND_SINGLE_DATA_TRANFER = re.compile(r"(LDR|STR|LDRB|STRB)", re.IGNORECASE)
-VALID_COMMAND_REGEX_MULTI = re.compile(r"(MUL|MLA|MLS|DIV)", re.IGNORECASE)
-VALID_COMMAND_BRANCH = re.compile(r"(B|BL)", re.IGNORECASE)
-VALID_COMMAND_STACKED = re.compile(r"(POP|PUSH)", re.IGNORECASE)
-VALID_COMMAND_SATURATE = re.compile(r"(SSAT|USAT)", re.IGNORECASE)
-VALID_COMMAND_REVERSE = re.compile(r"(REV|RBIT)", re.IGNORECASE)
-
-# supporting condition flags, shifts, and operand formats
-CONDITIONAL_MODIFIER_REGEX = re.compile(r"(EQ|NE|GE|LT|GT|LE|AL)", re.IGNORECASE)
-SHIFT_REGEX = re.compile(r"(LSL|LSR)", re.IGNORECASE)
-FLAG_REGEX = re.compile(r"S", re.IGNORECASE)
 
 # operand matchers
 regex_register = re.compile(r"r\d+$|lr", re.IGNORECASE)
@@ -46,1325 +31,812 @@ def split_and_filter(line):
     return final_parts
 # print(split_and_filter("MOV r0, #1, S"))  # ['MOV', 'r0', '#1', 'S']
 
-def check_branch(self, line, address, lines):
-    flag_B = None
-    mapping = {key: value for key, value in zip(address, lines)}
-    mappping_address = {key: value for key, value in zip(lines, address)}
-    condition = "al"
-    parts = split_and_filter(line)
-    if parts == None or (not len(parts) == 2):
-        return None, flag_B
-    instruction = parts[0]
-    match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-    if match_condition:
-        condition = match_condition.group(0)
-        c = dict.check_condition(condition)
-        instruction = re.sub(condition, "", instruction)
-    elif not match_condition:
-        c = dict.check_condition(condition)
-    if VALID_COMMAND_BRANCH.match(instruction):
-        flag_B = 1
-        if instruction.lower() == "bx":
-            if regex_register.match(parts[1]):
-                line_str = line_edit_dict.get(parts[1])
-                bit_str = line_str.text()
-                bit_int = dict.twos_complement_to_signed(bit_str)
-                hex_string = format(bit_int, '08x')
-                label = mapping.get(hex_string)
-                return label, flag_B
-            else:
-                return None, None
-        if instruction.lower() == "bl":
-            address_branch_link = mappping_address.get(line)
-            int_address_branch_link = dict.twos_complement_to_signed(address_branch_link)
-            int_address_branch_link = int_address_branch_link + 4
-            str_address_branch_link = format(int_address_branch_link, '08x')
-            lr = line_edit_dict.get("lr")
-            lr.setText(str_address_branch_link)
-        if not c:
-            return None, flag_B
-        return parts[1], flag_B
-    else:
-        return None, flag_B
-
-# check_stacked analyze ARM push/pop instructions
-def check_stacked(self, line, address, lines, stacked):
-    mappping_address = {key: value for key, value in zip(address, lines)}
-    label_stacked = None
-    flag_stacked = None
-    reg_stacked = []
-    arguments_stacked = []
-    condition = "al"
-    parts = split_and_filter(line)
-    instruction = parts[0]
-    mems = parts[1:]
-    match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-    if match_condition:
-        condition = match_condition.group(0)
-        c = dict.check_condition(condition)
-        instruction = re.sub(condition, "", instruction)
-    elif not match_condition:
-        c = dict.check_condition(condition)
-    if VALID_COMMAND_STACKED.match(instruction):
-        sp_line = line_edit_dict.get("sp")
-        sp_hex_str = sp_line.text()
-        sp = dict.twos_complement_to_signed(sp_hex_str)
-        if instruction.lower() == "push":
-            flag_stacked = 1
-            if mems[0].startswith("{") and mems[-1].endswith("}"):
-                mems[0] = mems[0].strip('{')
-                mems[-1] = mems[-1].strip('}')
-                for mem in mems:
-                    if regex_register.match(mem):
-                        line_str = line_edit_dict.get(mem)
-                        bit_str = line_str.text()
-                        bit_int = dict.twos_complement_to_signed(bit_str)
-                        hex_string = format(bit_int, '08x')
-                        stacked.append(hex_string)
-                        sp -= 4
-                    else:
-                        return None, None, None, None
-            else:
-                return None, None, None, None
-        if instruction.lower() == "pop":
-            flag_stacked = 2
-            pop_list = []
-            if mems[0].startswith("{") and mems[-1].endswith("}"):
-                mems[0] = mems[0].strip('{')
-                mems[-1] = mems[-1].strip('}')
-                for mem in mems:
-                    if regex_register.match(mem) or mem.lower() == "pc":
-                        pop_list.append(mem)
-                    else:
-                        return None, None, None, None
-            else:
-                return None, None, None, None
-            if len(pop_list) <= len(stacked):
-                mapping = {key: value for key, value in zip(pop_list, stacked)}
-                if "pc" in pop_list:
-                    label_stacked = mappping_address.get(mapping.get("pc"))
-                    pop_list.remove("pc")
-                    sp += 4
-                for i in range(len(pop_list)):
-                    reg_stacked.append(pop_list[i])
-                    hex_str = mapping.get(pop_list[i])
-                    int_str = dict.twos_complement_to_signed(hex_str)
-                    bin_str = Encoder(int_str)
-                    arguments_stacked.append(bin_str)
-                    sp += 4
-            else:
-                flag_stacked = 3
-                return None, None, None, flag_stacked
-        if not c:
-            return None, None, None, None
-        sp_bin_str = Encoder(sp)
-        sp_dec = Decoder(sp_bin_str)
-        sp_hex_str = format(sp_dec, '08x')
-        sp_line = line_edit_dict.get('sp')
-        sp_line.setText(sp_hex_str)
-        sp_line.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-        return reg_stacked, arguments_stacked, label_stacked, flag_stacked
-    else:
-        return None, None, None, None
-
-def check_assembly_line(self, lines, line, address, memory, data_labels, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte, stacked):
-    reg = []
-    c = True
-    flag_N = flag_Z = flag_C = flag_V = "0"
-    flag_T = None
-    condition = "al"
-    label, flag_B = check_branch(self, line, address, lines)
-    reg_stacked, arguments_stacked, label_stacked, flag_stacked = check_stacked(self, line, address, lines, stacked)
-    if flag_stacked:
-        return reg_stacked, arguments_stacked, label_stacked, flag_stacked, flag_N, flag_Z, flag_C, flag_V, flag_T
-    parts = split_and_filter(line)
-    if parts == None:
-         return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-    if len(parts) < 3:
-        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    instruction = parts[0]
-    reg.append(parts[1])
-    mem = parts[2:]
-    arguments = []
-
-    if not regex_register.match(reg[0]):
-        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    if regex_register.match(reg[0]) and reg[0].lower() == "sp" or reg[0].lower() == "pc":
-        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    if len(mem) > 4:
-        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    match_instruction = re.search(VALID_COMMAND_REGEX, instruction)
-    match_instruction_test = re.search(VALID_COMMAND_REGEX_TEST, instruction)
-    match_instruction_single_data_tranfer = re.search(VALID_COMMAND_SINGLE_DATA_TRANFER, instruction)
-    match_instruction_multi = re.search(VALID_COMMAND_REGEX_MULTI, instruction)
-    match_instruction_saturate = re.search(VALID_COMMAND_SATURATE, instruction)
-    match_instruction_reverse = re.search(VALID_COMMAND_REVERSE, instruction)
-    if match_instruction:
-        instruction_clean = match_instruction.group(0)
-        instruction = re.sub(match_instruction.group(0), "", instruction)
-
-        match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-        if match_condition:
-            condition = match_condition.group(0)
-            c = dict.check_condition(condition)
-            instruction = re.sub(condition, "", instruction)
-        elif not match_condition:
-            c = dict.check_condition(condition)
-
-        match_flag = re.search(FLAG_REGEX, instruction)
-        flag = None
-        if match_flag:
-            instruction = instruction.lstrip(match_flag.group(0))
-            flag = 1
-        if not instruction:
-            temporary = []
-            if len(mem) == 1 and (VALID_COMMAND_REGEX_BIT_OP_SPECIAL.match(instruction_clean) or VALID_COMMAND_REGEX_ARITHMETIC_ADD_SUB.match(instruction_clean)):
-                mem.insert(0, reg[0])
-            for i in range(len(mem)):
-                item = mem[i]
-                if i == 0 and (regex_const.match(item) or regex_const_hex.match(item)) and not VALID_COMMAND_REGEX_BIT_OP.match(instruction_clean):
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                if regex_const.match(item):
-                    clean_num = item.lstrip('#')
-                    num = int(clean_num)
-                    num_string = Encoder(num)
-                    temporary.append(num_string)
-                elif regex_const_hex.match(item):
-                    clean_num = item.lstrip('#')
-                    num = dict.twos_complement_to_signed(clean_num)
-                    num_string = Encoder(num)
-                    temporary.append(num_string)
-                elif regex_register.match(item):
-                    line_edit = line_edit_dict.get(item)
-                    binary_str = line_edit.text()
-                    hex_int = dict.twos_complement_to_signed(binary_str)
-                    binary_str = Encoder(hex_int)
-                    if i + 1 < len(mem) and SHIFT_REGEX.match(mem[i + 1]) and not SHIFT_REGEX.match(instruction_clean):
-                        t = []
-                        if mem[i + 1].lower() == "rrx":
-                            num_rrx = condition_dict.get("c")
-                            num_str = num_rrx.text()
-                            t.append(binary_str)
-                            t.append(num_str)
-                            binary_str, _ = check_shift(t, mem[i + 1], line)
-                            temporary.append(binary_str[0])
-                            break
-                        elif not mem[i + 1].lower() == "rrx" and i + 2 < len(mem):
-                            if regex_const.match(mem[i + 2]):
-                                clean_num = mem[i + 2].lstrip('#')
-                                num = int(clean_num)
-                                num_str = Encoder(num)
-                                t.append(binary_str)
-                                t.append(num_str)
-                                binary_str, _ = check_shift(t, mem[i + 1], line)
-                                temporary.append(binary_str[0])
-                                break
-                            elif regex_register.match(mem[i + 2]):
-                                num_edit = line_edit_dict.get(mem[i + 2])
-                                num_str = num_edit.text()
-                                num = dict.twos_complement_to_signed(num_str)
-                                num_str = Encoder(num)
-                                t.append(binary_str)
-                                t.append(num_str)
-                                binary_str, _ = check_shift(t, mem[i + 1], line)
-                                temporary.append(binary_str[0])
-                                break
-                    binary_str = Decoder(binary_str)
-                    binary_str = Encoder(binary_str)
-                    temporary.append(binary_str)
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-            if flag == 1 and SHIFT_REGEX.match(instruction_clean):
-                arguments, flag_C = check_command_with_flag(temporary, instruction_clean, line)
-                result = arguments[0]
-                flag_N = result[0]
-                if Decoder(result) == 0: flag_Z = '1'
-            elif flag == 1 and VALID_COMMAND_REGEX_ARITHMETIC_ADD_SUB.match(instruction_clean):
-                arguments, flag_C, flag_V = check_command_with_flag(temporary, instruction_clean, line)
-                result = arguments[0]
-                flag_N = result[0]
-                if Decoder(result) == 0: flag_Z = '1'
-            elif flag == 1:
-                arguments = check_command(temporary, instruction_clean, line)
-                result = arguments[0]
-                flag_N = result[0]
-                if Decoder(result) == 0: flag_Z = '1'
-            else:
-                arguments = check_command(temporary, instruction_clean, line)
+# decoded instructions
+# show_code_view decodes every source line once, stepping then only reads the decoded records
+Opcode = IntEnum("Opcode", [
+    "MOV", "LSL", "LSR", "AND", "BIC", "ORR", "ORN", "EOR",
+    "ADD", "ADC", "SUB", "SBC", "RSB",
+    "CMP", "CMN", "TST", "TEQ",
+    "LDR", "LDRB", "LDRH", "STR", "STRB", "STRH",
+    "MUL", "MLA", "MLS", "UMULL", "SMULL", "UMLAL", "SMLAL", "UMLSL", "SMLSL", "UDIV", "SDIV",
+    "SSAT", "USAT", "REV", "RBIT",
+    "B", "BL", "BX", "PUSH", "POP",
+])
+
+LOAD_OPCODES = {Opcode.LDR, Opcode.LDRB, Opcode.LDRH}
+
+# data processing instructions that accept the short form "op rd, operand" (rd is also the first source)
+SHORT_FORM_INSTRUCTIONS = {"and", "bic", "orr", "orn", "eor", "add", "adc", "sub", "sbc", "rsb"}
+# data processing instructions whose first operand may be an immediate
+IMMEDIATE_FIRST_INSTRUCTIONS = {"mov", "and", "bic", "orr", "orn", "eor"}
+# multiply instructions writing a RdLo, RdHi register pair
+LONG_MULTIPLY_INSTRUCTIONS = {"umull", "smull", "umlal", "smlal", "umlsl", "smlsl"}
+
+# called as data_access_hook(address, size, write) before every data memory access when set
+data_access_hook = None
+
+# operand kinds
+OPERAND_REGISTER = 0
+OPERAND_IMMEDIATE = 1
+OPERAND_SHIFT_IMMEDIATE = 2
+OPERAND_SHIFT_REGISTER = 3
+
+# addressing modes of the single data transfer instructions
+ADDRESS_LITERAL = 0        # ldr r0, =label, the label holds a word in memory
+ADDRESS_LITERAL_VALUE = 1  # ldr r0, =label, the label is a single .word so its address is loaded
+ADDRESS_OFFSET = 2         # [r1], [r1, #4], [r1, r2], [r1, r2, lsl #2]
+ADDRESS_POST_INDEX = 3     # [r1], #4
+
+# value is a register index or an immediate, amount is the shift amount or the index of the shift register
+Operand = namedtuple("Operand", ["kind", "value", "shift", "amount"])
+
+# one decoded source line
+# registers holds the register indices written (or pushed/popped), target is the instruction index of a branch
+Instruction = namedtuple("Instruction", ["index", "address", "line", "opcode", "condition", "set_flags",
+                                         "registers", "operands", "target", "mode", "writeback", "immediate"])
+
+# returns the register index of an operand, or None if it is not a register
+def parse_register(item):
+    if regex_register.match(item):
+        return register_index_dict.get(item.lower())
+    return None
+# print(parse_register("lr"))  # output: 14
+
+# returns the value of a #decimal or #0xhex immediate as an unsigned 32-bit integer, or None
+def parse_immediate(item):
+    if regex_const.match(item):
+        return int(item.lstrip('#')) & MASK_32
+    if regex_const_hex.match(item):
+        return int(item.lstrip('#'), 16) & MASK_32
+    return None
+# print(parse_immediate("#-1"))  # output: 4294967295
+
+# decodes a list of register/immediate operands, a register may be followed by a LSL/LSR shift
+def decode_operands(mem, allow_shift):
+    operands = []
+    for i in range(len(mem)):
+        item = mem[i]
+        immediate = parse_immediate(item)
+        register = parse_register(item)
+        if immediate is not None:
+            operands.append(Operand(OPERAND_IMMEDIATE, immediate, None, None))
+        elif register is not None:
+            if allow_shift and i + 2 < len(mem) and mem[i + 1].lower() in ("lsl", "lsr"):
+                shift = mem[i + 1].lower()
+                if regex_const.match(mem[i + 2]):
+                    operands.append(Operand(OPERAND_SHIFT_IMMEDIATE, register, shift, int(mem[i + 2].lstrip('#'))))
+                    break
+                amount = parse_register(mem[i + 2])
+                if amount is not None:
+                    operands.append(Operand(OPERAND_SHIFT_REGISTER, register, shift, amount))
+                    break
+            operands.append(Operand(OPERAND_REGISTER, register, None, None))
+        else:
+            return None
+    return operands
+# print(decode_operands(["r1", "lsl", "#2"], True))  # output: [Operand(kind=2, value=1, shift='lsl', amount=2)]
 
-            if not c:
-                arguments.append(f"{0:032b}")
-                return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            if arguments == None:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
+# splits "op rd, operands..." into the destination register index and the remaining operands, or None
+def split_destination(parts):
+    if len(parts) < 3 or len(parts) > 6:
+        return None
+    rd = parse_register(parts[1])
+    if rd is None or rd == 15:
+        return None
+    return rd, parts[2:]
+
+# instruction class decoders
+# each one fills the Instruction fields of its class and returns an error message, or None when the line is valid
+def invalid_message(line):
+    return "Command in line " + "[" + line + "]" + " is invalid"
+
+def decode_branch(mnemonic, parts, fields, lines, labels, data_labels):
+    if len(parts) != 2:
+        return invalid_message(fields["line"])
+    if mnemonic.base == "bx":
+        register = parse_register(parts[1])
+        if register is None:
+            return invalid_message(fields["line"])
+        fields["opcode"], fields["registers"] = Opcode.BX, (register,)
+        return None
+    label = parts[1]
+    if label not in labels:
+        return "Label not found: " + label + " in line [" + fields["line"] + "] in program"
+    fields["target"] = labels[label]
+    fields["opcode"] = Opcode[mnemonic.base.upper()]
+    return None
+
+def decode_stacked(mnemonic, parts, fields, lines, labels, data_labels):
+    mems = parts[1:]
+    if not mems or not mems[0].startswith("{") or not mems[-1].endswith("}"):
+        return invalid_message(fields["line"])
+    mems[0] = mems[0].strip('{')
+    mems[-1] = mems[-1].strip('}')
+    registers = []
+    for mem in mems:
+        register = parse_register(mem)
+        if register is None and mnemonic.base == "pop" and mem.lower() == "pc":
+            register = 15
+        if register is None:
+            return invalid_message(fields["line"])
+        registers.append(register)
+    fields["opcode"], fields["registers"] = Opcode[mnemonic.base.upper()], tuple(registers)
+    return None
+
+def decode_data_processing(mnemonic, parts, fields, lines, labels, data_labels):
+    destination = split_destination(parts)
+    if destination == None:
+        return invalid_message(fields["line"])
+    rd, mem = destination
+    opcode = Opcode[mnemonic.base.upper()]
+    if len(mem) == 1 and mnemonic.base in SHORT_FORM_INSTRUCTIONS:
+        mem.insert(0, register_names[rd])
+    if parse_immediate(mem[0]) is not None and mnemonic.base not in IMMEDIATE_FIRST_INSTRUCTIONS:
+        return invalid_message(fields["line"])
+    operands = decode_operands(mem, opcode not in (Opcode.LSL, Opcode.LSR))
+    if operands == None:
+        return invalid_message(fields["line"])
+    if opcode == Opcode.MOV and len(operands) != 1:
+        return invalid_message(fields["line"])
+    if opcode in (Opcode.ADD, Opcode.ADC, Opcode.SUB, Opcode.SBC, Opcode.RSB) and len(operands) != 2:
+        return invalid_message(fields["line"])
+    if len(operands) < 2 and opcode != Opcode.MOV:
+        return invalid_message(fields["line"])
+    fields["opcode"], fields["registers"], fields["operands"] = opcode, (rd,), tuple(operands)
+    return None
+
+def decode_test(mnemonic, parts, fields, lines, labels, data_labels):
+    destination = split_destination(parts)
+    if destination == None:
+        return invalid_message(fields["line"])
+    rn, mem = destination
+    operands = decode_operands(mem, True)
+    if not operands:
+        return invalid_message(fields["line"])
+    rn_operand = Operand(OPERAND_REGISTER, rn, None, None)
+    fields["opcode"], fields["operands"] = Opcode[mnemonic.base.upper()], (rn_operand, operands[-1])
+    return None
+
+def decode_single_data_transfer(mnemonic, parts, fields, lines, labels, data_labels):
+    destination = split_destination(parts)
+    if destination == None:
+        return invalid_message(fields["line"])
+    rt, mem = destination
+    base = None
+    operands = ()
+    writeback = False
+    immediate = None
+    if len(mem) == 1:
+        if mem[0].startswith("[") and mem[0].endswith("]"):
+            base = parse_register(mem[0].strip("[]"))
+            if base is None:
+                return invalid_message(fields["line"])
+            mode = ADDRESS_OFFSET
+        elif mem[0].startswith("=") and data_labels:
+            label = mem[0].strip('=')
+            if label not in data_labels:
+                return invalid_message(fields["line"])
+            index = data_labels.index(label)
+            immediate = int(data_labels[index + 1], 16)
+            mode = ADDRESS_LITERAL
+            if index + 2 < len(data_labels) and data_labels[index + 2] == "equ":
+                mode = ADDRESS_LITERAL_VALUE
         else:
-            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-        return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    elif match_instruction_test:
-        line_edit = line_edit_dict.get(reg[0])
-        binary_str_1 = line_edit.text()
-        hex_int_1 = int(binary_str_1, 16)
-        binary_str_1 = Encoder(hex_int_1)
-        instruction_clean = match_instruction_test.group(0)
-        instruction = re.sub(match_instruction_test.group(0), "", instruction)
-        match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-        if match_condition:
-            condition = match_condition.group(0)
-            c = dict.check_condition(condition)
-            instruction = re.sub(condition, "", instruction)
-        elif not match_condition:
-            c = dict.check_condition(condition)
-        if not instruction:
-            temporary = []
-            for i in range(len(mem)):
-                item = mem[i]
-                if regex_const.match(item):
-                    clean_num = item.lstrip('#')
-                    num = int(clean_num)
-                    num_string = Encoder(num)
-                    binary_str_2 = num_string
-                elif regex_const_hex.match(item):
-                    clean_num = item.lstrip('#')
-                    num = dict.twos_complement_to_signed(clean_num)
-                    num_string = Encoder(num)
-                    binary_str_2 = num_string
-                elif regex_register.match(item):
-                    line_edit = line_edit_dict.get(item)
-                    binary_str_2 = line_edit.text()
-                    hex_int_2 = dict.twos_complement_to_signed(binary_str_2)
-                    binary_str_2 = Encoder(hex_int_2)
-                    if i + 1 < len(mem) and SHIFT_REGEX.match(mem[i + 1]):
-                        t = []
-                        if mem[i + 1].lower() == "rrx":
-                            num_rrx = condition_dict.get("c")
-                            num_str = num_rrx.text()
-                            t.append(binary_str_2)
-                            t.append(num_str)
-                            binary_str, _ = check_shift(t, mem[i + 1], line)
-                            binary_str_2 = binary_str[0]
-                            break
-                        elif not mem[i + 1].lower() == "rrx" and i + 2 < len(mem):
-                            if regex_const.match(mem[i + 2]):
-                                clean_num = mem[i + 2].lstrip('#')
-                                num = int(clean_num)
-                                num_str = Encoder(num)
-                                t.append(binary_str_2)
-                                t.append(num_str)
-                                binary_str, _ = check_shift(t, mem[i + 1], line)
-                                binary_str_2 = binary_str[0]
-                                break
-                            elif regex_register.match(mem[i + 2]):
-                                num_edit = line_edit_dict.get(mem[i + 2])
-                                num = dict.twos_complement_to_signed(num_str)
-                                num_str = Encoder(num)
-                                t.append(binary_str_2)
-                                t.append(num_str)
-                                binary_str, _ = check_shift(t, mem[i + 1], line)
-                                binary_str_2 = binary_str[0]
-                                break
-                        else:
-                            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                    binary_str_2 = Decoder(binary_str_2)
-                    binary_str_2 = Encoder(binary_str_2)
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            temporary.append(binary_str_1)
-            temporary.append(binary_str_2)
-            regex = re.compile(r"(CMP|CMN)", re.IGNORECASE)
-            if regex.match(instruction_clean):
-                arguments, flag_C, flag_V = check_command_with_flag(temporary, instruction_clean, line)
+            return invalid_message(fields["line"])
+    elif len(mem) == 2:
+        if mem[0].startswith("[") and mem[0].endswith("]"):
+            base = parse_register(mem[0].strip("[]"))
+            if base is None or not regex_const.match(mem[1]):
+                return invalid_message(fields["line"])
+            operands = (Operand(OPERAND_IMMEDIATE, int(mem[1].lstrip('#')) & MASK_32, None, None),)
+            mode = ADDRESS_POST_INDEX
+            writeback = True
+        elif mem[0].startswith("["):
+            base = parse_register(mem[0].strip("["))
+            if base is None or "]" not in mem[1]:
+                return invalid_message(fields["line"])
+            offset = mem[1].replace("]", '')
+            if offset.endswith("!"):
+                writeback = True
+                offset = offset.strip('!')
+            if regex_const.match(offset):
+                operands = (Operand(OPERAND_IMMEDIATE, int(offset.lstrip('#')) & MASK_32, None, None),)
+            elif parse_register(offset) is not None:
+                operands = (Operand(OPERAND_REGISTER, parse_register(offset), None, None),)
             else:
-                arguments = check_command_with_flag(temporary, instruction_clean, line)
-            if not c:
-                arguments.append(f"{0:032b}")
-                return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            flag_T = 1
-            result = arguments[0]
-            flag_N = result[0]
-            if Decoder(result) == 0: flag_Z = '1'
+                return invalid_message(fields["line"])
+            mode = ADDRESS_OFFSET
         else:
-            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-        return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    elif match_instruction_single_data_tranfer:
-        equ = None
-        num_result_str = None
-        binary_str = ""
-        instruction_clean = match_instruction_single_data_tranfer.group(0)
-        instruction = re.sub(match_instruction_single_data_tranfer.group(0), "", instruction)
-        match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-        if match_condition:
-            condition = match_condition.group(0)
-            c = dict.check_condition(condition)
-            instruction = re.sub(condition, "", instruction)
-        elif not match_condition:
-            c = dict.check_condition(condition)
-        regex_bracket_1 = re.compile(r"\[", re.IGNORECASE)
-        regex_bracket_2 = re.compile(r"\]", re.IGNORECASE)
-        temporary = []
-        if instruction.lower() == "b":
-            instruction_clean = instruction_clean + "b"
-        if instruction.lower() == "h":
-            instruction_clean = instruction_clean + "h"
-        if len(mem) == 1:
-            bracket_1 = re.search(regex_bracket_1, mem[0])
-            bracket_2 = re.search(regex_bracket_2, mem[0])
-            regex_equal = re.compile(r"\=")
-            if bracket_1 and bracket_2:
-                mem[0] = mem[0].strip("[]")
-                if regex_register.match(mem[0]):
-                    line_edit = line_edit_dict.get(mem[0])
-                    hex_str = line_edit.text()
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            else:
-                have_label = re.search(regex_equal, mem[0])
-                if have_label and data_labels:
-                    label = mem[0].strip('=')
-                    if label in data_labels:
-                        index = data_labels.index(label)
-                        hex_str = data_labels[index + 1]
-                        if index + 2 < len(data_labels) and data_labels[index + 2] == "equ":
-                            equ = True
-                    label = None
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-            if instruction_clean.lower() == "ldr":
-                if equ:
-                    int_str = int(hex_str, 16)
-                    result = Encoder(int_str)
-                else:
-                    result = LDR(hex_str, model)
-                arguments.append(result)
-            if instruction_clean.lower() == "ldrb":
-                if equ:
-                    int_str = int(hex_str, 16)
-                    result = Encoder(int_str)
-                else:
-                    result = LDR_B(hex_str, model_byte)
-                arguments.append(result)
-            if instruction_clean.lower() == "ldrh":
-                if equ:
-                    int_str = int(hex_str, 16)
-                    result = Encoder(int_str)
-                else:
-                    result = LDR_H(hex_str, model_byte)
-                arguments.append(result)
-            if instruction_clean.lower() == "str":
-                STR(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                flag_T = 1
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            if instruction_clean.lower() == "strb":
-                STR_B(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                flag_T = 1
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            if instruction_clean.lower() == "strh":
-                STR_H(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                flag_T = 1
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-        elif len(mem) == 2:
-            bracket_1 = re.search(regex_bracket_1, mem[0])
-            bracket_2 = re.search(regex_bracket_2, mem[0])
-            if bracket_1 and bracket_2:
-                mem[0] = mem[0].strip("[]")
-                reg.append(mem[0])
-                if regex_register.match(mem[0]):
-                    line_edit = line_edit_dict.get(mem[0])
-                    hex_str = line_edit.text()
-                    num_1 = dict.twos_complement_to_signed(hex_str)
-                    temporary.append(num_1)
-                    if regex_const.match(mem[1]):
-                        clean_num = mem[1].lstrip('#')
-                        num_2 = int(clean_num)
-                        temporary.append(num_2)
-                    else:
-                        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                elif not regex_register.match(mem[0]):
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                num_result = num_1 + num_2
-                num_result_str = Encoder(num_result)
-
-            elif bracket_1 and not bracket_2:
-                mem[0] = mem[0].strip("[")
-                if regex_register.match(mem[0]):
-                    line_edit = line_edit_dict.get(mem[0])
-                    hex_str = line_edit.text()
-                    num_1 = dict.twos_complement_to_signed(hex_str)
-                    temporary.append(num_1)
-                elif not regex_register.match(mem[0]):
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                bracket_mem = re.search(regex_bracket_2, mem[1])
-                if bracket_mem:
-                    mem[1] = mem[1].replace("]", '')
-                    exclamation = re.compile(r"\!")
-                    exclamation_check = re.search(exclamation, mem[1])
-                    if exclamation_check:
-                        reg.append(mem[0])
-                        mem[1] = mem[1].strip('!')
-                        if regex_const.match(mem[1]):
-                            clean_num = mem[1].lstrip('#')
-                            num_2 = int(clean_num)
-                            temporary.append(num_2)
-                        elif regex_register.match(mem[1]):
-                            line_edit = line_edit_dict.get(mem[1])
-                            hex_str_reg = line_edit.text()
-                            num_2 = dict.twos_complement_to_signed(hex_str_reg)
-                            temporary.append(num_2)
-                        else:
-                            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                        num_result = num_1 + num_2
-                        num_result_str = Encoder(num_result)
-                        hex_str = format(num_result, '08x')
-                    elif not exclamation_check:
-                        if regex_const.match(mem[1]):
-                            clean_num = mem[1].lstrip('#')
-                            num_2 = int(clean_num)
-                            temporary.append(num_2)
-                        elif regex_register.match(mem[1]):
-                            line_edit = line_edit_dict.get(mem[1])
-                            hex_str_reg = line_edit.text()
-                            num_2 = dict.twos_complement_to_signed(hex_str_reg)
-                            temporary.append(num_2)
-                        else:
-                            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                    num_result = num_1 + num_2
-                    hex_str = format(num_result, '08x')
-                elif not bracket_mem:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-            elif not bracket_1:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-            if instruction_clean.lower() == "ldr":
-                result = LDR(hex_str, model)
-                arguments.append(result)
-                if num_result_str:
-                    arguments.append(num_result_str)
-            if instruction_clean.lower() == "ldrb":
-                result = LDR_B(hex_str, model_byte)
-                arguments.append(result)
-                if num_result_str:
-                    arguments.append(num_result_str)
-            if instruction_clean.lower() == "ldrh":
-                result = LDR_H(hex_str, model_byte)
-                arguments.append(result)
-                if num_result_str:
-                    arguments.append(num_result_str)
-            if instruction_clean.lower() == "str":
-                STR(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                flag_T = 1
-                if(len(reg) == 1):
-                    reg = None
-                elif(len(reg) == 2):
-                    reg[0] = reg[1]
-                    reg.pop(1)
-                if num_result_str:
-                    arguments.append(num_result_str)
-                else:
-                    arguments = None
-            if instruction_clean.lower() == "strb":
-                STR_B(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                flag_T = 1
-                if(len(reg) == 1):
-                    reg = None
-                elif(len(reg) == 2):
-                    reg[0] = reg[1]
-                    reg.pop(1)
-                if num_result_str:
-                    arguments.append(num_result_str)
-                else:
-                    arguments = None
-            if instruction_clean.lower() == "strh":
-                STR_H(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                flag_T = 1
-                if(len(reg) == 1):
-                    reg = None
-                elif(len(reg) == 2):
-                    reg[0] = reg[1]
-                    reg.pop(1)
-                if num_result_str:
-                    arguments.append(num_result_str)
-                else:
-                    arguments = None
-
-        elif len(mem) == 4:
-            bracket_1 = re.search(regex_bracket_1, mem[0])
-            bracket_2 = re.search(regex_bracket_2, mem[0])
-            if bracket_1 and not bracket_2:
-                t = None
-                mem[0] = mem[0].strip("[")
-                if regex_register.match(mem[0]):
-                    line_edit = line_edit_dict.get(mem[0])
-                    hex_str = line_edit.text()
-                    num_1 = dict.twos_complement_to_signed(hex_str)
-                    temporary.append(num_1)
-                elif not regex_register.match(mem[0]):
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                search = re.search(regex_bracket_2, mem[3])
-                if search:
-                    mem[3] = mem[3].strip("]")
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                for i in range(1, len(mem)):
-                    item = mem[i]
-                    if regex_register.match(item):
-                        line_edit = line_edit_dict.get(item)
-                        hex_str_in = line_edit.text()
-                        hex_int_in = dict.twos_complement_to_signed(hex_str_in)
-                        hex_str_in = Encoder(hex_int_in)
-                        if i + 1 < len(mem) and SHIFT_REGEX.match(mem[i + 1]):
-                            temp = []
-                            if mem[i + 1].lower() == "lsl" and i + 2 < len(mem):
-                                if regex_const.match(mem[i + 2]):
-                                    clean_num = mem[i + 2].lstrip('#')
-                                    num = int(clean_num)
-                                    num_str = Encoder(num)
-                                    temp.append(hex_str_in)
-                                    temp.append(num_str)
-                                    binary_str_reg, _ = check_shift(temp, mem[i + 1], line)
-                                    break
-                    else:
-                        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-                num_2 = Decoder(binary_str_reg[0])
-                num_result = num_1 + num_2
-                hex_str = format(num_result, '08x')
-            elif not bracket_1:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-            if instruction_clean.lower() == "ldr":
-                result = LDR(hex_str, model)
-                arguments.append(result)
-            if instruction_clean.lower() == "ldrb":
-                result = LDR_B(hex_str, model_byte)
-                arguments.append(result)
-            if instruction_clean.lower() == "ldrh":
-                result = LDR_H(hex_str, model_byte)
-                arguments.append(result)
-            if instruction_clean.lower() == "str":
-                STR(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                arguments = None
-                flag_T = 1
-                if(len(reg) == 1):
-                    reg = None
-                elif(len(reg) == 2):
-                    reg[0] = reg[1]
-                    reg.pop(1)
-            if instruction_clean.lower() == "strb":
-                STR_B(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                arguments = None
-                flag_T = 1
-                if(len(reg) == 1):
-                    reg = None
-                elif(len(reg) == 2):
-                    reg[0] = reg[1]
-                    reg.pop(1)
-            if instruction_clean.lower() == "strh":
-                STR_H(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte)
-                arguments = None
-                flag_T = 1
-                if(len(reg) == 1):
-                    reg = None
-                elif(len(reg) == 2):
-                    reg[0] = reg[1]
-                    reg.pop(1)
-        elif len(mem) > 4:
-            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-        return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    elif match_instruction_multi:
-        u = None
-        if instruction and instruction[0] == "u":
-            u = 0
-            instruction = instruction[1:]
-        if instruction and instruction[0] == "s":
-            u = 1
-            instruction = instruction[1:]
-        instruction_clean = match_instruction_multi.group(0)
-        instruction = re.sub(match_instruction_multi.group(0), "", instruction)
-        LONG_REGEX = re.compile(r"L", re.IGNORECASE)
-        l = None
-        long_flag = re.search(LONG_REGEX, instruction)
-        if long_flag:
-            instruction = instruction.lstrip(long_flag.group(0))
-            l = 1
-        match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-        if match_condition:
-            condition = match_condition.group(0)
-            c = dict.check_condition(condition)
-            instruction = re.sub(condition, "", instruction)
-        elif not match_condition:
-            c = dict.check_condition(condition)
-        match_flag = re.search(FLAG_REGEX, instruction)
-        flag = None
-        if match_flag:
-            instruction = instruction.lstrip(match_flag.group(0))
-            flag = 1
-        if not instruction:
-            temporary = []
-            if len(mem) == 1:
-                mem.insert(0, reg[0])
-            if l == 1 and len(mem) == 3:
-                reg.append(mem[0])
-                mem = mem[1:]
-            for i in range(len(mem)):
-                item = mem[i]
-                if regex_register.match(item):
-                    line_edit = line_edit_dict.get(item)
-                    binary_str = line_edit.text()
-                    num = dict.twos_complement_to_signed(binary_str)
-                    binary_str = Encoder(num)
-                    temporary.append(binary_str)
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            if flag == 1:
-                result = arguments[0]
-                flag_N = result[0]
-                if Decoder(result) == 0: flag_Z = '1'
-            if u != None and (l == 1 or instruction_clean.lower() == "div"):
-                arguments = check_command_long(temporary, instruction_clean, u, reg, line)
-            elif u == None and l == None:
-                arguments = check_command(temporary, instruction_clean, line)
-            else:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            if not c:
-                arguments.append(f"{0:032b}")
-                return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            if arguments == None:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
+            return invalid_message(fields["line"])
+    elif len(mem) == 4:
+        if not mem[0].startswith("[") or "]" in mem[0] or not mem[3].endswith("]"):
+            return invalid_message(fields["line"])
+        base = parse_register(mem[0].strip("["))
+        operands = decode_operands([mem[1], mem[2], mem[3].strip("]")], True)
+        if base is None or operands == None or len(operands) != 1 or operands[0].kind != OPERAND_SHIFT_IMMEDIATE or operands[0].shift != "lsl":
+            return invalid_message(fields["line"])
+        operands = tuple(operands)
+        mode = ADDRESS_OFFSET
+    else:
+        return invalid_message(fields["line"])
+    fields["opcode"], fields["registers"], fields["operands"] = Opcode[mnemonic.base.upper()], (rt, base), operands
+    fields["mode"], fields["writeback"], fields["immediate"] = mode, writeback, immediate
+    return None
+
+def decode_multiply(mnemonic, parts, fields, lines, labels, data_labels):
+    destination = split_destination(parts)
+    if destination == None:
+        return invalid_message(fields["line"])
+    rd, mem = destination
+    opcode = Opcode[mnemonic.base.upper()]
+    registers = [rd]
+    if len(mem) == 1:
+        mem.insert(0, register_names[rd])
+    if mnemonic.base in LONG_MULTIPLY_INSTRUCTIONS:
+        if len(mem) != 3 or parse_register(mem[0]) is None:
+            return invalid_message(fields["line"])
+        registers.append(parse_register(mem[0]))
+        mem = mem[1:]
+    operands = []
+    for item in mem:
+        register = parse_register(item)
+        if register is None:
+            return invalid_message(fields["line"])
+        operands.append(Operand(OPERAND_REGISTER, register, None, None))
+    if len(operands) != (3 if opcode in (Opcode.MLA, Opcode.MLS) else 2):
+        return invalid_message(fields["line"])
+    fields["opcode"], fields["registers"], fields["operands"] = opcode, tuple(registers), tuple(operands)
+    return None
+
+def decode_saturate(mnemonic, parts, fields, lines, labels, data_labels):
+    destination = split_destination(parts)
+    if destination == None:
+        return invalid_message(fields["line"])
+    rd, mem = destination
+    if len(mem) not in (2, 4) or not regex_const.match(mem[0]):
+        return invalid_message(fields["line"])
+    operands = decode_operands(mem[1:], True)
+    if operands == None or len(operands) != 1 or operands[0].kind == OPERAND_IMMEDIATE:
+        return invalid_message(fields["line"])
+    fields["opcode"], fields["registers"], fields["operands"] = Opcode[mnemonic.base.upper()], (rd,), tuple(operands)
+    fields["immediate"] = int(pow(2, int(mem[0].lstrip('#'))) / 2)
+    return None
+
+def decode_reverse(mnemonic, parts, fields, lines, labels, data_labels):
+    destination = split_destination(parts)
+    if destination == None:
+        return invalid_message(fields["line"])
+    rd, mem = destination
+    if len(mem) != 1 or parse_register(mem[0]) is None:
+        return invalid_message(fields["line"])
+    fields["opcode"], fields["registers"] = Opcode[mnemonic.base.upper()], (rd,)
+    fields["operands"] = (Operand(OPERAND_REGISTER, parse_register(mem[0]), None, None),)
+    return None
+
+# instruction class -> decoder
+decode_handler_dict = {
+    DATA_PROCESSING: decode_data_processing,
+    TEST: decode_test,
+    SINGLE_DATA_TRANSFER: decode_single_data_transfer,
+    MULTIPLY: decode_multiply,
+    SATURATE: decode_saturate,
+    REVERSE: decode_reverse,
+    BRANCH: decode_branch,
+    STACKED: decode_stacked,
+}
+
+# decodes one source line into an Instruction, returns (instruction, error message)
+def decode_line(index, address, line, lines, labels, data_labels):
+    parts = split_and_filter(line)
+    if not parts:
+        return None, invalid_message(line)
+    mnemonic = parse_mnemonic(parts[0])
+    if mnemonic == None:
+        return None, invalid_message(line)
+    fields = {"index": index, "address": address, "line": line, "opcode": None, "condition": mnemonic.condition,
+              "set_flags": mnemonic.set_flags, "registers": (), "operands": (), "target": None, "mode": None,
+              "writeback": False, "immediate": None}
+    error = decode_handler_dict[mnemonic.instruction_class](mnemonic, parts, fields, lines, labels, data_labels)
+    if error:
+        return None, error
+    return Instruction(**fields), None
+
+# decodes the whole program, returns (tuple of instructions, error message)
+def decode_program(lines, labels, address, data_labels):
+    program = []
+    pushed = 0
+    for index in range(len(lines)):
+        instruction, error = decode_line(index, int(address[index], 16), lines[index], lines, labels, data_labels)
+        if error:
+            return None, error
+        if instruction.opcode == Opcode.PUSH:
+            pushed += len(instruction.registers)
+        if instruction.opcode == Opcode.POP and len(instruction.registers) > pushed:
+            return None, "Out of range to POP!"
+        program.append(instruction)
+    return tuple(program), None
+
+# value of a decoded operand
+def operand_value(operand, line):
+    if operand.kind == OPERAND_IMMEDIATE:
+        return operand.value
+    value = cpu_state.registers[operand.value]
+    if operand.kind == OPERAND_REGISTER:
+        return value
+    if operand.kind == OPERAND_SHIFT_IMMEDIATE:
+        amount = operand.amount
+    else:
+        amount = cpu_state.registers[operand.amount]
+    results, _ = check_shift([value, amount], operand.shift, line)
+    return results[0]
+
+# executes one decoded instruction, writes the cpu state and returns the index of the next instruction
+def execute_instruction(self, instruction):
+    next_index = instruction.index + 1
+    if not cpu_state.check_condition(instruction.condition):
+        return next_index
+    return execute_handler_dict[instruction.opcode](self, instruction, next_index)
+
+# opcode handlers, each one returns the index of the next instruction
+def execute_data_processing(self, instruction, next_index):
+    temporary = [operand_value(operand, instruction.line) for operand in instruction.operands]
+    arguments, flag_N, flag_Z, flag_C, flag_V = check_command_with_flag(temporary, instruction.opcode.name, instruction.line)
+    if arguments:
+        cpu_state.registers[instruction.registers[0]] = arguments[0]
+        if instruction.set_flags:
+            cpu_state.set_flags(flag_N, flag_Z, flag_C, flag_V)
+    return next_index
+
+def execute_test(self, instruction, next_index):
+    temporary = [operand_value(operand, instruction.line) for operand in instruction.operands]
+    arguments, flag_N, flag_Z, flag_C, flag_V = check_command_with_flag(temporary, instruction.opcode.name, instruction.line)
+    if arguments:
+        cpu_state.set_flags(flag_N, flag_Z, flag_C, flag_V)
+    return next_index
+
+def execute_single_data_transfer(self, instruction, next_index):
+    opcode = instruction.opcode
+    rt, base = instruction.registers
+    if instruction.mode in (ADDRESS_LITERAL, ADDRESS_LITERAL_VALUE):
+        address = instruction.immediate
+    else:
+        address = cpu_state.registers[base]
+        if instruction.operands:
+            offset_address = (address + operand_value(instruction.operands[0], instruction.line)) & MASK_32
+            if instruction.mode == ADDRESS_OFFSET:
+                address = offset_address
+    if opcode in LOAD_OPCODES:
+        if instruction.mode == ADDRESS_LITERAL_VALUE:
+            result = address
+        elif opcode == Opcode.LDR:
+            result = LDR(address)
+        elif opcode == Opcode.LDRB:
+            result = LDR_B(address)
         else:
-            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-        return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    elif match_instruction_saturate:
-        instruction_clean = match_instruction_saturate.group(0)
-        instruction = re.sub(match_instruction_saturate.group(0), "", instruction)
-        match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-        if match_condition:
-            condition = match_condition.group(0)
-            c = dict.check_condition(condition)
-            instruction = re.sub(condition, "", instruction)
-        elif not match_condition:
-            c = dict.check_condition(condition)
-        if not instruction:
-            temporary = []
-            if len(mem) == 2:
-                const = mem[0]
-                reg_const = mem[1]
-                if regex_const.match(const) and regex_register.match(reg_const):
-                    const = const.lstrip('#')
-                    const = int(const)
-                    sat = int(pow(2, const) / 2)
-                    line_edit = line_edit_dict.get(reg_const)
-                    binary_str = line_edit.text()
-                    num = dict.twos_complement_to_signed(binary_str)
-                    arguments = SAT(sat, num, instruction_clean)
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            elif len(mem) == 3 or len(mem) == 4:
-                const = mem[0]
-                reg_const = mem[1]
-                shift = mem[2]
-                if regex_const.match(const) and regex_register.match(reg_const):
-                    const = const.lstrip('#')
-                    const = int(const)
-                    sat = int(pow(2, const) / 2)
-                    line_edit = line_edit_dict.get(reg_const)
-                    binary_str = line_edit.text()
-                    hex_int_in = dict.twos_complement_to_signed(binary_str)
-                    hex_str_in = Encoder(hex_int_in)
-                    if SHIFT_REGEX.match(shift):
-                        temp = []
-                        if shift.lower() == "rrx":
-                            num_rrx = condition_dict.get("c")
-                            num_str = num_rrx.text()
-                            temp.append(hex_str_in)
-                            temp.append(num_str)
-                            binary_str_shift, _ = check_shift(temp, shift, line)
-                        else:
-                            if regex_const.match(mem[3]):
-                                clean_num = mem[3].lstrip('#')
-                                num = int(clean_num)
-                                num_str = Encoder(num)
-                                temp.append(hex_str_in)
-                                temp.append(num_str)
-                                binary_str_shift, _ = check_shift(temp, shift, line)
-                            elif regex_register.match(mem[3]):
-                                num_edit = line_edit_dict.get(mem[3])
-                                num_str = num_edit.text()
-                                num = int(num_str, 16)
-                                num_str = Encoder(num)
-                                temp.append(hex_str_in)
-                                temp.append(num_str)
-                                binary_str_shift, _ = check_shift(temp, shift, line)
-                    num = dict.twos_complement_to_signed(binary_str_shift)
-                    arguments = SAT(sat, num, instruction_clean)
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            else:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
+            result = LDR_H(address)
+        cpu_state.registers[rt] = result
+    else:
+        value = cpu_state.registers[rt]
+        if opcode == Opcode.STR:
+            STR(value, address)
+        elif opcode == Opcode.STRB:
+            STR_B(value, address)
         else:
-            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-        return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-
-    elif match_instruction_reverse:
-        instruction_clean = match_instruction_reverse.group(0)
-        instruction = re.sub(match_instruction_reverse.group(0), "", instruction)
-        match_condition = re.search(CONDITIONAL_MODIFIER_REGEX, instruction)
-        if match_condition:
-            condition = match_condition.group(0)
-            c = dict.check_condition(condition)
-            instruction = re.sub(condition, "", instruction)
-        elif not match_condition:
-            c = dict.check_condition(condition)
-        if not instruction:
-            if len(mem) == 1:
-                temporary = []
-                if regex_register.match(mem[0]):
-                    line_edit = line_edit_dict.get(mem[0])
-                    binary_str = line_edit.text()
-                    temporary.append(binary_str)
-                    arguments = check_command(temporary, instruction_clean, line)
-                else:
-                    return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-            else:
-                return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
+            STR_H(value, address)
+    if instruction.writeback:
+        cpu_state.registers[base] = offset_address
+    return next_index
+
+def execute_multiply(self, instruction, next_index):
+    temporary = [operand_value(operand, instruction.line) for operand in instruction.operands]
+    arguments = check_command(temporary, instruction.opcode.name, instruction.line)
+    if arguments:
+        cpu_state.registers[instruction.registers[0]] = arguments[0]
+        if instruction.set_flags:
+            cpu_state.set_flags(arguments[0] >> 31, arguments[0] == 0, cpu_state.flag("c"), cpu_state.flag("v"))
+    return next_index
+
+def execute_long(self, instruction, next_index):
+    temporary = [operand_value(operand, instruction.line) for operand in instruction.operands]
+    name = instruction.opcode.name.lower()
+    u = 0 if name[0] == "u" else 1
+    reg = [register_names[register] for register in instruction.registers]
+    arguments = check_command_long(temporary, name[1:4], u, reg, instruction.line)
+    if arguments:
+        for i in range(len(arguments)):
+            cpu_state.registers[instruction.registers[i]] = arguments[i]
+        if instruction.set_flags:
+            cpu_state.set_flags(arguments[0] >> 31, arguments[0] == 0, cpu_state.flag("c"), cpu_state.flag("v"))
+    return next_index
+
+def execute_saturate(self, instruction, next_index):
+    num = dict.to_signed_32(operand_value(instruction.operands[0], instruction.line))
+    arguments = SAT(instruction.immediate, num, instruction.opcode.name)
+    cpu_state.registers[instruction.registers[0]] = arguments[0]
+    return next_index
+
+def execute_reverse(self, instruction, next_index):
+    temporary = [operand_value(instruction.operands[0], instruction.line)]
+    arguments = check_command(temporary, instruction.opcode.name, instruction.line)
+    cpu_state.registers[instruction.registers[0]] = arguments[0]
+    return next_index
+
+def execute_b(self, instruction, next_index):
+    return instruction.target
+
+def execute_bl(self, instruction, next_index):
+    cpu_state.write("lr", instruction.address + 4)
+    return instruction.target
+
+def execute_bx(self, instruction, next_index):
+    return branch_to_address(self, cpu_state.registers[instruction.registers[0]], next_index)
+
+# the stacked values live in self.stacked, data_access_hook still sees the stack words they would occupy
+def execute_push(self, instruction, next_index):
+    if data_access_hook:
+        stack_accesses(cpu_state.registers[13] - 4 * len(instruction.registers), len(instruction.registers), True)
+    for register in instruction.registers:
+        self.stacked.append(cpu_state.registers[register])
+    cpu_state.write("sp", cpu_state.registers[13] - 4 * len(instruction.registers))
+    return next_index
+
+def execute_pop(self, instruction, next_index):
+    if len(instruction.registers) > len(self.stacked):
+        return next_index
+    if data_access_hook:
+        stack_accesses(cpu_state.registers[13], len(instruction.registers), False)
+    values = self.stacked[:len(instruction.registers)]
+    self.stacked.clear()
+    cpu_state.write("sp", cpu_state.registers[13] + 4 * len(instruction.registers))
+    for i in range(len(instruction.registers)):
+        if instruction.registers[i] == 15:
+            next_index = branch_to_address(self, values[i], next_index)
         else:
-            return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-        return reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
-    else:
-        return None, None, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T
+            cpu_state.registers[instruction.registers[i]] = values[i]
+    return next_index
+
+# count words from address upwards, as PUSH/POP transfer them
+def stack_accesses(address, count, write):
+    for i in range(count):
+        data_access_hook((address + 4 * i) & MASK_32, 4, write)
+
+# opcode -> handler
+execute_handler_dict = {
+    Opcode.MOV: execute_data_processing, Opcode.LSL: execute_data_processing, Opcode.LSR: execute_data_processing,
+    Opcode.AND: execute_data_processing, Opcode.BIC: execute_data_processing, Opcode.ORR: execute_data_processing,
+    Opcode.ORN: execute_data_processing, Opcode.EOR: execute_data_processing, Opcode.ADD: execute_data_processing,
+    Opcode.ADC: execute_data_processing, Opcode.SUB: execute_data_processing, Opcode.SBC: execute_data_processing,
+    Opcode.RSB: execute_data_processing,
+    Opcode.CMP: execute_test, Opcode.CMN: execute_test, Opcode.TST: execute_test, Opcode.TEQ: execute_test,
+    Opcode.LDR: execute_single_data_transfer, Opcode.LDRB: execute_single_data_transfer, Opcode.LDRH: execute_single_data_transfer,
+    Opcode.STR: execute_single_data_transfer, Opcode.STRB: execute_single_data_transfer, Opcode.STRH: execute_single_data_transfer,
+    Opcode.MUL: execute_multiply, Opcode.MLA: execute_multiply, Opcode.MLS: execute_multiply,
+    Opcode.UMULL: execute_long, Opcode.SMULL: execute_long, Opcode.UMLAL: execute_long, Opcode.SMLAL: execute_long,
+    Opcode.UMLSL: execute_long, Opcode.SMLSL: execute_long, Opcode.UDIV: execute_long, Opcode.SDIV: execute_long,
+    Opcode.SSAT: execute_saturate, Opcode.USAT: execute_saturate,
+    Opcode.REV: execute_reverse, Opcode.RBIT: execute_reverse,
+    Opcode.B: execute_b, Opcode.BL: execute_bl, Opcode.BX: execute_bx,
+    Opcode.PUSH: execute_push, Opcode.POP: execute_pop,
+}
+
+# index of the instruction at a code address, or the fallthrough index if the address holds no instruction
+# instructions are placed every 4 bytes from the first address so the index is computed, not searched
+def branch_to_address(self, address, fallthrough):
+    if not self.program:
+        return fallthrough
+    index = (address - self.program[0].address) // 4
+    if 0 <= index < len(self.program) and self.program[index].address == address:
+        return index
+    return fallthrough
 
 def check_shift(temporary, instruction, line):
-    if (instruction.lower() == "lsr"):
-        results, carry = LSR_C(temporary, line)
-    elif (instruction.lower() == "lsl"):
-        results, carry = LSL_C(temporary, line)
-    elif (instruction.lower() == "asr"):
-        results, carry = ASR_C(temporary, line)
-    elif (instruction.lower() == "ror"):
-        results, carry = ROR_C(temporary, line)
-    elif (instruction.lower() == "rrx"):
-        results, carry = RRX_C(temporary, line)
-    return results, carry
+    handler = shift_handler_dict.get(instruction.lower())
+    results = handler(temporary, line) if handler else None
+    if results == None:
+        return None, 0
+    return [results[0]], results[3]
+
+# runs one data processing instruction on integer operands
+# returns the result list and the N, Z, C, V flags of the ALU as ints
+def check_command_with_flag(temporary, instruction, line):
+    handler = command_handler_dict.get(instruction.lower())
+    if handler == None:
+        return [], 0, 0, 0, 0
+    results = handler(temporary, line)
+    if results == None:
+        return None, 0, 0, 0, 0
+    result, flag_N, flag_Z, flag_C, flag_V = results
+    return [result], flag_N, flag_Z, flag_C, flag_V
 
 def check_command(temporary, instruction, line):
-    arguments = []
-    if(instruction.lower() == "mov"):
-        arguments = MOV(temporary, line)
-    elif (instruction.lower() == "lsr"):
-        arguments, _ = LSR_C(temporary, line)
-    elif (instruction.lower() == "lsl"):
-        arguments, _ = LSL_C(temporary, line)
-    elif (instruction.lower() == "asr"):
-        arguments, _ = ASR_C(temporary, line)
-    elif (instruction.lower() == "ror"):
-        arguments, _ = ROR_C(temporary, line)
-    elif (instruction.lower() == "rrx"):
-        arguments, _ = RRX_C(temporary, line)
-    elif (instruction.lower() == "and"):
-        arguments = AND(temporary, line)
-    elif (instruction.lower() == "bic"):
-        arguments = BIC(temporary, line)
-    elif (instruction.lower() == "orr"):
-        arguments = ORR(temporary, line)
-    elif (instruction.lower() == "orn"):
-        arguments = ORN(temporary, line)
-    elif (instruction.lower() == "eor"):
-        arguments = EOR(temporary, line)
-    elif(instruction.lower() == "mvn"):
-        arguments = MVN(temporary, line)
-    elif(instruction.lower() == "add"):
-        arguments, _, _ = dict.add_32(temporary, line)
-    elif(instruction.lower() == "adc"):
-        arguments, _, _ = ADC(temporary, line)
-    elif(instruction.lower() == "sub"):
-        arguments, _, _ = dict.sub_32(temporary, line)
-    elif(instruction.lower() == "sbc"):
-        arguments, _, _ = SBC(temporary, line)
-    elif(instruction.lower() == "rsb"):
-        arguments, _, _ = RSB(temporary, line)
-    elif(instruction.lower() == "rev"):
-        arguments = REV(temporary, line)
-    elif(instruction.lower() == "rbit"):
-        arguments = RBIT(temporary, line)
-    elif(instruction.lower() == "mul"):
-        arguments = dict.mul_32(temporary, line)
-    elif(instruction.lower() == "mla"):
-        arguments = MLA(temporary, line)
-    elif(instruction.lower() == "mls"):
-        arguments = MLS(temporary, line)
+    arguments, _, _, _, _ = check_command_with_flag(temporary, instruction, line)
     return arguments
 
-def check_command_with_flag(temporary, instruction, line):
-    arguments = []
-    if (instruction.lower() == "lsr"):
-        arguments, carry = LSR_C(temporary, line)
-    elif (instruction.lower() == "lsl"):
-        arguments, carry = LSL_C(temporary, line)
-    elif (instruction.lower() == "asr"):
-        arguments, carry = ASR_C(temporary, line)
-    elif (instruction.lower() == "ror"):
-        arguments, carry = ROR_C(temporary, line)
-    elif (instruction.lower() == "rrx"):
-        arguments, carry = RRX_C(temporary, line)
-    elif(instruction.lower() == "add"):
-        arguments, carry, overflow = dict.add_32(temporary, line)
-        return arguments, carry, overflow
-    elif(instruction.lower() == "adc"):
-        arguments, carry, overflow = ADC(temporary, line)
-        return arguments, carry, overflow
-    elif(instruction.lower() == "sub"):
-        arguments, carry, overflow = dict.sub_32(temporary, line)
-        return arguments, carry, overflow
-    elif(instruction.lower() == "sbc"):
-        arguments, carry, overflow = SBC(temporary, line)
-        return arguments, carry, overflow
-    elif(instruction.lower() == "rsb"):
-        arguments, carry, overflow = RSB(temporary, line)
-        return arguments, carry, overflow
-    elif (instruction.lower() == "cmp"):
-        arguments, carry, overflow = dict.sub_32(temporary, line)
-        return arguments, carry, overflow
-    elif (instruction.lower() == "cmn"):
-        arguments, carry, overflow = dict.add_32(temporary, line)
-        return arguments, carry, overflow
-    elif (instruction.lower() == "tst"):
-        arguments = AND(temporary, line)
-        return arguments
-    elif (instruction.lower() == "teq"):
-        arguments = EOR(temporary, line)
-        return arguments
-    return arguments, carry
-
 def check_command_long(temporary, instruction, u, reg, line):
-    arguments = []
-    if(instruction.lower() == "mul") and u == 0:
-        arguments = dict.mul_64_unsigned(temporary, line)
-    elif(instruction.lower() == "mul") and u == 1:
-        arguments = dict.mul_64_signed(temporary, line)
-    elif(instruction.lower() == "mla") and u == 0:
-        arguments = UMLA(temporary, reg, line)
-    elif(instruction.lower() == "mla") and u == 1:
-        arguments = SMLA(temporary, reg, line)
-    elif(instruction.lower() == "mls") and u == 0:
-        arguments = UMLS(temporary, reg, line)
-    elif(instruction.lower() == "mls") and u == 1:
-        arguments = SMLS(temporary, reg, line)
-    if(instruction.lower() == "div") and u == 0:
-        arguments = dict.divide_32_unsigned(temporary, line)
-    elif(instruction.lower() == "div") and u == 1:
-        arguments = dict.divide_32_signed(temporary, line)
-    return arguments
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    handler = long_handler_dict.get((instruction.lower(), u))
+    if handler == None:
+        return []
+    return handler(temporary, reg, line)
 
 # intruction implementations
+# operands are unsigned 32-bit integers, each instruction returns the ALU tuple (result, N, Z, C, V)
 def MOV(temporary, line):
     if len(temporary) == 1:
-        return temporary
+        return dict.alu_mov(temporary[0])
     else:
         print(f"Error: Bad arguments to instruction '{line.strip()}'")
         return None
-# print(MOV(["r0"], "MOV r0, #1"))  # should return ['r0']
-# print(MOV(["r0", "#1"], "MOV r0, #1"))  # should return None with error message
+# print(MOV([1], "MOV r0, #1"))  # should return (1, 0, 0, 0, 0)
+# print(MOV([1, 2], "MOV r0, #1, #2"))  # should return None with error message
 
 def MVN(temporary, line):
-    result = []
     if len(temporary) == 1:
-        result.append(dict.complement(temporary[0]))
-        return result
+        return dict.alu_mvn(temporary[0])
     else:
         print(f"Error: Bad arguments to instruction '{line.strip()}'")
         return None
-# print(MVN(["r0"], "MVN r0"))  # should return ['~r0']
-# print(MVN(["r0", "#1"], "MVN r0, #1"))  # should return None with error message
+# print(MVN([0], "MVN r0, #0"))  # should return (4294967295, 1, 0, 0, 0)
 
 # LSR (Logical Shift Right) instruction implementation
 def LSR_C(temporary, line):
     if len(temporary) < 2:
-        carry = '0'
-        return None, carry
-    else:
-        num = Decoder(temporary[1])
-        result, carry = dict.r_shift_32_c(temporary[0], num, line)
-        return result, carry
-# print(LSR_C(["r0", "2"], "LSR r0, #2"))  # should return (result, carry)
+        return None
+    return dict.alu_lsr(temporary[0], temporary[1])
+# print(LSR_C([8, 2], "LSR r0, r1, #2"))  # should return (2, 0, 0, 0, 0)
 
 # LSL (Logical Shift Left) instruction implementation
 def LSL_C(temporary, line):
     if len(temporary) < 2:
-        carry = '0'
-        return None, carry
-    else:
-        num = Decoder(temporary[1])
-        result, carry = dict.l_shift_32_c(temporary[0], num, line)
-        return result, carry
-# print(LSL_C(["r0", "2"], "LSL r0, #2"))  # should return (result, carry)
+        return None
+    return dict.alu_lsl(temporary[0], temporary[1])
+# print(LSL_C([8, 2], "LSL r0, r1, #2"))  # should return (32, 0, 0, 0, 0)
 
 # ASR (Arithmetic Shift Right) instruction implementation
 def ASR_C(temporary, line):
     if len(temporary) < 2:
-        carry = '0'
-        return None, carry
-    else:
-        num = Decoder(temporary[1])
-        result, carry = dict.asr_shift_32_c(temporary[0], num, line)
-        return result, carry
-# print(ASR_C(["r0", "2"], "ASR r0, #2"))  # should return (result, carry)
-
+        return None
+    return dict.alu_asr(temporary[0], temporary[1])
+# print(ASR_C([0x80000000, 4], "ASR r0, r1, #4"))  # should return (4160749568, 1, 0, 0, 0)
 
 def ROR_C(temporary, line):
     if len(temporary) < 2:
-        carry = '0'
-        return None, carry
-    else:
-        num = Decoder(temporary[1])
-        result, carry = dict.ror_shift_32_c(temporary[0], num, line)
-        return result, carry
+        return None
+    return dict.alu_ror(temporary[0], temporary[1])
 
 def RRX_C(temporary, line):
     if len(temporary) == 1:
-        carry_in = condition_dict.get("c")
-        carry_in = carry_in.text()
-        result, carry = dict.rrx_shift_32_c(temporary[0], carry_in, line)
-        return result, carry
+        return dict.alu_rrx(temporary[0], cpu_state.flag("c"))
     else:
-        carry = '0'
-        return None, carry
+        return None
 
 def AND(temporary, line):
     if len(temporary) < 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
     else:
-        result = dict.and_32(temporary[0], temporary[1], line)
-        return result
+        return dict.alu_and(temporary[0], temporary[1])
 
 def BIC(temporary, line):
     if len(temporary) < 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
     else:
-        binary_str = dict.complement(temporary[1])
-        result = dict.and_32(temporary[0], binary_str, line)
-        return result
+        return dict.alu_bic(temporary[0], temporary[1])
 
 def ORR(temporary, line):
     if len(temporary) < 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
     else:
-        result = dict.or_32(temporary[0], temporary[1], line)
-        return result
+        return dict.alu_or(temporary[0], temporary[1])
 
 def ORN(temporary, line):
     if len(temporary) < 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
     else:
-        binary_str = dict.complement(temporary[1])
-        result = dict.or_32(temporary[0], binary_str, line)
-        return result
+        return dict.alu_orn(temporary[0], temporary[1])
 
 def EOR(temporary, line):
     if len(temporary) < 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
     else:
-        result = dict.xor_32(temporary[0], temporary[1], line)
-        return result
+        return dict.alu_xor(temporary[0], temporary[1])
+
+def ADD(temporary, line):
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    return dict.alu_add(temporary[0], temporary[1])
 
+# ADC adds the carry flag in the same ALU operation so C and V describe the whole sum
 def ADC(temporary, line):
-    t = []
-    carry_in = condition_dict.get("c")
-    carry_in = carry_in.text()
-    carry_int = int(carry_in)
-    c = Encoder(carry_int)
-    result, _, _ = dict.add_32(temporary, line)
-    t.append(result[0])
-    t.append(c)
-    arguments, carry, overflow = dict.add_32(t, line)
-    return arguments, carry, overflow
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    return dict.alu_add(temporary[0], temporary[1], cpu_state.flag("c"))
 
+def SUB(temporary, line):
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    return dict.alu_sub(temporary[0], temporary[1])
+
+# SBC subtracts NOT carry, a clear carry flag means a borrow is pending
 def SBC(temporary, line):
-    t = []
-    carry_in = condition_dict.get("c")
-    carry_in = carry_in.text()
-    carry_int = int(carry_in)
-    if carry_int == 0:
-        carry_int = 1
-    elif carry_int == 1:
-        carry_int = 0
-    c = Encoder(carry_int)
-    result, _, _ = dict.sub_32(temporary, line)
-    t.append(result[0])
-    t.append(c)
-    arguments, carry, overflow = dict.sub_32(t, line)
-    return arguments, carry, overflow
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    return dict.alu_sub(temporary[0], temporary[1], cpu_state.flag("c"))
 
 def RSB(temporary, line):
-    t = temporary[0]
-    temporary[0] = temporary[1]
-    temporary[1] = t
-    arguments, carry, overflow = dict.sub_32(temporary, line)
-    return arguments, carry, overflow
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    return dict.alu_sub(temporary[1], temporary[0])
 
 def REV(temporary, line):
-    result = []
-    num = int(temporary[0], 16)
-    num_hex = format(num, "08x")
-    result_hex = dict.split_hex(num_hex)
-    result_hex = result_hex.split()
-    result_hex = "".join(byte for byte in result_hex)
-    result_int = int(result_hex, 16)
-    result_bin = Encoder(result_int)
-    result.append(result_bin)
-    return result
+    num = temporary[0]
+    result = int.from_bytes(num.to_bytes(4, "little"), "big")
+    return dict.alu_mov(result)
+# print(REV([0x12345678], "REV r0, r1"))  # should return (2018915346, 0, 0, 0, 0), 0x78563412
 
 def RBIT(temporary, line):
-    result = []
-    num = int(temporary[0], 16)
-    bin_str = Encoder(num)
-    result_bin = bin_str[::-1]
-    result.append(result_bin)
-    return result
+    num = temporary[0]
+    result = int(f"{num:032b}"[::-1], 2)
+    return dict.alu_mov(result)
+
+def MUL(temporary, line):
+    if len(temporary) != 2:
+        show_error("Undefined input for an arithmetic operation - " + line)
+        return None
+    return dict.alu_mul(temporary[0], temporary[1])
 
 def MLA(temporary, line):
     if len(temporary) != 3:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
-    temp_1 = []
-    temp_1.append(temporary[0])
-    temp_1.append(temporary[1])
-    t = dict.mul_32(temp_1, line)
-    temp_2 = []
-    temp_2.append(temporary[2])
-    temp_2.append(t[0])
-    result, _, _ = dict.add_32(temp_2, line)
-    return result
+    product, _, _, _, _ = dict.alu_mul(temporary[0], temporary[1])
+    return dict.alu_add(temporary[2], product)
 
 def MLS(temporary, line):
     if len(temporary) != 3:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+        show_error("Bad arguments to instruction - " + line)
         return None
-    temp_1 = []
-    temp_1.append(temporary[0])
-    temp_1.append(temporary[1])
-    t = dict.mul_32(temp_1, line)
-    temp_2 = []
-    temp_2.append(temporary[2])
-    temp_2.append(t[0])
-    result, _, _ = dict.sub_32(temp_2, line)
-    return result
+    product, _, _, _, _ = dict.alu_mul(temporary[0], temporary[1])
+    return dict.alu_sub(temporary[2], product)
 
+# the long multiply-accumulate instructions use reg[0] as the low word and reg[1] as the high word
 def UMLA(temporary, reg, line):
-    if len(temporary) != 2 or len(reg) == 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+    if len(temporary) != 2 or len(reg) != 2:
+        show_error("Bad arguments to instruction - " + line)
         return None
-    result = []
-    hi = line_edit_dict.get(reg[1])
-    num_hi_str = hi.text()
-    lo = line_edit_dict.get(reg[0])
-    num_lo_str = lo.text()
-    num_1_64bit = num_hi_str + num_lo_str
-    num_1 = int(num_1_64bit, 2)
-    t = dict.mul_64_unsigned(temporary, line)
-    num_2_64bit = t[1] + t[0]
-    num_2 = int(num_2_64bit, 2)
+    num_1 = (cpu_state.read(reg[1]) << 32) | cpu_state.read(reg[0])
+    lower_32, upper_32 = dict.alu_mul_64_unsigned(temporary[0], temporary[1])
+    num_2 = (upper_32 << 32) | lower_32
     num_result = num_1 + num_2
-    lower_32 = num_result & ((1 << 32) - 1)
-    upper_32 = (num_result >> 32) & ((1 << 32) - 1)
-    lower_32_str = f"{lower_32:032b}"
-    upper_32_str = f"{upper_32:032b}"
-    result.append(lower_32_str)
-    result.append(upper_32_str)
-    return result
+    return [num_result & MASK_32, (num_result >> 32) & MASK_32]
 
 def SMLA(temporary, reg, line):
-    if len(temporary) != 2 or len(reg) == 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+    if len(temporary) != 2 or len(reg) != 2:
+        show_error("Bad arguments to instruction - " + line)
         return None
-    result = []
-    hi = line_edit_dict.get(reg[1])
-    num_hi_str = hi.text()
-    lo = line_edit_dict.get(reg[0])
-    num_lo_str = lo.text()
-    num_1_64bit = num_hi_str + num_lo_str
-    num_1 = int(num_1_64bit, 2)
-    t = dict.mul_64_signed(temporary, line)
-    num_2_64bit = t[1] + t[0]
-    num_2 = int(num_2_64bit, 2)
+    num_1 = (cpu_state.read(reg[1]) << 32) | cpu_state.read(reg[0])
+    lower_32, upper_32 = dict.alu_mul_64_signed(temporary[0], temporary[1])
+    num_2 = (upper_32 << 32) | lower_32
     num_result = num_1 + num_2
-    lower_32 = num_result & ((1 << 32) - 1)
-    upper_32 = (num_result >> 32) & ((1 << 32) - 1)
-    lower_32_str = f"{lower_32:032b}"
-    upper_32_str = f"{upper_32:032b}"
-    result.append(lower_32_str)
-    result.append(upper_32_str)
-    return result
+    return [num_result & MASK_32, (num_result >> 32) & MASK_32]
 
 def UMLS(temporary, reg, line):
-    if len(temporary) != 2 or len(reg) == 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+    if len(temporary) != 2 or len(reg) != 2:
+        show_error("Bad arguments to instruction - " + line)
         return None
-    result = []
-    hi = line_edit_dict.get(reg[1])
-    num_hi_str = hi.text()
-    lo = line_edit_dict.get(reg[0])
-    num_lo_str = lo.text()
-    num_1_64bit = num_hi_str + num_lo_str
-    num_1 = int(num_1_64bit, 2)
-    t = dict.mul_64_unsigned(temporary, line)
-    num_2_64bit = t[1] + t[0]
-    num_2 = int(num_2_64bit, 2)
+    num_1 = (cpu_state.read(reg[1]) << 32) | cpu_state.read(reg[0])
+    lower_32, upper_32 = dict.alu_mul_64_unsigned(temporary[0], temporary[1])
+    num_2 = (upper_32 << 32) | lower_32
     num_result = num_1 - num_2
-    lower_32 = num_result & ((1 << 32) - 1)
-    upper_32 = (num_result >> 32) & ((1 << 32) - 1)
-    lower_32_str = f"{lower_32:032b}"
-    upper_32_str = f"{upper_32:032b}"
-    result.append(lower_32_str)
-    result.append(upper_32_str)
-    return result
+    return [num_result & MASK_32, (num_result >> 32) & MASK_32]
 
 def SMLS(temporary, reg, line):
-    if len(temporary) != 2 or len(reg) == 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Bad arguments to instruction - " + line)
+    if len(temporary) != 2 or len(reg) != 2:
+        show_error("Bad arguments to instruction - " + line)
         return None
-    result = []
-    hi = line_edit_dict.get(reg[1])
-    num_hi_str = hi.text()
-    lo = line_edit_dict.get(reg[0])
-    num_lo_str = lo.text()
-    num_1_64bit = num_hi_str + num_lo_str
-    num_1 = int(num_1_64bit, 2)
-    t = dict.mul_64_signed(temporary, line)
-    num_2_64bit = t[1] + t[0]
-    num_2 = int(num_2_64bit, 2)
+    num_1 = (cpu_state.read(reg[1]) << 32) | cpu_state.read(reg[0])
+    lower_32, upper_32 = dict.alu_mul_64_signed(temporary[0], temporary[1])
+    num_2 = (upper_32 << 32) | lower_32
     num_result = num_1 - num_2
-    lower_32 = num_result & ((1 << 32) - 1)
-    upper_32 = (num_result >> 32) & ((1 << 32) - 1)
-    lower_32_str = f"{lower_32:032b}"
-    upper_32_str = f"{upper_32:032b}"
-    result.append(lower_32_str)
-    result.append(upper_32_str)
-    return result
+    return [num_result & MASK_32, (num_result >> 32) & MASK_32]
+
+def UMULL(temporary, reg, line):
+    return list(dict.alu_mul_64_unsigned(temporary[0], temporary[1]))
+
+def SMULL(temporary, reg, line):
+    return list(dict.alu_mul_64_signed(temporary[0], temporary[1]))
+
+def UDIV(temporary, reg, line):
+    return [dict.alu_div_unsigned(temporary[0], temporary[1])]
+
+def SDIV(temporary, reg, line):
+    return [dict.alu_div_signed(temporary[0], temporary[1])]
 
 def SAT(sat, num, instruction):
     arguments = []
     if instruction.lower() == "ssat":
         if num < -sat:
             result = -sat
-            result = Encoder(result)
-            arguments.append(result)
         elif num > sat - 1:
             result = sat - 1
-            result = Encoder(result)
-            arguments.append(result)
         else:
-            result = Encoder(num)
-            arguments.append(result)
+            result = num
+        arguments.append(result & MASK_32)
         return arguments
     elif instruction.lower() == "usat":
         if num < 0:
             result = 0
-            result = Encoder(result)
-            arguments.append(result)
         elif num > 2 * sat - 1:
             result = 2 * sat - 1
-            result = Encoder(result)
-            arguments.append(result)
         else:
-            result = Encoder(num)
-            arguments.append(result)
+            result = num
+        arguments.append(result & MASK_32)
         return arguments
     else:
         return None
 
-def LDR(hex_str, model):
-    result = dict.find_one_memory(model, hex_str)
-    result_int = dict.twos_complement_to_signed(result)
-    result = Encoder(result_int)
-    if result == None:
-        result = f"{0:032b}"
-    return result
-
-def LDR_B(hex_str, model_byte):
-    result = dict.find_one_memory_in_byte(model_byte, hex_str)
-    result_int = dict.twos_complement_to_signed(result)
-    result = Encoder(result_int)
-    if result == None:
-        result = f"{0:032b}"
-    return result
-
-def LDR_H(hex_str, model_byte):
-    result = dict.find_one_memory_in_halfword(model_byte, hex_str)
-    result_int = dict.twos_complement_to_signed(result)
-    result = Encoder(result_int)
-    if result == None:
-        result = f"{0:032b}"
-    return result
-
-def STR(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte):
-    line_edit = line_edit_dict.get(reg[0])
-    mem_replace = line_edit.text()
-    mapping = {key: value for key, value in zip(address, memory)}
-    try:
-        result = mapping.get(hex_str)
-        position = memory.index(result)
-        memory[position] = mem_replace
-    except ValueError:
-        pass
-    dict.replace_one_memory(model, hex_str, mem_replace)
-    dict.replace_one_memory(model_2, hex_str, mem_replace)
-    dict.replace_one_memory(model_4, hex_str, mem_replace)
-    dict.replace_one_memory(model_8, hex_str, mem_replace)
-    dict.replace_one_memory_byte(model_byte, hex_str, mem_replace)
-    dict.replace_one_memory_byte(model_2_byte, hex_str, mem_replace)
-    dict.replace_one_memory_byte(model_4_byte, hex_str, mem_replace)
-    dict.replace_one_memory_byte(model_8_byte, hex_str, mem_replace)
-
-def STR_B(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte):
-    line_edit = line_edit_dict.get(reg[0])
-    mem_replace = line_edit.text()
-    mapping = {key: value for key, value in zip(address, memory)}
-    try:
-        result = mapping.get(hex_str)
-        position = memory.index(result)
-        memory[position] = mem_replace
-    except ValueError:
-        pass
-    dict.replace_one_memory_in_byte(model, hex_str, mem_replace)
-    dict.replace_one_memory_in_byte(model_2, hex_str, mem_replace)
-    dict.replace_one_memory_in_byte(model_4, hex_str, mem_replace)
-    dict.replace_one_memory_in_byte(model_8, hex_str, mem_replace)
-    dict.replace_one_memory_byte_in_byte(model_byte, hex_str, mem_replace)
-    dict.replace_one_memory_byte_in_byte(model_2_byte, hex_str, mem_replace)
-    dict.replace_one_memory_byte_in_byte(model_4_byte, hex_str, mem_replace)
-    dict.replace_one_memory_byte_in_byte(model_8_byte, hex_str, mem_replace)
-
-def STR_H(reg, hex_str, address, memory, model, model_2, model_4, model_8, model_byte, model_2_byte, model_4_byte, model_8_byte):
-    line_edit = line_edit_dict.get(reg[0])
-    mem_replace = line_edit.text()
-    mapping = {key: value for key, value in zip(address, memory)}
-    try:
-        result = mapping.get(hex_str)
-        position = memory.index(result)
-        memory[position] = mem_replace
-    except ValueError:
-        pass
-    dict.replace_one_memory_in_halfword(model, hex_str, mem_replace)
-    dict.replace_one_memory_in_halfword(model_2, hex_str, mem_replace)
-    dict.replace_one_memory_in_halfword(model_4, hex_str, mem_replace)
-    dict.replace_one_memory_in_halfword(model_8, hex_str, mem_replace)
-    dict.replace_one_memory_halfword_in_byte(model_byte, hex_str, mem_replace)
-    dict.replace_one_memory_halfword_in_byte(model_2_byte, hex_str, mem_replace)
-    dict.replace_one_memory_halfword_in_byte(model_4_byte, hex_str, mem_replace)
-    dict.replace_one_memory_halfword_in_byte(model_8_byte, hex_str, mem_replace)
-
+# instruction name -> implementation, looked up once per executed instruction
+command_handler_dict = {
+    "mov": MOV, "mvn": MVN,
+    "lsr": LSR_C, "lsl": LSL_C, "asr": ASR_C, "ror": ROR_C, "rrx": RRX_C,
+    "and": AND, "bic": BIC, "orr": ORR, "orn": ORN, "eor": EOR,
+    "add": ADD, "adc": ADC, "sub": SUB, "sbc": SBC, "rsb": RSB,
+    "cmp": SUB, "cmn": ADD, "tst": AND, "teq": EOR,
+    "rev": REV, "rbit": RBIT,
+    "mul": MUL, "mla": MLA, "mls": MLS,
+}
+
+shift_handler_dict = {
+    "lsr": LSR_C, "lsl": LSL_C, "asr": ASR_C, "ror": ROR_C, "rrx": RRX_C,
+}
+
+# (base instruction, 0 unsigned / 1 signed) -> implementation of the 64-bit and divide instructions
+long_handler_dict = {
+    ("mul", 0): UMULL, ("mul", 1): SMULL,
+    ("mla", 0): UMLA, ("mla", 1): SMLA,
+    ("mls", 0): UMLS, ("mls", 1): SMLS,
+    ("div", 0): UDIV, ("div", 1): SDIV,
+}
+
+# loads and stores go straight to guest memory, little-endian at any byte address
+# data_access_hook sees each access first when it is set
+def LDR(address):
+    if data_access_hook:
+        data_access_hook(address, 4, False)
+    return guest_memory.read32(address)
+
+def LDR_B(address):
+    if data_access_hook:
+        data_access_hook(address, 1, False)
+    return guest_memory.read8(address)
+
+def LDR_H(address):
+    if data_access_hook:
+        data_access_hook(address, 2, False)
+    return guest_memory.read16(address)
+
+def STR(value, address):
+    if data_access_hook:
+        data_access_hook(address, 4, True)
+    guest_memory.write32(address, value)
+
+def STR_B(value, address):
+    if data_access_hook:
+        data_access_hook(address, 1, True)
+    guest_memory.write8(address, value)
+
+def STR_H(value, address):
+    if data_access_hook:
+        data_access_hook(address, 2, True)
+    guest_memory.write16(address, value)
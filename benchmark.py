@@ -0,0 +1,196 @@
+# benchmark suite, assembles and runs every program in Demo/ and a few synthetic workloads without the GUI
+# usage: python -m benchmark [--repeat 5] [--output results.json] [--baseline baseline.json] [--tolerance 0.25]
+# assembly and execution are timed apart, every figure is taken over --repeat runs, the best run is compared
+# a baseline is an earlier --output file, a slower run or a different instruction count fails with exit code 1
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from engine import assemble, Engine
+from runner import DEFAULT_LIMIT
+
+DEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Demo")
+DEFAULT_REPEAT = 5
+# a run may be this much slower than the baseline before it counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# slowdowns smaller than this are timer noise on the short Demo programs
+NOISE_SECONDS = 0.002
+
+# data processing in a tight loop, one basic block per iteration
+ALU_LOOP = """
+mov r0, #0
+mov r1, #0
+loop:
+add r0, r0, #1
+eor r2, r1, r0
+add r1, r1, r2, lsl #1
+cmp r0, #20000
+bne loop
+"""
+
+# loads and stores over a 64 word buffer, 200 passes
+MEMORY_LOOP = """
+.text
+ldr r0, =buffer
+mov r3, #0
+outer:
+mov r1, #0
+inner:
+ldr r2, [r0, r1]
+add r2, r2, r3
+str r2, [r0, r1]
+add r1, r1, #4
+cmp r1, #256
+blt inner
+add r3, r3, #1
+cmp r3, #200
+blt outer
+.data
+buffer: .word """ + ", ".join(str(i) for i in range(1, 65)) + """
+length: .word 64
+"""
+
+# bl / bx lr with a push and pop in the callee
+CALL_LOOP = """
+mov r0, #0
+mov r4, #0
+loop:
+bl step
+add r4, r4, #1
+cmp r4, #5000
+blt loop
+b done
+step:
+push {r1, r2}
+add r0, r0, #3
+pop {r1, r2}
+bx lr
+done:
+mov r1, r0
+"""
+
+# name -> source of the synthetic workloads
+synthetic_program_dict = {
+    "synthetic/alu_loop": ALU_LOOP,
+    "synthetic/memory_loop": MEMORY_LOOP,
+    "synthetic/call_loop": CALL_LOOP,
+}
+
+# (name, source) of every Demo/*.s file and synthetic workload
+def load_programs(demo_dir=DEMO_DIR):
+    programs = []
+    for path in sorted(glob.glob(os.path.join(demo_dir, "*.s"))):
+        with open(path) as file:
+            programs.append(("Demo/" + os.path.basename(path), file.read()))
+    programs.extend(synthetic_program_dict.items())
+    return programs
+
+# times repeat assemblies and runs of one program, returns the figures as a dict or raises ValueError
+def measure(text, repeat, compiled=True, limit=DEFAULT_LIMIT):
+    assemble_times = []
+    run_times = []
+    instructions = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image, error = assemble(text)
+        assemble_times.append(time.perf_counter() - start)
+        if error:
+            raise ValueError(error)
+        engine = Engine(compiled=compiled)
+        engine.load(image)
+        start = time.perf_counter()
+        executed = engine.run(limit)
+        run_times.append(time.perf_counter() - start)
+        if instructions is not None and executed != instructions:
+            raise ValueError("instruction count changed between runs: %d, %d" % (instructions, executed))
+        instructions = executed
+    best = min(run_times)
+    return {
+        "instructions": instructions,
+        "assemble_seconds": min(assemble_times),
+        "assemble_seconds_median": statistics.median(assemble_times),
+        "run_seconds": best,
+        "run_seconds_median": statistics.median(run_times),
+        "wall_seconds": min(a + r for a, r in zip(assemble_times, run_times)),
+        "instructions_per_second": instructions / best if best else 0.0,
+    }
+
+# regressions of results against a baseline, one message each
+# a program missing from either side is reported but is not a regression
+def compare(results, baseline, tolerance):
+    regressions = []
+    notes = []
+    for name, old in baseline["results"].items():
+        new = results["results"].get(name)
+        if new is None:
+            notes.append("%s: not in this run" % name)
+            continue
+        if new["instructions"] != old["instructions"]:
+            regressions.append("%s: %d instructions, baseline %d" % (name, new["instructions"], old["instructions"]))
+        if new["run_seconds"] > old["run_seconds"] * (1 + tolerance) and new["run_seconds"] - old["run_seconds"] > NOISE_SECONDS:
+            regressions.append("%s: run %.4fs, baseline %.4fs (+%.0f%%)" % (
+                name, new["run_seconds"], old["run_seconds"], 100 * (new["run_seconds"] / old["run_seconds"] - 1)))
+    for name in results["results"]:
+        if name not in baseline["results"]:
+            notes.append("%s: not in the baseline" % name)
+    return regressions, notes
+
+def format_table(results):
+    lines = ["%-28s %10s %11s %11s %13s" % ("program", "instr", "assemble s", "run s", "instr/s")]
+    for name, result in results["results"].items():
+        lines.append("%-28s %10d %11.4f %11.4f %13.0f" % (name, result["instructions"], result["assemble_seconds"],
+                                                         result["run_seconds"], result["instructions_per_second"]))
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Time the Demo programs and synthetic workloads")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per program, the best one is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown, 0.25 is 25%%")
+    parser.add_argument("--interpret", action="store_true", help="interpret one instruction at a time instead of compiled blocks")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="stop each run after this many instructions")
+    args = parser.parse_args(argv)
+    try:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        programs = load_programs()
+    except (OSError, ValueError) as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "compiled": not args.interpret,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for name, text in programs:
+        try:
+            results["results"][name] = measure(text, args.repeat, not args.interpret, args.limit)
+        except ValueError as e:
+            print("Error: %s: %s" % (name, e), file=sys.stderr)
+            return 1
+    print(format_table(results))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if baseline:
+        regressions, notes = compare(results, baseline, args.tolerance)
+        for note in notes:
+            print("note: " + note)
+        for regression in regressions:
+            print("REGRESSION: " + regression, file=sys.stderr)
+        if regressions:
+            return 1
+        print("no regressions against " + args.baseline)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+# basic block compiler used by Engine when it runs with compiled=True
+# the decoded program is split at labels and branches into basic blocks, each block is turned once into the
+# source of one Python function that works directly on the register list, the packed NZCV flags and guest memory,
+# so a loop iteration is a few function calls instead of one decode/dispatch per instruction
+# instructions without a specialised form call their assembly.py handler from inside the block
+# while the engine has a trace recorder, the blocks are compiled with the statements that record each instruction
+from collections import namedtuple
+import assembly
+from assembly import (Opcode, LOAD_OPCODES, OPERAND_REGISTER, OPERAND_IMMEDIATE, OPERAND_SHIFT_IMMEDIATE,
+                      ADDRESS_LITERAL, ADDRESS_LITERAL_VALUE, ADDRESS_OFFSET)
+from cpu import cpu_state, condition_table, MASK_32
+from guest_memory import guest_memory
+import dict
+from execution_trace import written_registers, INFO_REGISTER, INFO_LOAD, INFO_STORE, INFO_CONTINUATION
+
+# instructions that end a basic block, the next index is decided by the instruction
+BLOCK_END_OPCODES = {Opcode.B, Opcode.BL, Opcode.BX, Opcode.POP}
+
+# start index, number of instructions, set of instruction addresses and the compiled function
+# the function executes all the instructions of the block and returns the index of the next instruction
+Block = namedtuple("Block", ["start", "length", "addresses", "function"])
+
+# data processing results without flags, a and b are the source expressions
+result_expression_dict = {
+    Opcode.MOV: "{a}",
+    Opcode.ADD: "({a} + {b}) & 0xFFFFFFFF",
+    Opcode.ADC: "({a} + {b} + ((cpu.nzcv >> 1) & 1)) & 0xFFFFFFFF",
+    Opcode.SUB: "({a} - {b}) & 0xFFFFFFFF",
+    Opcode.SBC: "({a} - {b} - 1 + ((cpu.nzcv >> 1) & 1)) & 0xFFFFFFFF",
+    Opcode.RSB: "({b} - {a}) & 0xFFFFFFFF",
+    Opcode.AND: "{a} & {b}",
+    Opcode.ORR: "{a} | {b}",
+    Opcode.EOR: "{a} ^ {b}",
+    Opcode.BIC: "{a} & ~{b} & 0xFFFFFFFF",
+    Opcode.ORN: "({a} | ~{b}) & 0xFFFFFFFF",
+    Opcode.MUL: "({a} * {b}) & 0xFFFFFFFF",
+}
+
+# ALU call giving (result, N, Z, C, V) for the instructions that set flags, like command_handler_dict
+alu_expression_dict = {
+    Opcode.MOV: "alu_mov({a})",
+    Opcode.LSL: "alu_lsl({a}, {b})",
+    Opcode.LSR: "alu_lsr({a}, {b})",
+    Opcode.ADD: "alu_add({a}, {b})", Opcode.CMN: "alu_add({a}, {b})",
+    Opcode.ADC: "alu_add({a}, {b}, (cpu.nzcv >> 1) & 1)",
+    Opcode.SUB: "alu_sub({a}, {b})", Opcode.CMP: "alu_sub({a}, {b})",
+    Opcode.SBC: "alu_sub({a}, {b}, (cpu.nzcv >> 1) & 1)",
+    Opcode.RSB: "alu_sub({b}, {a})",
+    Opcode.AND: "alu_and({a}, {b})", Opcode.TST: "alu_and({a}, {b})",
+    Opcode.ORR: "alu_or({a}, {b})",
+    Opcode.EOR: "alu_xor({a}, {b})", Opcode.TEQ: "alu_xor({a}, {b})",
+    Opcode.BIC: "alu_bic({a}, {b})",
+    Opcode.ORN: "alu_orn({a}, {b})",
+}
+
+load_expression_dict = {Opcode.LDR: "read32({a})", Opcode.LDRB: "read8({a})", Opcode.LDRH: "read16({a})"}
+store_statement_dict = {Opcode.STR: "write32({a}, {v})", Opcode.STRB: "write8({a}, {v})", Opcode.STRH: "write16({a}, {v})"}
+transfer_size_dict = {Opcode.LDR: 4, Opcode.LDRB: 1, Opcode.LDRH: 2, Opcode.STR: 4, Opcode.STRB: 1, Opcode.STRH: 2}
+
+# names the generated code can use
+compile_namespace = {
+    "r": cpu_state.registers, "cpu": cpu_state,
+    "read32": guest_memory.read32, "read16": guest_memory.read16, "read8": guest_memory.read8,
+    "write32": guest_memory.write32, "write16": guest_memory.write16, "write8": guest_memory.write8,
+    "alu_mov": dict.alu_mov, "alu_lsl": dict.alu_lsl, "alu_lsr": dict.alu_lsr,
+    "alu_add": dict.alu_add, "alu_sub": dict.alu_sub, "alu_and": dict.alu_and, "alu_or": dict.alu_or,
+    "alu_xor": dict.alu_xor, "alu_bic": dict.alu_bic, "alu_orn": dict.alu_orn,
+}
+for condition, table in condition_table.items():
+    if condition:
+        compile_namespace["condition_" + condition] = table
+
+# shift by a constant amount, the same results as alu_lsl / alu_lsr
+def shift_expression(value, shift, amount):
+    if amount == 0:
+        return value
+    if amount > 32:
+        return "0"
+    if shift == "lsl":
+        return "((" + value + " << " + str(amount) + ") & 0xFFFFFFFF)"
+    return "(" + value + " >> " + str(amount) + ")"
+# print(shift_expression("r[1]", "lsl", 2))  # output: ((r[1] << 2) & 0xFFFFFFFF)
+
+# Python expression of a decoded operand, like assembly.operand_value
+def operand_expression(operand):
+    if operand.kind == OPERAND_IMMEDIATE:
+        return str(operand.value)
+    value = "r[" + str(operand.value) + "]"
+    if operand.kind == OPERAND_REGISTER:
+        return value
+    if operand.kind == OPERAND_SHIFT_IMMEDIATE:
+        return shift_expression(value, operand.shift, operand.amount)
+    return "alu_" + operand.shift + "(" + value + ", r[" + str(operand.amount) + "])[0]"
+
+def reads_pc(instruction):
+    if 15 in instruction.registers:
+        return True
+    for operand in instruction.operands:
+        if operand.value == 15 and operand.kind != OPERAND_IMMEDIATE:
+            return True
+        if operand.kind not in (OPERAND_IMMEDIATE, OPERAND_SHIFT_IMMEDIATE) and operand.amount == 15:
+            return True
+    return False
+
+# flags of an ALU tuple written the way cpu_state.set_flags packs them
+FLAG_STATEMENT = "cpu.nzcv = (n << 3) | (z << 2) | (c << 1) | v"
+
+# statements of one instruction that does not end the block, or None to call the assembly.py handler
+def instruction_statements(instruction, name):
+    opcode = instruction.opcode
+    operands = [operand_expression(operand) for operand in instruction.operands]
+    if opcode in (Opcode.MOV, Opcode.LSL, Opcode.LSR, Opcode.ADD, Opcode.ADC, Opcode.SUB, Opcode.SBC, Opcode.RSB,
+                  Opcode.AND, Opcode.ORR, Opcode.EOR, Opcode.BIC, Opcode.ORN):
+        expected = 1 if opcode == Opcode.MOV else 2
+        if len(operands) < expected or (opcode in (Opcode.ADD, Opcode.ADC, Opcode.SUB, Opcode.SBC, Opcode.RSB) and len(operands) != 2):
+            return None
+        a = operands[0]
+        b = operands[1] if expected == 2 else None
+        rd = "r[" + str(instruction.registers[0]) + "]"
+        if instruction.set_flags:
+            return ["result, n, z, c, v = " + alu_expression_dict[opcode].format(a=a, b=b), rd + " = result", FLAG_STATEMENT]
+        if opcode in (Opcode.LSL, Opcode.LSR):
+            if instruction.operands[1].kind == OPERAND_IMMEDIATE:
+                return [rd + " = " + shift_expression(a, opcode.name.lower(), instruction.operands[1].value)]
+            return [rd + " = " + alu_expression_dict[opcode].format(a=a, b=b) + "[0]"]
+        return [rd + " = " + result_expression_dict[opcode].format(a=a, b=b)]
+    if opcode in (Opcode.CMP, Opcode.CMN, Opcode.TST, Opcode.TEQ):
+        return ["result, n, z, c, v = " + alu_expression_dict[opcode].format(a=operands[0], b=operands[1]), FLAG_STATEMENT]
+    if opcode == Opcode.MUL:
+        if len(operands) != 2:
+            return None
+        rd = "r[" + str(instruction.registers[0]) + "]"
+        statements = [rd + " = " + result_expression_dict[opcode].format(a=operands[0], b=operands[1])]
+        if instruction.set_flags:
+            statements.append("cpu.nzcv = ((" + rd + " >> 31) << 3) | ((" + rd + " == 0) << 2) | (cpu.nzcv & 3)")
+        return statements
+    if opcode in LOAD_OPCODES or opcode in store_statement_dict:
+        return transfer_statements(instruction, operands)
+    return None
+
+# Python expression of the address a load or store accesses, after transfer_statements
+def transfer_address(instruction):
+    if instruction.mode in (ADDRESS_LITERAL, ADDRESS_LITERAL_VALUE):
+        return str(instruction.immediate)
+    if instruction.operands and instruction.mode == ADDRESS_OFFSET:
+        return "offset_address"
+    return "address"
+
+# loads and stores, the same steps as assembly.execute_single_data_transfer
+def transfer_statements(instruction, operands):
+    opcode = instruction.opcode
+    rt, base = instruction.registers
+    statements = []
+    address = transfer_address(instruction)
+    if instruction.mode not in (ADDRESS_LITERAL, ADDRESS_LITERAL_VALUE):
+        statements.append("address = r[" + str(base) + "]")
+        if operands:
+            statements.append("offset_address = (address + " + operands[0] + ") & 0xFFFFFFFF")
+    if opcode in LOAD_OPCODES:
+        if instruction.mode == ADDRESS_LITERAL_VALUE:
+            statements.append("r[" + str(rt) + "] = " + address)
+        else:
+            statements.append("r[" + str(rt) + "] = " + load_expression_dict[opcode].format(a=address))
+    else:
+        statements.append(store_statement_dict[opcode].format(a=address, v="r[" + str(rt) + "]"))
+        # a store into the code invalidates the compiled blocks
+        statements.append("if code_start <= " + address + " < code_end: blocks.invalidate()")
+    if instruction.writeback:
+        statements.append("r[" + str(base) + "] = offset_address")
+    return statements
+
+# statements ending the block with a return of the next index
+def block_end_statements(instruction, name):
+    next_index = str(instruction.index + 1)
+    if instruction.opcode == Opcode.B:
+        return ["return " + str(instruction.target)]
+    if instruction.opcode == Opcode.BL:
+        return ["r[14] = " + str((instruction.address + 4) & MASK_32), "return " + str(instruction.target)]
+    return ["return handler_" + name + "(engine, instruction_" + name + ", " + next_index + ")"]
+
+# statements recording a specialised instruction to the trace, the same records TraceRecorder.executed makes
+# (a conditional load or store is not specialised in a traced block, it may or may not access memory)
+def trace_statements(instruction):
+    records = [[INFO_REGISTER | register << 8, "r[" + str(register) + "]", "0", "0"]
+               for register in written_registers(instruction)]
+    opcode = instruction.opcode
+    if opcode in transfer_size_dict and instruction.mode != ADDRESS_LITERAL_VALUE:
+        if not records:
+            records.append([0, "0", "0", "0"])
+        rt, base = instruction.registers
+        address = transfer_address(instruction)
+        size = transfer_size_dict[opcode]
+        if instruction.writeback and rt == base:
+            # rt already holds the written back address, the value is read again
+            data = ("read32({a})" if size == 4 else "read8({a})" if size == 1 else "read16({a})").format(a=address)
+        elif size == 4:
+            data = "r[" + str(rt) + "]"
+        else:
+            data = "(r[" + str(rt) + "] & " + str((1 << 8 * size) - 1) + ")"
+        records[0][0] |= (INFO_LOAD if opcode in LOAD_OPCODES else INFO_STORE) | size << 16
+        records[0][2] = address
+        records[0][3] = data
+    if not records:
+        records.append([0, "0", "0", "0"])
+    statements = []
+    for i, (info, value, address, data) in enumerate(records):
+        if i:
+            info |= INFO_CONTINUATION
+        statements.append("trace_emit((%d, cpu.nzcv | %d, %s, %s, %s))" % (instruction.address, info, value, address, data))
+    return statements
+# print(trace_statements(program[i]))  # output: ['trace_emit((8, cpu.nzcv | 272, r[1], 0, 0))'] when program[i] is mov r1, #5 at 8
+
+# splits the program into basic blocks and compiles them on first use
+class BlockCache:
+    def __init__(self, engine):
+        self.engine = engine
+        self.blocks = {}
+        # first index -> number of instructions of every block compiled so far, kept when the blocks are invalidated
+        self.lengths = {}
+        self.leaders = set()
+        self.code_start = self.code_end = 0
+
+    # block boundaries of a new program, the compiled blocks of the old one are dropped
+    def load(self, program):
+        self.blocks = {}
+        self.lengths = {}
+        self.leaders = {0}
+        for instruction in program:
+            if instruction.opcode in BLOCK_END_OPCODES:
+                self.leaders.add(instruction.index + 1)
+            if instruction.target is not None:
+                self.leaders.add(instruction.target)
+        if program:
+            self.code_start = program[0].address
+            self.code_end = program[-1].address + 4
+        else:
+            self.code_start = self.code_end = 0
+
+    def invalidate(self):
+        self.blocks.clear()
+
+    # compiled block starting at an instruction index
+    def block(self, start):
+        block = self.blocks.get(start)
+        if block is None:
+            block = self.compile(start)
+            self.blocks[start] = block
+            self.lengths[start] = block.length
+        return block
+
+    def compile(self, start):
+        program = self.engine.program
+        trace = self.engine.trace
+        namespace = compile_namespace.copy()
+        namespace.update({"engine": self.engine, "blocks": self, "code_start": self.code_start, "code_end": self.code_end})
+        if trace:
+            namespace.update({"trace_emit": trace.buffer.extend, "trace_record": trace.executed, "trace_buffer": trace.buffer,
+                              "trace_flush": trace.flush, "trace_chunk_words": trace.chunk_words})
+        lines = ["def block():"]
+        index = start
+        while True:
+            instruction = program[index]
+            name = str(index)
+            last = (instruction.opcode in BLOCK_END_OPCODES or index + 1 >= len(program)
+                    or index + 1 in self.leaders)
+            end = instruction.opcode in BLOCK_END_OPCODES
+            statements = None
+            if not end and not (trace and instruction.condition != "al" and instruction.opcode in transfer_size_dict):
+                statements = instruction_statements(instruction, name)
+            specialised = statements is not None
+            if statements is None and not end:
+                namespace["handler_" + name] = assembly.execute_handler_dict[instruction.opcode]
+                namespace["instruction_" + name] = instruction
+                statements = ["handler_" + name + "(engine, instruction_" + name + ", " + str(index + 1) + ")"]
+            if end:
+                namespace["handler_" + name] = assembly.execute_handler_dict[instruction.opcode]
+                namespace["instruction_" + name] = instruction
+                statements = block_end_statements(instruction, name)
+                # a traced block records the last instruction once it knows the next index
+                if trace:
+                    statements = ["next_index = " + statement[7:] if statement.startswith("return ") else statement
+                                  for statement in statements]
+                    if instruction.condition != "al":
+                        lines.append("    next_index = " + str(index + 1))
+            # the interpreter writes pc before every instruction, here only when it can be read and at the end
+            if last or reads_pc(instruction) or statements[-1].startswith("handler_"):
+                lines.append("    r[15] = " + str(instruction.address))
+            if trace:
+                if specialised:
+                    statements = statements + trace_statements(instruction)
+                else:
+                    statements = statements + ["trace_record(instruction_" + name + ", " + ("next_index" if end else str(index + 1)) + ")"]
+            if instruction.condition != "al":
+                lines.append("    if condition_" + instruction.condition + "[cpu.nzcv]:")
+                lines.extend("        " + statement for statement in statements)
+                # an instruction whose condition failed is traced with its pc and flags only
+                if trace:
+                    lines.append("    else:")
+                    lines.append("        trace_emit((%d, cpu.nzcv, 0, 0, 0))" % instruction.address)
+            else:
+                lines.extend("    " + statement for statement in statements)
+            if last:
+                break
+            index += 1
+        if trace:
+            lines.append("    if len(trace_buffer) >= trace_chunk_words: trace_flush()")
+            lines.append("    return " + ("next_index" if instruction.opcode in BLOCK_END_OPCODES else str(index + 1)))
+        elif instruction.opcode not in BLOCK_END_OPCODES or instruction.condition != "al":
+            lines.append("    return " + str(index + 1))
+        exec("\n".join(lines), namespace)
+        addresses = frozenset(program[i].address for i in range(start, index + 1))
+        return Block(start, index - start + 1, addresses, namespace["block"])
@@ -0,0 +1,279 @@
+# set-associative cache simulator
+# a Cache only keeps the tags of the lines it holds, the data stays in guest_memory, so it counts hits,
+# misses, evictions and writebacks without changing what the program computes
+# CacheSimulator puts an instruction cache on the fetch path and a data cache on LDR/STR/PUSH/POP
+import random
+import assembly
+
+WRITE_POLICIES = ["write-back", "write-through"]
+REPLACEMENT_POLICIES = ["lru", "fifo", "random"]
+
+# "size:line:ways[:write policy[:replacement]]" -> Cache keyword arguments
+def parse_cache_spec(text):
+    fields = text.split(":")
+    if len(fields) < 3 or len(fields) > 5:
+        raise ValueError("cache spec is size:line:ways[:write-back|write-through[:lru|fifo|random]], got " + text)
+    spec = {"size": int(fields[0]), "line_size": int(fields[1]), "associativity": int(fields[2])}
+    if len(fields) > 3:
+        spec["write_policy"] = fields[3]
+    if len(fields) > 4:
+        spec["replacement"] = fields[4]
+    return spec
+# print(parse_cache_spec("1024:16:2:write-through"))  # output: {'size': 1024, 'line_size': 16, 'associativity': 2, 'write_policy': 'write-through'}
+
+def is_power_of_two(value):
+    return value > 0 and value & (value - 1) == 0
+
+# write-back caches allocate on a write miss and write dirty lines back when they are evicted,
+# write-through caches send every write to the next level and do not allocate on a write miss
+class Cache:
+    def __init__(self, size=1024, line_size=16, associativity=2, write_policy="write-back", replacement="lru", seed=0):
+        if not is_power_of_two(size) or not is_power_of_two(line_size) or not is_power_of_two(associativity):
+            raise ValueError("cache size, line size and associativity must be powers of two")
+        if size < line_size * associativity:
+            raise ValueError("cache of %d bytes cannot hold %d ways of %d byte lines" % (size, associativity, line_size))
+        if write_policy not in WRITE_POLICIES:
+            raise ValueError("write policy must be one of " + ", ".join(WRITE_POLICIES))
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError("replacement must be one of " + ", ".join(REPLACEMENT_POLICIES))
+        self.size = size
+        self.line_size = line_size
+        self.associativity = associativity
+        self.write_policy = write_policy
+        self.replacement = replacement
+        self.write_back = write_policy == "write-back"
+        self.line_bits = line_size.bit_length() - 1
+        self.set_mask = size // (line_size * associativity) - 1
+        self.random = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        # each set lists the line numbers (address >> line_bits) it holds, the next victim first
+        self.sets = [[] for _ in range(self.set_mask + 1)]
+        self.dirty = set()
+        self.reads = 0
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+        # writes sent to the next level by a write-through cache
+        self.write_throughs = 0
+        # address of the line the last access or insert evicted, or None, and whether it was dirty
+        self.evicted = None
+        self.evicted_dirty = False
+        # index of the instruction the next accesses are counted for
+        self.index = 0
+        # instruction index -> [accesses, hits, misses, evictions]
+        self.line_stats = {}
+
+    # one access to the line holding address, returns True on a hit
+    def access(self, address, write=False):
+        line = address >> self.line_bits
+        ways = self.sets[line & self.set_mask]
+        stats = self.line_stats.get(self.index)
+        if stats is None:
+            stats = self.line_stats[self.index] = [0, 0, 0, 0]
+        stats[0] += 1
+        self.evicted = None
+        if write:
+            self.writes += 1
+        else:
+            self.reads += 1
+        if line in ways:
+            self.hits += 1
+            stats[1] += 1
+            if self.replacement == "lru" and ways[-1] != line:
+                ways.remove(line)
+                ways.append(line)
+            if write:
+                if self.write_back:
+                    self.dirty.add(line)
+                else:
+                    self.write_throughs += 1
+            return True
+        self.misses += 1
+        stats[2] += 1
+        if write and not self.write_back:
+            self.write_throughs += 1
+            return False
+        if len(ways) == self.associativity:
+            self.evict(ways)
+            stats[3] += 1
+        ways.append(line)
+        if write:
+            self.dirty.add(line)
+        return False
+
+    # removes the next victim of a full set
+    def evict(self, ways):
+        if self.replacement == "random":
+            victim = ways.pop(self.random.randrange(self.associativity))
+        else:
+            victim = ways.pop(0)
+        self.evictions += 1
+        self.evicted = victim << self.line_bits
+        self.evicted_dirty = victim in self.dirty
+        if self.evicted_dirty:
+            self.dirty.discard(victim)
+            self.writebacks += 1
+
+    # the operations below are used by the levels of hierarchy.py, they do not count as accesses
+    # except take(), which is the access an exclusive level sees
+
+    def contains(self, address):
+        line = address >> self.line_bits
+        return line in self.sets[line & self.set_mask]
+
+    def mark_dirty(self, address):
+        self.dirty.add(address >> self.line_bits)
+
+    # removes a line, returns True if it was dirty
+    def invalidate(self, address):
+        line = address >> self.line_bits
+        ways = self.sets[line & self.set_mask]
+        if line not in ways:
+            return False
+        ways.remove(line)
+        dirty = line in self.dirty
+        self.dirty.discard(line)
+        return dirty
+
+    # places a line evicted by the level above, evicting a line of this cache if the set is full
+    def insert(self, address, dirty):
+        line = address >> self.line_bits
+        ways = self.sets[line & self.set_mask]
+        self.evicted = None
+        if line in ways:
+            ways.remove(line)
+        elif len(ways) == self.associativity:
+            self.evict(ways)
+        ways.append(line)
+        if dirty:
+            self.dirty.add(line)
+
+    # an access that moves the line out to the level above: returns (hit, dirty) and removes the line on a hit
+    def take(self, address):
+        stats = self.line_stats.get(self.index)
+        if stats is None:
+            stats = self.line_stats[self.index] = [0, 0, 0, 0]
+        stats[0] += 1
+        self.reads += 1
+        self.evicted = None
+        if self.contains(address):
+            self.hits += 1
+            stats[1] += 1
+            return True, self.invalidate(address)
+        self.misses += 1
+        stats[2] += 1
+        return False, False
+
+    def miss_rate(self):
+        accesses = self.hits + self.misses
+        return self.misses / accesses if accesses else 0.0
+
+    def report(self, program):
+        lines = []
+        for index in sorted(self.line_stats):
+            accesses, hits, misses, evictions = self.line_stats[index]
+            lines.append({
+                "address": format(program[index].address, '08x'),
+                "line": program[index].line,
+                "accesses": accesses,
+                "hits": hits,
+                "misses": misses,
+                "evictions": evictions,
+                "miss_rate": round(misses / accesses, 4),
+            })
+        return {
+            "size": self.size,
+            "line_size": self.line_size,
+            "associativity": self.associativity,
+            "write_policy": self.write_policy,
+            "replacement": self.replacement,
+            "reads": self.reads,
+            "writes": self.writes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "writebacks": self.writebacks,
+            "write_throughs": self.write_throughs,
+            "miss_rate": round(self.miss_rate(), 4),
+            "lines": lines,
+        }
+
+# L1 instruction and data caches on a running Engine, either one can be None
+# attach() makes it an engine observer and the assembly.data_access_hook (the hook it replaces, like a
+# History's, is still called), detach() undoes both
+class CacheSimulator:
+    def __init__(self, icache=None, dcache=None):
+        self.icache = icache
+        self.dcache = dcache
+        self.engine = None
+        self.previous_hook = None
+        # index of the instruction the accesses are counted for
+        self.index = 0
+        # an access that runs past the smallest line also touches the next one
+        # without any cache (a MemoryHierarchy of main memory only) every word goes to memory
+        self.line_size = min((cache.line_size for cache in self.caches()), default=4)
+        # True once the instruction about to finish has been fetched
+        self.fetched = False
+
+    def attach(self, engine):
+        self.engine = engine
+        self.fetched = False
+        self.set_index(engine.current_line_index)
+        engine.observers.append(self)
+        self.previous_hook = assembly.data_access_hook
+        assembly.data_access_hook = self.data_access
+
+    def detach(self):
+        if self in self.engine.observers:
+            self.engine.observers.remove(self)
+        if assembly.data_access_hook == self.data_access:
+            assembly.data_access_hook = self.previous_hook
+
+    def caches(self):
+        return [cache for cache in (self.icache, self.dcache) if cache]
+
+    def set_index(self, index):
+        self.index = index
+        for cache in self.caches():
+            cache.index = index
+
+    # the fetch comes before the data accesses of an instruction, it is made by the first of them
+    # or after the instruction when it had none
+    def fetch(self):
+        self.fetched = True
+        self.access_instruction(self.engine.program[self.index].address)
+
+    def data_access(self, address, size, write):
+        if not self.fetched:
+            self.fetch()
+        self.access_data(address, write)
+        if (address & (self.line_size - 1)) + size > self.line_size:
+            self.access_data(address + size - 1, write)
+        if self.previous_hook:
+            self.previous_hook(address, size, write)
+
+    def access_instruction(self, address):
+        if self.icache:
+            self.icache.access(address)
+
+    def access_data(self, address, write):
+        if self.dcache:
+            self.dcache.access(address, write)
+
+    def executed(self, instruction, next_index):
+        if not self.fetched:
+            self.fetch()
+        self.fetched = False
+        self.set_index(next_index)
+
+    def report(self, program):
+        report = {}
+        if self.icache:
+            report["icache"] = self.icache.report(program)
+        if self.dcache:
+            report["dcache"] = self.dcache.report(program)
+        return report
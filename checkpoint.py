@@ -0,0 +1,103 @@
+# simulator checkpoints, the complete machine state in one file so a run can stop and resume later
+# or many workers can start from the same warmed up state without running the prefix again
+# a checkpoint holds the registers, NZCV, the index of the next instruction, the stack, every memory page
+# that is not all 0xaa, the assembled image (without the decoded program, which is decoded again on load)
+# and the source text
+# file layout: HEADER (magic, version), then zlib compressed: state length, state as JSON, pages
+# each page is its number as a little endian 32-bit word followed by its PAGE_SIZE bytes
+import json
+import struct
+import zlib
+import assembly
+from cpu import cpu_state
+from guest_memory import guest_memory, PAGE_SIZE
+from engine import Image
+
+MAGIC = b"ARMCHKPT"
+VERSION = 1
+HEADER = struct.Struct("<8sH")
+LENGTH = struct.Struct("<I")
+# image fields kept in the file, program is decoded again from lines_clean
+IMAGE_FIELDS = ["lines", "lines_clean", "labels", "data_labels", "address", "words"]
+
+# bytes of a checkpoint of the engine's current state
+def encode_checkpoint(engine, image, source=""):
+    state = {
+        "registers": list(cpu_state.registers),
+        "nzcv": cpu_state.nzcv,
+        "current_line_index": engine.current_line_index,
+        "stacked": list(engine.stacked),
+        "image": {field: getattr(image, field) for field in IMAGE_FIELDS},
+        "source": source,
+    }
+    text = json.dumps(state, separators=(",", ":")).encode()
+    parts = [LENGTH.pack(len(text)), text]
+    for number in sorted(guest_memory.pages):
+        page = guest_memory.pages[number]
+        if page != guest_memory.blank_page:
+            parts.append(LENGTH.pack(number))
+            parts.append(bytes(page))
+    return HEADER.pack(MAGIC, VERSION) + zlib.compress(b"".join(parts))
+
+# (state dict, {page number: bytes}) of checkpoint bytes, raises ValueError for anything else
+def decode_checkpoint(data):
+    if len(data) < HEADER.size:
+        raise ValueError("not a checkpoint file")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a checkpoint file")
+    if version != VERSION:
+        raise ValueError("checkpoint version %d, this simulator reads version %d" % (version, VERSION))
+    try:
+        body = zlib.decompress(data[HEADER.size:])
+        size = LENGTH.unpack_from(body)[0]
+        state = json.loads(body[LENGTH.size:LENGTH.size + size])
+    except (zlib.error, struct.error, ValueError):
+        raise ValueError("checkpoint file is damaged")
+    pages = {}
+    offset = LENGTH.size + size
+    record = LENGTH.size + PAGE_SIZE
+    if (len(body) - offset) % record:
+        raise ValueError("checkpoint file is damaged")
+    for start in range(offset, len(body), record):
+        pages[LENGTH.unpack_from(body, start)[0]] = body[start + LENGTH.size:start + record]
+    return state, pages
+
+def save_checkpoint(path, engine, image, source=""):
+    data = encode_checkpoint(engine, image, source)
+    with open(path, "wb") as file:
+        file.write(data)
+    return len(data)
+
+# restores a checkpoint into the engine, cpu_state and guest_memory
+# returns (image, source), raises ValueError for a file that is not a checkpoint of this version
+def load_checkpoint(path, engine):
+    with open(path, "rb") as file:
+        state, pages = decode_checkpoint(file.read())
+    image = checkpoint_image(state)
+    restore_checkpoint(engine, image, state, pages)
+    return image, state["source"]
+
+# the image saved in a decoded checkpoint, with its program decoded again
+def checkpoint_image(state):
+    fields = state["image"]
+    program, error = assembly.decode_program(fields["lines_clean"], fields["labels"], fields["address"], fields["data_labels"])
+    if error:
+        raise ValueError("checkpoint program does not decode: " + error)
+    return Image(program=program, **fields)
+
+# puts a decoded checkpoint into the engine, image is the checkpoint's image with its decoded program
+def restore_checkpoint(engine, image, state, pages):
+    cpu_state.reset()
+    guest_memory.reset()
+    for number, page in pages.items():
+        guest_memory.pages[number] = bytearray(page)
+    # cpu_state.registers is changed in place, the compiled blocks hold on to the list
+    cpu_state.registers[:] = state["registers"]
+    cpu_state.nzcv = state["nzcv"]
+    engine.set_program(image.program)
+    engine.current_line_index = state["current_line_index"]
+    engine.stacked[:] = state["stacked"]
+    # the history starts at the restored state, not at the program's first instruction
+    if engine.history:
+        engine.history.restart()
@@ -0,0 +1,120 @@
+# CPU state (register file + condition flags) shared by the execution path
+
+# register name to index in the register file
+# sp (r13) is the stack pointer, lr (r14) is the link register, pc (r15) is the program counter
+register_index_dict = {
+    "r0": 0, "r1": 1, "r2": 2, "r3": 3,
+    "r4": 4, "r5": 5, "r6": 6, "r7": 7,
+    "r8": 8, "r9": 9, "r10": 10, "r11": 11,
+    "r12": 12, "r13": 13, "r14": 14, "r15": 15,
+    "sp": 13, "lr": 14, "pc": 15,
+}
+
+# display names in the same order as the register file
+register_names = ["r0", "r1", "r2", "r3", "r4", "r5", "r6", "r7",
+                  "r8", "r9", "r10", "r11", "r12", "sp", "lr", "pc"]
+
+# bit positions of the flags inside the packed NZCV nibble
+FLAG_N = 8
+FLAG_Z = 4
+FLAG_C = 2
+FLAG_V = 1
+
+flag_bit_dict = {
+    "n": FLAG_N,
+    "z": FLAG_Z,
+    "c": FLAG_C,
+    "v": FLAG_V,
+}
+
+MASK_32 = 0xFFFFFFFF
+
+class CpuState:
+    def __init__(self):
+        self.registers = [0] * 16
+        self.nzcv = 0
+
+    def reset(self):
+        for i in range(16):
+            self.registers[i] = 0
+        self.nzcv = 0
+
+    # read a register as an unsigned 32-bit integer
+    def read(self, name):
+        return self.registers[register_index_dict[name.lower()]]
+
+    # read a register as a signed 32-bit integer
+    def read_signed(self, name):
+        value = self.registers[register_index_dict[name.lower()]]
+        if value >= 0x80000000:
+            value -= 0x100000000
+        return value
+
+    # write a register, the value is wrapped to 32 bits
+    def write(self, name, value):
+        self.registers[register_index_dict[name.lower()]] = value & MASK_32
+
+    # read a single flag as 0 or 1
+    def flag(self, name):
+        return 1 if self.nzcv & flag_bit_dict[name.lower()] else 0
+
+    # write all four flags at once, each value can be 0/1 or '0'/'1'
+    def set_flags(self, n, z, c, v):
+        self.nzcv = ((FLAG_N if int(n) else 0) | (FLAG_Z if int(z) else 0)
+                     | (FLAG_C if int(c) else 0) | (FLAG_V if int(v) else 0))
+
+    # check if the condition is met based on the flags
+    def check_condition(self, condition):
+        table = condition_table.get(condition.lower())
+        if table is None:
+            return False
+        return table[self.nzcv]
+
+# evaluate a condition code against a packed NZCV value
+def evaluate_condition(condition, nzcv):
+    n = 1 if nzcv & FLAG_N else 0
+    z = 1 if nzcv & FLAG_Z else 0
+    c = 1 if nzcv & FLAG_C else 0
+    v = 1 if nzcv & FLAG_V else 0
+    if condition == "eq":
+        return z == 1
+    elif condition == "ne":
+        return z == 0
+    elif condition in ("cs", "hs"):
+        return c == 1
+    elif condition in ("cc", "lo"):
+        return c == 0
+    elif condition == "mi":
+        return n == 1
+    elif condition == "pl":
+        return n == 0
+    elif condition == "vs":
+        return v == 1
+    elif condition == "vc":
+        return v == 0
+    elif condition == "hi":
+        return c == 1 and z == 0
+    elif condition == "ls":
+        return c == 0 or z == 1
+    elif condition == "ge":
+        return n == v
+    elif condition == "lt":
+        return n != v
+    elif condition == "gt":
+        return z == 0 and n == v
+    elif condition == "le":
+        return z == 1 or n != v
+    elif condition == "al" or condition == "":
+        return True
+    else:
+        return False
+
+# every condition evaluated once for all 16 NZCV values
+condition_table = {}
+for condition in ("eq", "ne", "cs", "hs", "cc", "lo", "mi", "pl", "vs", "vc",
+                  "hi", "ls", "ge", "lt", "gt", "le", "al", ""):
+    condition_table[condition] = [evaluate_condition(condition, nzcv) for nzcv in range(16)]
+# print(condition_table["ge"][FLAG_N | FLAG_V])  # output: True
+
+# register file and flags used by the simulator
+cpu_state = CpuState()
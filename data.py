@@ -3,7 +3,7 @@ import string
 from encoder import Encoder
 from decoder import Decoder
 import dict
-from PyQt6 import QtWidgets
+from message import show_error
 
 VALID_TEXT = ".text"
 VALID_DATA = ".data"
@@ -110,9 +110,9 @@ def process_data(data_lines, address):
                             num_str = format(num, '08x')
                             data_memory.append(num_str)
                     else:
-                        for part in parts:
+                        for i, part in enumerate(parts):
                             address_data_base_str = format(address_data_base, '08x')
-                            if part == parts[0]:
+                            if i == 0:
                                 data_memory.append(address_data_base_str)
                             if regex_const.match(part):
                                 num = int(part)
@@ -135,7 +135,7 @@ def process_data(data_lines, address):
                         try:
                             size_in_bytes = int(parts[0])
                         except ValueError:
-                            QtWidgets.QMessageBox.critical(None, "Error", ".space specifies non-absolute value")
+                            show_error(".space specifies non-absolute value")
                             return None, None, None
                         if size_in_bytes % 4 == 0:
                             num_addr = size_in_bytes // 4
@@ -156,7 +156,7 @@ def process_data(data_lines, address):
                                 size_in_bytes = dict.twos_complement_to_signed(parts[0])
                                 fill_value = dict.twos_complement_to_signed(parts[1])
                         except ValueError:
-                            QtWidgets.QMessageBox.critical(None, "Error", ".space specifies non-absolute value")
+                            show_error(".space specifies non-absolute value")
                             return None, None, None
                         if size_in_bytes % 4 == 0:
                             num_addr = size_in_bytes // 4
@@ -1,8 +1,8 @@
 # look tables (opcodes, registers, etc.)
-from PyQt6 import QtCore, QtGui, QtWidgets
-from decoder import Decoder
+from message import show_error
 from encoder import Encoder
 import string
+from cpu import cpu_state, MASK_32
 
 line_edit_dict = {
     "r0": None,
@@ -163,9 +163,10 @@ def is_special_or_digit(word):
 # print (is_special_or_digit("hello"))  # False
 
 # parse labels from assembly lines
+# each label maps to the index of the first instruction after it, a label at the end maps to len(code_lines)
+# branches look their target up in this table instead of searching the lines for its text
 def parse_labels(lines):
-    labels = {}               # dictionary to hold label: [instructions]
-    current_label = None      # tracks the current label we're under
+    labels = {}               # dictionary to hold label: instruction index
     code_lines = []           # all actual instruction lines
 
     # remove empty or None lines
@@ -178,64 +179,154 @@ def parse_labels(lines):
 
     for line in cleaned_lines:
         if line.endswith(":") and not is_special_or_digit(line):
-            # found a label (e.g., 'loop:')
+            # found a label (e.g., 'loop:'), it points at the next instruction
             label_name = line[:-1]  # remove the colon
-            labels[label_name] = []
-            current_label = label_name
-        elif current_label:
-            # this line belongs to the last label we saw
-            labels[current_label].append(line)
-            code_lines.append(line)
+            labels[label_name] = len(code_lines)
         else:
-            # no label, just a standalone instruction
             code_lines.append(line)
 
     return labels, code_lines
-# lines = ["   mov r0, #1  ", "", "   ", None, "add r1, r2, #3"]
-# print(parse_labels(lines))
+# lines = ["   mov r0, #1  ", "", "loop:", None, "add r1, r2, #3"]
+# print(parse_labels(lines))  # output: ({'loop': 1}, ['mov r0, #1', 'add r1, r2, #3'])
 
 # check if the condition is met based on the flags
 def check_condition(condition):
-    # get flag values
-    n = condition_dict.get("n").text()
-    z = condition_dict.get("z").text()
-    c = condition_dict.get("c").text()
-    v = condition_dict.get("v").text()
-
-    condition = condition.lower()
-
-    if condition == "eq":
-        return z == '1'
-    elif condition == "ne":
-        return z == '0'
-    elif condition in ("cs", "hs"):
-        return c == '1'
-    elif condition in ("cc", "lo"):
-        return c == '0'
-    elif condition == "mi":
-        return n == '1'
-    elif condition == "pl":
-        return n == '0'
-    elif condition == "vs":
-        return v == '1'
-    elif condition == "vc":
-        return v == '0'
-    elif condition == "hi":
-        return c == '1' and z == '0'
-    elif condition == "ls":
-        return c == '0' or z == '1'
-    elif condition == "ge":
-        return n == v
-    elif condition == "lt":
-        return n != v
-    elif condition == "gt":
-        return z == '0' and n == v
-    elif condition == "le":
-        return z == '1' or n != v
-    elif condition == "al" or condition == "":
-        return True
+    return cpu_state.check_condition(condition)
+
+# integer ALU for 32-bit values
+# operands are unsigned 32-bit integers, every operation returns (result, N, Z, C, V) as ints
+
+# add with carry in, carry out is bit 32 and overflow is a sign change that the operands do not explain
+def alu_add(a, b, carry_in=0):
+    total = a + b + carry_in
+    result = total & MASK_32
+    carry = 1 if total > MASK_32 else 0
+    overflow = ((a ^ result) & (b ^ result)) >> 31
+    return result, result >> 31, 1 if result == 0 else 0, carry, overflow
+# print(alu_add(0xFFFFFFFF, 1))  # output: (0, 0, 1, 1, 0)
+
+# subtract with carry in, carry out is set when no borrow happens
+def alu_sub(a, b, carry_in=1):
+    total = a - b - (1 - carry_in)
+    result = total & MASK_32
+    carry = 1 if total >= 0 else 0
+    overflow = ((a ^ b) & (a ^ result)) >> 31
+    return result, result >> 31, 1 if result == 0 else 0, carry, overflow
+# print(alu_sub(10, 5))  # output: (5, 0, 0, 1, 0)
+
+def alu_and(a, b):
+    result = a & b
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+def alu_or(a, b):
+    result = a | b
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+def alu_xor(a, b):
+    result = a ^ b
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+def alu_bic(a, b):
+    result = a & ~b & MASK_32
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+def alu_orn(a, b):
+    result = (a | ~b) & MASK_32
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+def alu_mov(a):
+    return a, a >> 31, 1 if a == 0 else 0, 0, 0
+
+def alu_mvn(a):
+    result = ~a & MASK_32
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+# LSL, the carry is the last bit shifted out, no shifting gives carry 0
+def alu_lsl(a, amount):
+    if amount == 0:
+        result = a
+        carry = 0
+    elif amount <= 32:
+        carry = (a >> (32 - amount)) & 1
+        result = (a << amount) & MASK_32
     else:
-        return False
+        result = carry = 0
+    return result, result >> 31, 1 if result == 0 else 0, carry, 0
+# print(alu_lsl(0x80000001, 1))  # output: (2, 0, 0, 1, 0)
+
+def alu_lsr(a, amount):
+    if amount == 0:
+        result = a
+        carry = 0
+    elif amount <= 32:
+        carry = (a >> (amount - 1)) & 1
+        result = a >> amount
+    else:
+        result = carry = 0
+    return result, result >> 31, 1 if result == 0 else 0, carry, 0
+
+def alu_asr(a, amount):
+    signed = a - (1 << 32) if a >> 31 else a
+    if amount == 0:
+        result = a
+        carry = 0
+    elif amount < 32:
+        carry = (signed >> (amount - 1)) & 1
+        result = (signed >> amount) & MASK_32
+    else:
+        carry = a >> 31
+        result = MASK_32 if carry else 0
+    return result, result >> 31, 1 if result == 0 else 0, carry, 0
+
+def alu_ror(a, amount):
+    if amount == 0:
+        result = a
+        carry = 0
+    else:
+        amount %= 32
+        result = ((a >> amount) | (a << (32 - amount))) & MASK_32
+        carry = result >> 31
+    return result, result >> 31, 1 if result == 0 else 0, carry, 0
+
+# RRX rotates right by one bit through the carry flag
+def alu_rrx(a, carry_in):
+    result = (carry_in << 31) | (a >> 1)
+    return result, result >> 31, 1 if result == 0 else 0, a & 1, 0
+
+def alu_mul(a, b):
+    result = (a * b) & MASK_32
+    return result, result >> 31, 1 if result == 0 else 0, 0, 0
+
+# 64-bit products are returned as (low word, high word)
+def alu_mul_64_unsigned(a, b):
+    result = a * b
+    return result & MASK_32, (result >> 32) & MASK_32
+
+def alu_mul_64_signed(a, b):
+    result = to_signed_32(a) * to_signed_32(b)
+    return result & MASK_32, (result >> 32) & MASK_32
+
+# division by zero gives 0, signed division rounds toward zero
+def alu_div_unsigned(a, b):
+    if b == 0:
+        return 0
+    return a // b
+
+def alu_div_signed(a, b):
+    a = to_signed_32(a)
+    b = to_signed_32(b)
+    if b == 0:
+        return 0
+    result = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        result = -result
+    return result & MASK_32
+
+def to_signed_32(a):
+    if a >= 0x80000000:
+        return a - 0x100000000
+    return a
+# print(to_signed_32(0xFFFFFFFE))  # output: -2
 
 # LSL (Left Shift Logical) 32-bit carry
 def l_shift_32_c(a, shift_val, line):
@@ -245,17 +336,9 @@ def l_shift_32_c(a, shift_val, line):
     if not (is_valid_a and is_valid_shift):
         print(f"Error: Invalid input for left shift operation in line '{line}'")
         return None, None
-    carry = None
-
-    # no shifting is needed, carry is '0'
-    if shift_val == 0:
-        carry = '0'
-    else:
-        for i in range(shift_val):
-            carry = a[0]
-            a = a[1:] + '0'
-    result.append(a)
-    return result, carry
+    value, _, _, carry, _ = alu_lsl(int(a, 2), shift_val)
+    result.append(f"{value:032b}")
+    return result, str(carry)
 # a = '00000000000000000000000000001010'
 # shift_val = 2
 # result, carry = l_shift_32_c(a, shift_val, "example line")
@@ -269,22 +352,15 @@ def r_shift_32_c(a, shift_val, line):
     if not (is_valid_a and is_valid_shift):
         print(f"Error: Invalid input for right shift operation in line '{line}'")
         return None, None
-    carry = None
-
-    # no shifting is needed, carry is '0'
-    if shift_val == 0:
-        carry = '0'
-    else:
-        for i in range(shift_val):
-            carry = a[-1]
-            a = '0' + a[:-1]
-    result.append(a)
-    return result, carry
+    value, _, _, carry, _ = alu_lsr(int(a, 2), shift_val)
+    result.append(f"{value:032b}")
+    return result, str(carry)
 # a = '00000000000000000000000000001010'
 # shift_val = 2
 # result, carry = ror_shift_32_c(a, shift_val, "example line")
 # print(result)  # output: ['10000000000000000000000000001010']
 
+# the binary string operations below are kept for backward compatibility, they wrap the integer ALU
 # AND logic operation for 32-bit binary strings
 def and_32(str1, str2, line):
     result = []
@@ -297,16 +373,8 @@ def and_32(str1, str2, line):
         print(f"Error: Invalid input for AND logic operation in line '{line}'")
         return None
 
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 & num2
-    result_str = f"{result_int:032b}"
-
-    # optional decoding/encoding step
-    result_str = Decoder(result_str)
-    result_str = Encoder(result_str)
-
-    result.append(result_str)
+    result_int, _, _, _, _ = alu_and(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
     return result
 # str1 = '11110000111100001111000011110000'
 # str2 = '10101010101010101010101010101010'
@@ -325,16 +393,8 @@ def or_32(str1, str2, line):
         print(f"Error: Invalid input for OR logic operation in line '{line}'")
         return None
 
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 | num2
-    result_str = f"{result_int:032b}"
-
-    # optional: Decoder and Encoder processing
-    result_str = Decoder(result_str)
-    result_str = Encoder(result_str)
-
-    result.append(result_str)
+    result_int, _, _, _, _ = alu_or(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
     return result
 # str1 = '11110000111100001111000011110000'
 # str2 = '10101010101010101010101010101010'
@@ -353,16 +413,8 @@ def xor_32(str1, str2, line):
         print(f"Error: Invalid input for XOR logic operation in line '{line}'")
         return None
 
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 ^ num2
-    result_str = f"{result_int:032b}"
-
-    # Optional: Decoder and Encoder processing
-    result_str = Decoder(result_str)
-    result_str = Encoder(result_str)
-
-    result.append(result_str)
+    result_int, _, _, _, _ = alu_xor(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
     return result
 # str1 = '11110000111100001111000011110000'
 # str2 = '10101010101010101010101010101010'
@@ -372,23 +424,16 @@ def xor_32(str1, str2, line):
 def sub_32(temporary, line):
     result = []
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 - num2
-    carry = '1' if result_int >= 0 else '0'
-    result_str = f"{result_int:032b}"
-    overflow = detect_overflow_sub(str1, str2, result_str)
-    result_str = Decoder(result_str)
-    result_str = Encoder(result_str)
-    result.append(result_str)
-    return result, carry, overflow
+    result_int, _, _, carry, overflow = alu_sub(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
+    return result, str(carry), str(overflow)
 
 # detect overflow in subtraction operation
 def detect_overflow_sub(a, b, res):
@@ -404,23 +449,16 @@ def detect_overflow_sub(a, b, res):
 def add_32(temporary, line):
     result = []
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 + num2
-    carry = '1' if (result_int >> 32) & 1 else '0'
-    result_str = f"{result_int & ((1 << 32) - 1):032b}"
-    overflow = detect_overflow_add(str1, str2, result_str)
-    result_str = Decoder(result_str)
-    result_str = Encoder(result_str)
-    result.append(result_str)
-    return result, carry, overflow
+    result_int, _, _, carry, overflow = alu_add(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
+    return result, str(carry), str(overflow)
 
 # detect overflow in addition operation
 def detect_overflow_add(a, b, res):
@@ -436,20 +474,15 @@ def detect_overflow_add(a, b, res):
 def mul_32(temporary, line):
     result = []
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 * num2
-    result_str = f"{result_int & ((1 << 32) - 1):032b}"
-    result_str = Decoder(result_str)
-    result_str = Encoder(result_str)
-    result.append(result_str)
+    result_int, _, _, _, _ = alu_mul(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
     return result
 # print(mul_32(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000101010']
 
@@ -457,22 +490,16 @@ def mul_32(temporary, line):
 def mul_64_unsigned(temporary, line):
     result = []
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    result_int = num1 * num2
-    lower_32 = result_int & ((1 << 32) - 1)
-    upper_32 = (result_int >> 32) & ((1 << 32) - 1)
-    lower_32_str = f"{lower_32:032b}"
-    upper_32_str = f"{upper_32:032b}"
-    result.append(lower_32_str)
-    result.append(upper_32_str)
+    lower_32, upper_32 = alu_mul_64_unsigned(int(str1, 2), int(str2, 2))
+    result.append(f"{lower_32:032b}")
+    result.append(f"{upper_32:032b}")
     return result
 # print(mul_64_unsigned(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000110010', '00000000000000000000000000000000']
 
@@ -480,86 +507,50 @@ def mul_64_unsigned(temporary, line):
 def mul_64_signed(temporary, line):
     result = []
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    if num1 >= 2**31:
-        num1 -= 2**32
-    num2 = int(str2, 2)
-    if num2 >= 2**31:
-        num2 -= 2**32
-    result_int = num1 * num2
-    lower_32 = result_int & ((1 << 32) - 1)
-    upper_32 = (result_int >> 32) & ((1 << 32) - 1)
-    if lower_32 >= 2**31:
-        lower_32 -= 2**32
-    if upper_32 >= 2**31:
-        upper_32 -= 2**32
-    lower_32_str = f"{lower_32 & ((1 << 32) - 1):032b}"
-    upper_32_str = f"{upper_32 & ((1 << 32) - 1):032b}"
-    result.append(lower_32_str)
-    result.append(upper_32_str)
+    lower_32, upper_32 = alu_mul_64_signed(int(str1, 2), int(str2, 2))
+    result.append(f"{lower_32:032b}")
+    result.append(f"{upper_32:032b}")
     return result
 # print(mul_64_signed(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000110010', '00000000000000000000000000000000']
 
 # division operation for 32-bit binary strings (unsigned)
 def divide_32_unsigned(temporary, line):
-    print(temporary)
     result = []
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    num2 = int(str2, 2)
-    if num2 == 0:
-        result_str = Encoder(0)
-        result.append(result_str)
-        return result
-    result_int = num1 // num2
-    result_str = f"{result_int:032b}"
-    result.append(result_str)
+    result_int = alu_div_unsigned(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
     return result
-# print(divide_32_unsigned(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000001010', '00000000000000000000000000000101'] ['00000000000000000000000000000100']
+# print(divide_32_unsigned(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000000010']
 
 # division operation for 32-bit binary strings (signed)
 def divide_32_signed(temporary, line):
     result = []
-    print(temporary)
     if len(temporary) != 2:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
     str1 = temporary[0]
     str2 = temporary[1]
     if not isinstance(str1, str) or not isinstance(str2, str) or len(str1) != 32 or len(str2) != 32:
-        QtWidgets.QMessageBox.critical(None, "Error", "Undefined input for an arithmetic operation - " + line)
+        show_error("Undefined input for an arithmetic operation - " + line)
         return None
-    num1 = int(str1, 2)
-    if num1 >= 2**31:
-        num1 -= 2**32
-    num2 = int(str2, 2)
-    if num2 >= 2**31:
-        num2 -= 2**32
-    if num2 == 0:
-        result_str = Encoder(0)
-        result.append(result_str)
-        return result
-    result_int = num1 // num2
-    if result_int < 0:
-        result_int += 2**32
-    result_str = f"{result_int & ((1 << 32) - 1):032b}"
-    result.append(result_str)
+    result_int = alu_div_signed(int(str1, 2), int(str2, 2))
+    result.append(f"{result_int:032b}")
     return result
-# print(divide_32_signed(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000000100']
+# print(divide_32_signed(['00000000000000000000000000001010', '00000000000000000000000000000101'], "example line"))  # output: ['00000000000000000000000000000010']
 
 # complement operation for binary strings
 def complement(binary_str):
@@ -641,534 +632,3 @@ def combine_hex(memory):
     hex_str = "".join(byte for byte in bytes_list)
     return hex_str
 # print(combine_hex("ef cd ab 90 78 56 34 12"))  # output: '1234567890abcdef'
-
-# replace memory addresses in a model data structure
-def replace_memory(model, listAddr, listMem):
-    replacement_dict = dict(zip(listAddr, listMem))
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        for address in listAddr:
-            text = QtGui.QStandardItem(replacement_dict[address])
-            text.setFlags(text.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            if int(address, 16) == int(addr, 16):
-                model.setItem(row, 1, text)
-            if addr_next and int(address, 16) > int(addr, 16) and int(address, 16) < int(addr_next, 16):
-                num = int((int(address, 16) - int(addr, 16)) / 4) + 1
-                model.setItem(row, num, text)
-            if not addr_next and int(address, 16) > int(addr, 16):
-                num = int((int(address, 16) - int(addr, 16)) / 4) + 1
-                model.setItem(row, num, text)
-
-
-# replace_memory_byte function to update memory model data
-def replace_memory_byte(model_byte, listAddr, listMem):
-    for i in range(len(listMem)):
-        listMem[i] = split_hex(listMem[i])
-    replacement_dict = dict(zip(listAddr, listMem))
-    max_row = model_byte.rowCount() - 1
-    for row in range(1, model_byte.rowCount()):
-        item_addr = model_byte.item(row, 0)
-        if row != max_row:
-            item_addr_next = model_byte.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        for address in listAddr:
-            text = QtGui.QStandardItem(replacement_dict[address])
-            if int(address, 16) == int(addr, 16):
-                model_byte.setItem(row, 1, text)
-            if addr_next and int(address, 16) > int(addr, 16) and int(address, 16) < int(addr_next, 16):
-                num = int((int(address, 16) - int(addr, 16)) / 4) + 1
-                model_byte.setItem(row, num, text)
-            if not addr_next and int(address, 16) > int(addr, 16):
-                num = int((int(address, 16) - int(addr, 16)) / 4) + 1
-                model_byte.setItem(row, num, text)
-    for i in range(len(listMem)):
-        listMem[i] = combine_hex(listMem[i])
-
-# find_one_memory function to search for a specific memory address
-def find_one_memory(model, addr_input):
-    mem = "00"
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            mem = model.item(row, 1).text()
-            found = True
-            return mem
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return mem
-
-# find_one_memory_in_byte function to search for a specific byte at an address
-def find_one_memory_in_byte(model_byte, addr_input):
-    mem_out = "00"
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    for row in range(1, model_byte.rowCount()):
-        item_addr = model_byte.item(row, 0)
-        if item_addr:
-            addr = item_addr.text()
-        if search_value - twos_complement_to_signed(addr) == 0:
-            mem = model_byte.item(row, 1).text()
-            mems = mem.split()
-            mem_out = mems[0]
-            found = True
-            return mem_out
-        elif search_value - twos_complement_to_signed(addr) == 1:
-            mem = model_byte.item(row, 1).text()
-            mems = mem.split()
-            mem_out = mems[1]
-            found = True
-            return mem_out
-        elif search_value - twos_complement_to_signed(addr) == 2:
-            mem = model_byte.item(row, 1).text()
-            mems = mem.split()
-            mem_out = mems[2]
-            found = True
-            return mem_out
-        elif search_value - twos_complement_to_signed(addr) == 3:
-            mem = model_byte.item(row, 1).text()
-            mems = mem.split()
-            mem_out = mems[3]
-            found = True
-            return mem_out
-    if not found:
-        last_item_value = twos_complement_to_signed(model_byte.item(model_byte.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return mem_out
-
-# find_one_memory_in_halfword function to search for a halfword at an address
-def find_one_memory_in_halfword(model_byte, addr_input):
-    mem_out = "0000"
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    for row in range(1, model_byte.rowCount()):
-        item_addr = model_byte.item(row, 0)
-        if item_addr:
-            addr = item_addr.text()
-        if search_value - twos_complement_to_signed(addr) == 0:
-            mem = model_byte.item(row, 1).text()
-            mems = mem.split()
-            mem_out = mems[1] + mems[0]
-            found = True
-            return mem_out
-        elif search_value - twos_complement_to_signed(addr) == 1:
-            found = True
-            return mem_out
-        elif search_value - twos_complement_to_signed(addr) == 2:
-            mem = model_byte.item(row, 1).text()
-            mems = mem.split()
-            mem_out = mems[3] + mems[2]
-            found = True
-            return mem_out
-        elif search_value - twos_complement_to_signed(addr) == 3:
-            found = True
-            return mem_out
-    if not found:
-        last_item_value = twos_complement_to_signed(model_byte.item(model_byte.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return mem_out
-
-# replace_one_memory function to update a specific memory address
-def replace_one_memory(model, addr_input, mem_input):
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model.item(row, 1).setText(mem_input)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int(((search_value - twos_complement_to_signed(addr)) / 4) + 1)
-            model.item(row, num).setText(mem_input)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int(((search_value - twos_complement_to_signed(addr, 16)) / 4) + 1)
-            model.item(row, num).setText(mem_input)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-
-# replace_one_memory_in_byte function to update a specific byte at an address
-def replace_one_memory_byte(model, addr_input, mem_input):
-    mem_input = split_hex(mem_input)
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model.item(row, 1).setText(mem_input)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model.item(row, num).setText(mem_input)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model.item(row, num).setText(mem_input)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-
-    mem_input = split_hex(mem_input)
-    mem_input = mem_input.split()
-    mem_input_byte = mem_input[0]
-    num_addr = int(addr_input, 16)
-    surplus = num_addr % 4
-    num_addr = num_addr - surplus
-    addr_input = format(num_addr, "08x")
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, 1).setText(model_text)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-
-# replace_one_memory_in_byte function to update a specific byte at an address
-def replace_one_memory_in_byte(model, addr_input, mem_input):
-    mem_input = split_hex(mem_input)
-    mem_input = mem_input.split()
-    mem_input_byte = mem_input[0]
-    num_addr = int(addr_input, 16)
-    surplus = num_addr % 4
-    num_addr = num_addr - surplus
-    addr_input = format(num_addr, "08x")
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, 1).setText(model_text)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-# model_data = [
-#     ["Address", "Col1", "Col2", "Col3", "Col4"],
-#     ["0x1000", "EF", "BE", "AD", "DE"],
-#     ["0x1010", "CE", "FA", "ED", "FE"]
-# ]
-# replace_one_memory_byte(model_data, "0x1000", "AABBCCDD")  # updates Col1 of row 1
-# replace_one_memory_byte(model_data, "0x1002", "11")        # updates Col3 of row 1
-# replace_one_memory_byte(model_data, "0x1014", "22")        # updates Col2 of row 2
-# print(model_data)
-
-def replace_one_memory_byte_in_byte(model, addr_input, mem_input):
-    mem_input = split_hex(mem_input)
-    mem_input = mem_input.split()
-    mem_input_byte = mem_input[0]
-    num_addr = int(addr_input, 16)
-    surplus = num_addr % 4
-    num_addr = num_addr - surplus
-    addr_input = format(num_addr, "08x")
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model_text = model.item(row, 1).text()
-            model_text_byte = model_text.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model_text = split_hex(model_text)
-            model.item(row, 1).setText(model_text)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = model_text.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model_text = split_hex(model_text)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = model_text.split()
-            model_text_byte[surplus] = mem_input_byte
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model_text = split_hex(model_text)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-
-# replace_one_memory_in_halfword function to update a specific halfword at an address
-def replace_one_memory_in_halfword(model, addr_input, mem_input):
-    mem_input = split_hex(mem_input)
-    mem_input = mem_input.split()
-    num_addr = int(addr_input, 16)
-    surplus = num_addr % 4
-    num_addr = num_addr - surplus
-    addr_input = format(num_addr, "08x")
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            if surplus == 0 or surplus == 2:
-                model_text_byte[0] = mem_input[0]
-                model_text_byte[1] = mem_input[1]
-            else:
-                model_text_byte[0] = "00"
-                model_text_byte[1] = "00"
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, 1).setText(model_text)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            if surplus == 0 or surplus == 2:
-                model_text_byte[0] = mem_input[0]
-                model_text_byte[1] = mem_input[1]
-            else:
-                model_text_byte[0] = "00"
-                model_text_byte[1] = "00"
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = split_hex(model_text)
-            model_text_byte = model_text_byte.split()
-            if surplus == 0 or surplus == 2:
-                model_text_byte[0] = mem_input[0]
-                model_text_byte[1] = mem_input[1]
-            else:
-                model_text_byte[0] = "00"
-                model_text_byte[1] = "00"
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-
-# replace_one_memory_halfword_in_byte function to update a specific halfword at an address
-def replace_one_memory_halfword_in_byte(model, addr_input, mem_input):
-    mem_input = split_hex(mem_input)
-    mem_input = mem_input.split()
-    num_addr = int(addr_input, 16)
-    surplus = num_addr % 4
-    num_addr = num_addr - surplus
-    addr_input = format(num_addr, "08x")
-    found = False
-    search_value  = twos_complement_to_signed(addr_input)
-    max_row = model.rowCount() - 1
-    for row in range(1, model.rowCount()):
-        item_addr = model.item(row, 0)
-        if row != max_row:
-            item_addr_next = model.item(row + 1, 0)
-            addr_next = item_addr_next.text()
-        if item_addr:
-            addr = item_addr.text()
-        if search_value == twos_complement_to_signed(addr):
-            model_text = model.item(row, 1).text()
-            model_text_byte = model_text.split()
-            if surplus == 0 or surplus == 2:
-                model_text_byte[0] = mem_input[0]
-                model_text_byte[1] = mem_input[1]
-            else:
-                model_text_byte[0] = "00"
-                model_text_byte[1] = "00"
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model_text = split_hex(model_text)
-            model.item(row, 1).setText(model_text)
-            found = True
-            return
-        if addr_next and search_value > twos_complement_to_signed(addr) and search_value < twos_complement_to_signed(addr_next):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = model_text.split()
-            if surplus == 0 or surplus == 2:
-                model_text_byte[0] = mem_input[0]
-                model_text_byte[1] = mem_input[1]
-            else:
-                model_text_byte[0] = "00"
-                model_text_byte[1] = "00"
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model_text = split_hex(model_text)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-        if not addr_next and search_value > twos_complement_to_signed(addr):
-            num = int((search_value - twos_complement_to_signed(addr)) / 4) + 1
-            model_text = model.item(row, 1).text()
-            model_text_byte = model_text.split()
-            if surplus == 0 or surplus == 2:
-                model_text_byte[0] = mem_input[0]
-                model_text_byte[1] = mem_input[1]
-            else:
-                model_text_byte[0] = "00"
-                model_text_byte[1] = "00"
-            model_text_byte.reverse()
-            model_text_byte = "".join(byte for byte in model_text_byte)
-            model_text = combine_hex(model_text_byte)
-            model_text = split_hex(model_text)
-            model.item(row, num).setText(model_text)
-            found = True
-            return
-    if not found:
-        last_item_value = twos_complement_to_signed(model.item(model.rowCount() - 1, 0).text())
-        if search_value < last_item_value:
-            return
-
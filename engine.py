@@ -0,0 +1,168 @@
+# assembles a program and runs it without the GUI
+# ui.py and the headless runner (runner.py) share this module, nothing here imports Qt
+from collections import namedtuple
+import assembly
+import data
+import memory
+from dict import parse_labels
+from decoder import Decoder
+from cpu import cpu_state
+from guest_memory import guest_memory
+from blocks import BlockCache
+from execution_profile import Profile
+
+INSTRUCTION_SIZE = 4
+
+# result of assembling a source text
+# lines keeps the label lines for the code view, lines_clean holds only the instructions,
+# address and words are the hex strings of the memory image, program is the decoded instruction tuple
+Image = namedtuple("Image", ["lines", "lines_clean", "labels", "data_labels", "address", "words", "program"])
+
+# copy of the cpu state taken between two instructions, sent to the GUI while a program runs
+Snapshot = namedtuple("Snapshot", ["registers", "nzcv", "current_line_index"])
+
+# assembles a source text, returns (Image, None) or (None, error message)
+def assemble(text):
+    lines = text.split("\n")
+    lines, data_lines = data.parse_data(lines)
+    labels, lines_clean = parse_labels(lines)
+    lines = [item for item in lines if item not in [" ", None]]
+    lines = [' '.join(item.split()) for item in lines if item.strip()]
+    lines_clean = [item for item in lines_clean if item not in [" ", None]]
+    lines_clean = [' '.join(item.split()) for item in lines_clean if item.strip()]
+    address = [format(INSTRUCTION_SIZE * index, '08x') for index in range(len(lines_clean))]
+    data_labels, data_address, data_memory = data.process_data(data_lines, address)
+    if data_address:
+        address.extend(data_address)
+    words = []
+    for index in range(len(lines_clean)):
+        memory_line = memory.encode_line(index, lines_clean, address, labels, data_labels)
+        # a line that does not encode leaves words shorter than address, reported as "Error memory" below
+        if memory_line:
+            words.append(format(Decoder(memory_line), '08x'))
+    if data_memory:
+        words.extend(data_memory)
+    if len(address) != len(words):
+        return None, "Error memory"
+    program, error = assembly.decode_program(lines_clean, labels, address, data_labels)
+    if error:
+        return None, error
+    return Image(lines, lines_clean, labels, data_labels, address, words, program), None
+# image, error = assemble("mov r0, #1\nadd r0, r0, #2")
+# print(image.words)  # output: ['e3a00001', 'e2800002']
+
+# runs a decoded program on cpu_state and guest_memory
+# program and stacked are the attributes assembly.execute_instruction reads, like on Ui_MainWindow
+# with compiled=True, run() executes whole basic blocks compiled by blocks.py, step() always interprets one instruction
+# observers get executed(instruction, next_index) after every instruction, run() steps one instruction
+# at a time while there are any (pipeline.py uses this)
+# profile counts the executions of every instruction, see execution_profile.py
+# trace is an execution_trace.TraceRecorder or None, unlike an observer it also records compiled blocks
+# history is a history.History or None, it keeps what stepping back needs
+class Engine:
+    def __init__(self, program=(), compiled=False):
+        self.program = program
+        self.stacked = []
+        self.current_line_index = 0
+        self.observers = []
+        self.trace = None
+        self.history = None
+        self.blocks = BlockCache(self) if compiled else None
+        self.profile = Profile()
+        self.set_program(program)
+
+    # resets the cpu, memory and stack and loads an assembled image
+    def load(self, image):
+        cpu_state.reset()
+        guest_memory.reset()
+        guest_memory.load_image(image.address, image.words)
+        self.set_program(image.program)
+
+    # replaces the decoded program, the compiled blocks of the old one are dropped
+    def set_program(self, program):
+        self.program = program
+        self.stacked = []
+        self.current_line_index = 0
+        if self.blocks:
+            self.blocks.load(program)
+        self.profile.reset(program, self.blocks.lengths if self.blocks else None)
+        if self.history:
+            self.history.restart()
+
+    def finished(self):
+        return self.current_line_index >= len(self.program)
+
+    # executes the instruction at current_line_index
+    def step(self):
+        index = self.current_line_index
+        instruction = self.program[index]
+        if self.history:
+            self.history.before_step(instruction)
+        trace = self.trace
+        # the condition is checked before the instruction can change the flags
+        skipped = trace is not None and not cpu_state.check_condition(instruction.condition)
+        cpu_state.write("pc", instruction.address)
+        self.current_line_index = assembly.execute_instruction(self, instruction)
+        self.profile.counts[index] += 1
+        if self.current_line_index != index + 1:
+            self.profile.taken[index] += 1
+        if trace:
+            if skipped:
+                trace.skipped(instruction)
+            else:
+                trace.executed(instruction, self.current_line_index)
+        for observer in self.observers:
+            observer.executed(instruction, self.current_line_index)
+
+    # True if the next instruction's address is in a set of breakpoint addresses
+    def at_breakpoint(self, breakpoints):
+        return not self.finished() and self.program[self.current_line_index].address in breakpoints
+
+    # executes until the program ends, limit instructions ran or a breakpoint address is reached
+    # the instruction the run starts on is not checked, so a run can resume from a breakpoint
+    # returns the number of instructions executed
+    def run(self, limit=None, breakpoints=()):
+        if self.blocks and not self.observers:
+            return self.run_blocks(limit, breakpoints)
+        executed = 0
+        while not self.finished() and (limit is None or executed < limit):
+            if executed and self.program[self.current_line_index].address in breakpoints:
+                break
+            self.step()
+            executed += 1
+        return executed
+
+    # run() with compiled blocks, a block that would pass the limit or holds a breakpoint is interpreted instead
+    def run_blocks(self, limit, breakpoints):
+        executed = 0
+        program = self.program
+        length = len(program)
+        block_for = self.blocks.block
+        runs = self.profile.block_runs
+        taken = self.profile.taken
+        history = self.history
+        index = self.current_line_index
+        while index < length and (limit is None or executed < limit):
+            if breakpoints and executed and program[index].address in breakpoints:
+                break
+            block = block_for(index)
+            size = block.length
+            if (limit is not None and size > limit - executed) or (breakpoints and not breakpoints.isdisjoint(block.addresses)):
+                self.current_line_index = index
+                self.step()
+                index = self.current_line_index
+                executed += 1
+                continue
+            if history is not None:
+                history.before_block(index, size)
+            next_index = block.function()
+            executed += size
+            runs[index] += 1
+            if next_index != index + size:
+                taken[index + size - 1] += 1
+            index = next_index
+        self.current_line_index = index
+        return executed
+
+    def snapshot(self):
+        return Snapshot(tuple(cpu_state.registers), cpu_state.nzcv, self.current_line_index)
@@ -0,0 +1,77 @@
+# per instruction execution profile, always on in Engine (not named profile.py, that would hide the standard module)
+# the engine only counts, in flat arrays indexed by instruction: executions of stepped instructions,
+# runs of compiled blocks (at the block's first index) and taken exits (at the instruction that left)
+# loads, stores and estimated cycles follow from those counts and the decoded instructions when a report is made
+from array import array
+from assembly import Opcode, LOAD_OPCODES, ADDRESS_LITERAL_VALUE
+from pipeline import BRANCH_PENALTY
+
+# rough cycles of one execution on a simple in-order core, a taken branch adds BRANCH_PENALTY
+cycle_cost_dict = {
+    Opcode.LDR: 2, Opcode.LDRB: 2, Opcode.LDRH: 2,
+    Opcode.MUL: 2, Opcode.MLA: 2, Opcode.MLS: 2,
+    Opcode.UMULL: 3, Opcode.SMULL: 3, Opcode.UMLAL: 3, Opcode.SMLAL: 3, Opcode.UMLSL: 3, Opcode.SMLSL: 3,
+    Opcode.UDIV: 12, Opcode.SDIV: 12,
+}
+STORE_OPCODES = {Opcode.STR, Opcode.STRB, Opcode.STRH}
+COLUMNS = ["address", "line", "executions", "taken", "loads", "stores", "cycles"]
+
+# (loads, stores, cycles) of one execution of an instruction, without the taken branch penalty
+# a conditional instruction is counted as if its condition passed
+def instruction_cost(instruction):
+    opcode = instruction.opcode
+    if opcode in LOAD_OPCODES:
+        return (0 if instruction.mode == ADDRESS_LITERAL_VALUE else 1), 0, cycle_cost_dict[opcode]
+    if opcode in STORE_OPCODES:
+        return 0, 1, 1
+    if opcode == Opcode.PUSH:
+        return 0, len(instruction.registers), 1 + len(instruction.registers)
+    if opcode == Opcode.POP:
+        return len(instruction.registers), 0, 1 + len(instruction.registers)
+    return 0, 0, cycle_cost_dict.get(opcode, 1)
+
+def zeros(size):
+    return array('Q', bytes(8 * size))
+
+class Profile:
+    def __init__(self, program=(), block_lengths=None):
+        self.reset(program, block_lengths)
+
+    # starts counting a new program, block_lengths maps a block's first index to its length (BlockCache.lengths)
+    def reset(self, program=(), block_lengths=None):
+        self.program = program
+        self.block_lengths = block_lengths if block_lengths is not None else {}
+        self.counts = zeros(len(program))
+        self.block_runs = zeros(len(program))
+        self.taken = zeros(len(program))
+
+    # executions of every instruction, the stepped ones plus every run of the blocks holding it
+    def executions(self):
+        executions = list(self.counts)
+        for start, runs in enumerate(self.block_runs):
+            if runs:
+                for index in range(start, start + self.block_lengths[start]):
+                    executions[index] += runs
+        return executions
+    # print(Profile(program, {0: 3}).executions())  # output: [1, 1, 1, 0] after one run of a 3 instruction block
+
+    # one row per instruction as a dict with COLUMNS keys, and the totals
+    def report(self):
+        executions = self.executions()
+        rows = []
+        totals = {"executions": 0, "taken": 0, "loads": 0, "stores": 0, "cycles": 0}
+        for instruction, count, taken in zip(self.program, executions, self.taken):
+            loads, stores, cycles = instruction_cost(instruction)
+            row = {
+                "address": format(instruction.address, '08x'),
+                "line": instruction.line,
+                "executions": count,
+                "taken": taken,
+                "loads": loads * count,
+                "stores": stores * count,
+                "cycles": cycles * count + BRANCH_PENALTY * taken,
+            }
+            for key in totals:
+                totals[key] += row[key]
+            rows.append(row)
+        return {"totals": totals, "lines": rows}
@@ -0,0 +1,287 @@
+# binary execution trace for debugging long runs offline
+# every executed instruction gives one fixed width record: pc, flags after it, the register it wrote with the
+# new value and the address and value of its memory access; an instruction that writes more registers or
+# makes more accesses (LDR with writeback, PUSH/POP, long multiplies) adds continuation records, one whose
+# condition failed gives a single record with only pc and flags
+# records are collected in arrays and a background thread writes them to the file in chunks,
+# TraceReader memory-maps a finished file
+# usage: python -m runner program.s --trace run.trace
+#        python -m execution_trace run.trace [--start 0] [--count 20] [--summary]
+import argparse
+import mmap
+import queue
+import struct
+import sys
+import threading
+from array import array
+import assembly
+from assembly import Opcode
+from cpu import cpu_state, register_names
+from guest_memory import guest_memory
+from pipeline import register_use, FLAGS
+
+MAGIC = b"ARMTRACE"
+VERSION = 1
+# magic, version, words per record, number of records (written when the trace is closed)
+HEADER = struct.Struct("<8sHHQ")
+# pc, info, register value, memory address, memory value, little endian
+RECORD = struct.Struct("<5I")
+RECORD_WORDS = 5
+
+# info word: bits 0-3 NZCV, bits 4-7 the kinds below, bits 8-11 register, bits 16-23 access size in bytes
+INFO_REGISTER = 0x10
+INFO_LOAD = 0x20
+INFO_STORE = 0x40
+# the record belongs to the same instruction as the one before it
+INFO_CONTINUATION = 0x80
+
+# records per chunk handed to the writer thread, 64K records is 1.25 MiB
+CHUNK_RECORDS = 65536
+# chunks waiting for the writer, the run waits when the disk falls this far behind
+QUEUE_CHUNKS = 16
+
+read_dict = {1: guest_memory.read8, 2: guest_memory.read16, 4: guest_memory.read32}
+
+# registers an instruction writes, besides pc and the flags
+def written_registers(instruction):
+    _, writes, loads = register_use(instruction)
+    registers = []
+    for register in writes + loads:
+        if register != FLAGS and register != 15 and register not in registers:
+            registers.append(register)
+    return registers
+# print(written_registers(program[i]))  # output: [0, 1] when program[i] is ldr r1, [r0], #4
+
+# records the instructions an Engine executes to a trace file
+# attach() makes it the engine's trace and the assembly.data_access_hook (the hook it replaces, like a
+# cache simulator's, is still called), close() writes the last records and the header
+# step() calls executed() after each instruction, or skipped() when its condition failed, compiled blocks
+# append their records to buffer themselves (blocks.trace_statements) and only call executed() for the
+# instructions they hand to an assembly.py handler
+class TraceRecorder:
+    def __init__(self, path, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.chunk_words = chunk_records * RECORD_WORDS
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_WORDS, 0))
+        # records handed to the writer so far
+        self.records = 0
+        # the compiled blocks hold on to buffer, flush() empties it instead of replacing it
+        self.buffer = array('I')
+        self.engine = None
+        self.previous_hook = None
+        # (address, size, write) of the data accesses of the instruction being executed
+        self.accesses = []
+        # instruction index -> written_registers, filled in on attach
+        self.writes = []
+        # an exception of the writer thread, raised again by close()
+        self.error = None
+        self.chunks = queue.Queue(QUEUE_CHUNKS)
+        self.writer = threading.Thread(target=self.write_chunks, daemon=True)
+        self.writer.start()
+
+    def attach(self, engine):
+        self.engine = engine
+        self.writes = [written_registers(instruction) for instruction in engine.program]
+        self.previous_hook = assembly.data_access_hook
+        assembly.data_access_hook = self.data_access
+        engine.trace = self
+        if engine.blocks:
+            engine.blocks.invalidate()
+
+    def detach(self):
+        if self.engine.trace is self:
+            self.engine.trace = None
+            if self.engine.blocks:
+                self.engine.blocks.invalidate()
+        if assembly.data_access_hook == self.data_access:
+            assembly.data_access_hook = self.previous_hook
+
+    def data_access(self, address, size, write):
+        self.accesses.append((address, size, write))
+        if self.previous_hook:
+            self.previous_hook(address, size, write)
+
+    def executed(self, instruction, next_index):
+        registers = cpu_state.registers
+        nzcv = cpu_state.nzcv
+        writes = self.writes[instruction.index]
+        accesses = self.accesses
+        buffer = self.buffer
+        if not accesses:
+            # most instructions write one register or none
+            if len(writes) < 2:
+                if writes:
+                    buffer.extend((instruction.address, nzcv | INFO_REGISTER | writes[0] << 8, registers[writes[0]], 0, 0))
+                else:
+                    buffer.extend((instruction.address, nzcv, 0, 0, 0))
+                if len(buffer) >= self.chunk_words:
+                    self.flush()
+                return
+        for i in range(max(len(writes), len(accesses), 1)):
+            info = nzcv if i == 0 else nzcv | INFO_CONTINUATION
+            value = 0
+            address = 0
+            data = 0
+            if i < len(writes):
+                info |= INFO_REGISTER | writes[i] << 8
+                value = registers[writes[i]]
+            if i < len(accesses):
+                address, size, write = accesses[i]
+                info |= (INFO_STORE if write else INFO_LOAD) | size << 16
+                data = self.access_value(instruction, next_index, i, address, size)
+            buffer.extend((instruction.address, info, value, address, data))
+        accesses.clear()
+        if len(buffer) >= self.chunk_words:
+            self.flush()
+
+    def skipped(self, instruction):
+        buffer = self.buffer
+        buffer.extend((instruction.address, cpu_state.nzcv, 0, 0, 0))
+        if len(buffer) >= self.chunk_words:
+            self.flush()
+
+    # value of the i-th access of an instruction after it ran
+    # the stack words of PUSH/POP live in engine.stacked, not guest memory, so they come from the registers
+    def access_value(self, instruction, next_index, i, address, size):
+        if instruction.opcode == Opcode.PUSH:
+            return self.engine.stacked[i - len(instruction.registers)]
+        if instruction.opcode == Opcode.POP:
+            register = instruction.registers[i]
+            if register != 15:
+                return cpu_state.registers[register]
+            return self.engine.program[next_index].address if next_index < len(self.engine.program) else 0
+        return read_dict[size](address)
+
+    # hands the buffered records to the writer thread
+    def flush(self):
+        if self.buffer:
+            self.records += len(self.buffer) // RECORD_WORDS
+            self.chunks.put(self.buffer[:])
+            del self.buffer[:]
+
+    def write_chunks(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                return
+            if self.error:
+                continue
+            try:
+                if sys.byteorder == "big":
+                    chunk.byteswap()
+                chunk.tofile(self.file)
+            except OSError as e:
+                self.error = e
+
+    # writes the remaining records and the record count, raises OSError if a write failed
+    def close(self):
+        if self.engine:
+            self.detach()
+        self.flush()
+        self.chunks.put(None)
+        self.writer.join()
+        try:
+            if not self.error:
+                self.file.seek(0)
+                self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_WORDS, self.records))
+        finally:
+            self.file.close()
+        if self.error:
+            raise self.error
+
+# read only view of a trace file, records are read from the memory map as they are asked for
+# raises ValueError for a file that is not a finished trace
+class TraceReader:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            size = file.seek(0, 2)
+            if size < HEADER.size:
+                raise ValueError(path + " is not a trace file")
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, words, self.records = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or words != RECORD_WORDS:
+            self.map.close()
+            raise ValueError(path + " is not a version %d trace file" % VERSION)
+        if HEADER.size + self.records * RECORD.size > size:
+            self.map.close()
+            raise ValueError(path + " is truncated")
+
+    def __len__(self):
+        return self.records
+
+    # (pc, info, value, address, data) of record i
+    def record(self, i):
+        if not 0 <= i < self.records:
+            raise IndexError("record %d out of range" % i)
+        return RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size)
+
+    def __iter__(self):
+        return self.iterate(0, self.records)
+
+    def iterate(self, start, stop):
+        view = memoryview(self.map)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    # instructions, register writes, loads and stores in the trace
+    def summary(self):
+        instructions = 0
+        writes = 0
+        loads = 0
+        stores = 0
+        for _, info, _, _, _ in self:
+            if not info & INFO_CONTINUATION:
+                instructions += 1
+            if info & INFO_REGISTER:
+                writes += 1
+            if info & INFO_LOAD:
+                loads += 1
+            elif info & INFO_STORE:
+                stores += 1
+        return {"records": self.records, "instructions": instructions, "register_writes": writes,
+                "loads": loads, "stores": stores}
+
+    def close(self):
+        self.map.close()
+
+def format_record(i, record):
+    pc, info, value, address, data = record
+    flags = "".join(name if info & bit else "-" for name, bit in (("N", 8), ("Z", 4), ("C", 2), ("V", 1)))
+    text = "%10d %s %08x %s" % (i, "+" if info & INFO_CONTINUATION else " ", pc, flags)
+    if info & INFO_REGISTER:
+        text += "  %s=%08x" % (register_names[info >> 8 & 15], value)
+    if info & (INFO_LOAD | INFO_STORE):
+        text += "  %s%d [%08x]=%08x" % ("store" if info & INFO_STORE else "load", info >> 16 & 0xFF, address, data)
+    return text
+# print(format_record(0, (8, 0x14 | 1 << 8, 5, 0, 0)))  # output:          0   00000008 -Z--  r1=00000005
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m execution_trace", description="Print the records of a trace file")
+    parser.add_argument("file", help="trace written by python -m runner --trace")
+    parser.add_argument("--start", type=int, default=0, help="first record to print")
+    parser.add_argument("--count", type=int, default=20, help="records to print")
+    parser.add_argument("--summary", action="store_true", help="count instructions, register writes, loads and stores instead")
+    args = parser.parse_args(argv)
+    try:
+        reader = TraceReader(args.file)
+    except (OSError, ValueError) as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+    try:
+        if args.summary:
+            for key, value in reader.summary().items():
+                print("%-16s %d" % (key, value))
+        else:
+            start = max(args.start, 0)
+            stop = min(start + args.count, len(reader))
+            for i, record in enumerate(reader.iterate(start, stop), start):
+                print(format_record(i, record))
+    finally:
+        reader.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
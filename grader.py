@@ -0,0 +1,208 @@
+# batch grader, runs many student programs on a process pool and checks their final state
+# usage: python -m grader submissions/ [--expected expected/] [--jobs 8] [--limit 1000000] [--timeout 10] [--output results.jsonl]
+#        python -m grader manifest.jsonl [...]
+# a directory grades every .s file in it against the .json file of the same name (in --expected, or next to it)
+# a manifest is a JSON list or one JSON object per line: {"source": "a.s", "expected": "a.json" or {...},
+# "id": "...", "limit": 100000, "timeout": 5}, relative paths are relative to the manifest
+# an expected file looks like the output of python -m runner --json, every key is optional:
+# {"finished": true, "registers": {"r0": "00000078"}, "flags": {"Z": 1}, "memory": {"00000064": ["00000001"], "result": [120]}}
+# memory is keyed by a hex address or a data label, values are hex strings or integers
+# a label is checked from the first word of its data, {"array": [-7, 1, 2, 4, 5, 8]} is the whole list
+# one JSON line per program is written as soon as it is graded, so the order follows the finishing order
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from engine import assemble, Engine
+from cpu import cpu_state, register_index_dict
+from guest_memory import guest_memory
+from message import set_error_handler, print_error
+from runner import DEFAULT_LIMIT
+
+DEFAULT_TIMEOUT = 10.0
+# instructions run between two checks of the wall clock
+RUN_BATCH = 10000
+STATUSES = ["pass", "fail", "error", "limit", "timeout"]
+
+# "00000078", "0x78" or 120 -> 120
+def parse_value(value):
+    if isinstance(value, int):
+        return value & 0xFFFFFFFF
+    return int(value, 16) & 0xFFFFFFFF
+# print(parse_value("0x78"), parse_value(120))  # output: 120 120
+
+# address of a memory key, a hex address or a data label of the image
+# a label's slot after the code holds its word for an equ label and a pointer to its words otherwise
+def memory_address(key, image):
+    labels = image.data_labels
+    i = 0
+    while i < len(labels):
+        slot = labels[i + 1]
+        equ = i + 2 < len(labels) and labels[i + 2] == "equ"
+        if labels[i] == key:
+            if equ:
+                return int(slot, 16)
+            return int(image.words[image.address.index(slot)], 16)
+        i += 3 if equ else 2
+    return int(key, 16)
+# print("%x" % memory_address("array", image))  # output: 6c for Demo/bubble_sort.s, its slot 64 holds the pointer
+
+# differences between the machine state and an expected state, one message each
+def compare_state(expected, engine, image):
+    mismatches = []
+    if "finished" in expected and expected["finished"] != engine.finished():
+        mismatches.append("finished: %s, expected %s" % (engine.finished(), expected["finished"]))
+    for name, value in expected.get("registers", {}).items():
+        actual = cpu_state.registers[register_index_dict[name.lower()]]
+        if actual != parse_value(value):
+            mismatches.append("%s: %08x, expected %08x" % (name, actual, parse_value(value)))
+    for name, value in expected.get("flags", {}).items():
+        if cpu_state.flag(name) != int(value):
+            mismatches.append("%s flag: %d, expected %d" % (name.upper(), cpu_state.flag(name), int(value)))
+    for key, words in expected.get("memory", {}).items():
+        start = memory_address(key, image)
+        if not isinstance(words, list):
+            words = [words]
+        for i, word in enumerate(words):
+            actual = guest_memory.read32(start + 4 * i)
+            if actual != parse_value(word):
+                mismatches.append("memory %08x: %08x, expected %08x" % (start + 4 * i, actual, parse_value(word)))
+    return mismatches
+
+# grades one job in a worker process, the job is a dict from load_jobs, returns the result line as a dict
+# what the assembler and the simulator print goes to the result's messages, not to the JSON lines
+def grade(job, compiled=True):
+    messages = []
+    printed = io.StringIO()
+    set_error_handler(messages.append)
+    try:
+        with contextlib.redirect_stdout(printed):
+            result = grade_job(job, compiled)
+    finally:
+        set_error_handler(print_error)
+    messages.extend(line for line in printed.getvalue().splitlines() if line.strip())
+    if messages:
+        result["messages"] = messages
+    return result
+
+def grade_job(job, compiled):
+    result = {"id": job["id"], "source": job["source"], "status": "error", "instructions": 0}
+    start = time.perf_counter()
+    try:
+        expected = job["expected"]
+        if isinstance(expected, str):
+            with open(expected) as file:
+                expected = json.load(file)
+        with open(job["source"]) as file:
+            text = file.read()
+        image, error = assemble(text)
+        if error:
+            result["error"] = error
+            return result
+        engine = Engine(compiled=compiled)
+        engine.load(image)
+        limit = job["limit"]
+        deadline = time.monotonic() + job["timeout"]
+        executed = 0
+        while not engine.finished() and executed < limit:
+            if time.monotonic() > deadline:
+                result["status"] = "timeout"
+                return result
+            executed += engine.run(min(RUN_BATCH, limit - executed))
+            result["instructions"] = executed
+        if not engine.finished():
+            result["status"] = "limit"
+            return result
+        mismatches = compare_state(expected, engine, image)
+        result["status"] = "fail" if mismatches else "pass"
+        if mismatches:
+            result["mismatches"] = mismatches
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        result["error"] = "%s: %s" % (type(e).__name__, e)
+    except Exception as e:
+        # a program the simulator cannot run is that submission's error, the batch goes on
+        result["error"] = "simulator error %s: %s" % (type(e).__name__, e)
+    finally:
+        result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+# jobs of a directory of .s files or of a manifest, raises OSError or ValueError
+def load_jobs(path, expected_dir=None, limit=DEFAULT_LIMIT, timeout=DEFAULT_TIMEOUT):
+    jobs = []
+    if os.path.isdir(path):
+        for source in sorted(glob.glob(os.path.join(path, "*.s"))):
+            name = os.path.splitext(os.path.basename(source))[0]
+            expected = os.path.join(expected_dir or path, name + ".json")
+            jobs.append({"id": name, "source": source, "expected": expected, "limit": limit, "timeout": timeout})
+        return jobs
+    with open(path) as file:
+        text = file.read()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    base = os.path.dirname(os.path.abspath(path))
+    for i, entry in enumerate(entries):
+        if "source" not in entry or "expected" not in entry:
+            raise ValueError("manifest entry %d needs source and expected" % (i + 1))
+        expected = entry["expected"]
+        if isinstance(expected, str):
+            expected = os.path.join(base, expected)
+        jobs.append({
+            "id": str(entry.get("id", i + 1)),
+            "source": os.path.join(base, entry["source"]),
+            "expected": expected,
+            "limit": int(entry.get("limit", limit)),
+            "timeout": float(entry.get("timeout", timeout)),
+        })
+    return jobs
+
+# runs the jobs on a pool of worker processes and calls report(result) for each as it finishes
+# returns the number of results of each status
+def grade_all(jobs, workers=None, compiled=True, report=None):
+    counts = dict.fromkeys(STATUSES, 0)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(grade, job, compiled) for job in jobs]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            counts[result["status"]] += 1
+            if report:
+                report(result)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m grader", description="Grade a batch of programs against expected final states")
+    parser.add_argument("path", help="directory of .s files or a manifest (.json / .jsonl)")
+    parser.add_argument("--expected", metavar="DIR", help="directory of the expected .json files, default the program directory")
+    parser.add_argument("--jobs", type=int, help="worker processes, default one per core")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="instruction limit of each program")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="wall time limit of each program in seconds")
+    parser.add_argument("--interpret", action="store_true", help="interpret one instruction at a time instead of compiled blocks")
+    parser.add_argument("--output", help="write the JSON lines to this file instead of stdout")
+    args = parser.parse_args(argv)
+    try:
+        jobs = load_jobs(args.path, args.expected, args.limit, args.timeout)
+        output = open(args.output, "w") if args.output else sys.stdout
+    except (OSError, ValueError) as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+    def report(result):
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+    start = time.perf_counter()
+    try:
+        counts = grade_all(jobs, args.jobs, not args.interpret, report)
+    finally:
+        if args.output:
+            output.close()
+    print("graded %d programs in %.2fs: %s" % (len(jobs), time.perf_counter() - start,
+                                                ", ".join("%d %s" % (counts[status], status) for status in STATUSES)), file=sys.stderr)
+    return 0 if counts["pass"] == len(jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# guest memory shared by the execution path and the memory views
+# the 4 GiB address space is split into pages of bytes, a page is only allocated when it is first written
+# values are stored little-endian, an address that was never written reads as 0xaa
+
+PAGE_SIZE = 4096
+PAGE_MASK = PAGE_SIZE - 1
+ADDRESS_MASK = 0xFFFFFFFF
+DEFAULT_BYTE = 0xAA
+
+class GuestMemory:
+    def __init__(self):
+        self.pages = {}
+        self.blank_page = bytes([DEFAULT_BYTE]) * PAGE_SIZE
+        # word aligned addresses written since the views last read them
+        self.dirty_words = set()
+
+    def reset(self):
+        self.pages.clear()
+        self.dirty_words.clear()
+
+    # page holding an address, allocated on demand for writes
+    def page_for_write(self, address):
+        number = address // PAGE_SIZE
+        page = self.pages.get(number)
+        if page is None:
+            page = bytearray(self.blank_page)
+            self.pages[number] = page
+        return page
+
+    # read size bytes starting at an address
+    def read_bytes(self, address, size):
+        address &= ADDRESS_MASK
+        offset = address & PAGE_MASK
+        if offset + size <= PAGE_SIZE:
+            page = self.pages.get(address // PAGE_SIZE, self.blank_page)
+            return bytes(page[offset:offset + size])
+        # the access crosses a page boundary
+        return bytes(self.read8(address + i) for i in range(size))
+
+    # write a bytes object starting at an address
+    def write_bytes(self, address, data):
+        address &= ADDRESS_MASK
+        offset = address & PAGE_MASK
+        if offset + len(data) <= PAGE_SIZE:
+            self.page_for_write(address)[offset:offset + len(data)] = data
+        else:
+            for i in range(len(data)):
+                self.write8(address + i, data[i])
+        self.dirty_words.add(address & ~3)
+        if (address + len(data) - 1) & ~3 != address & ~3:
+            self.dirty_words.add((address + len(data) - 1) & ~3 & ADDRESS_MASK)
+
+    def read8(self, address):
+        address &= ADDRESS_MASK
+        page = self.pages.get(address // PAGE_SIZE)
+        if page is None:
+            return DEFAULT_BYTE
+        return page[address & PAGE_MASK]
+
+    def read16(self, address):
+        return int.from_bytes(self.read_bytes(address, 2), "little")
+
+    def read32(self, address):
+        return int.from_bytes(self.read_bytes(address, 4), "little")
+
+    def write8(self, address, value):
+        address &= ADDRESS_MASK
+        self.page_for_write(address)[address & PAGE_MASK] = value & 0xFF
+        self.dirty_words.add(address & ~3)
+
+    def write16(self, address, value):
+        self.write_bytes(address, (value & 0xFFFF).to_bytes(2, "little"))
+
+    def write32(self, address, value):
+        self.write_bytes(address, (value & ADDRESS_MASK).to_bytes(4, "little"))
+
+    # copies the assembled program into memory, addresses and words are the hex strings built by the assembler
+    def load_image(self, address, memory):
+        for i in range(min(len(address), len(memory))):
+            self.write32(int(address[i], 16), int(memory[i], 16))
+
+# word at an address as shown in the word view, e.g. "e92d4002"
+def format_word(memory, address):
+    return format(memory.read32(address), '08x')
+# print(format_word(guest_memory, 0))  # output: aaaaaaaa
+
+# bytes of a word in address order as shown in the byte view, e.g. "02 40 2d e9"
+def format_word_bytes(memory, address):
+    return " ".join(format(byte, '02x') for byte in memory.read_bytes(address, 4))
+
+# memory used by the simulator
+guest_memory = GuestMemory()
@@ -0,0 +1,168 @@
+# L1 / L2 / main memory hierarchy with latencies
+# every fetch and data access walks the levels below the L1 cache it starts at and adds up the hit latencies
+# of the levels it reached, the main memory latency if it got that far and the writeback cost of the dirty lines
+# it pushed out; what an access costs beyond the one cycle the pipeline already gives it is a stall
+from cache import CacheSimulator
+
+# cycles of an access the pipeline's IF or MEM stage covers, anything above is a stall
+PIPELINED_CYCLES = 1
+INCLUSION_POLICIES = ["inclusive", "exclusive"]
+
+# one cache of the hierarchy
+# inclusive: the level holds every line of the levels above it, evicting a line removes it from them too
+# exclusive: the level only holds lines the levels above evicted, a hit moves the line up
+# (inclusion only matters below L1)
+# writeback_cost is what writing one dirty line to the next level costs, by default that level's latency
+class Level:
+    def __init__(self, name, cache, latency=1, inclusion="inclusive", writeback_cost=None):
+        if inclusion not in INCLUSION_POLICIES:
+            raise ValueError("inclusion must be one of " + ", ".join(INCLUSION_POLICIES))
+        self.name = name
+        self.cache = cache
+        self.latency = latency
+        self.inclusion = inclusion
+        self.exclusive = inclusion == "exclusive"
+        self.writeback_cost = writeback_cost
+        # caches of the levels above this one, set by MemoryHierarchy
+        self.upper = []
+
+    def report(self, program):
+        report = {"name": self.name, "latency": self.latency, "inclusion": self.inclusion, "writeback_cost": self.writeback_cost}
+        report.update(self.cache.report(program))
+        return report
+
+# split L1 instruction and data levels over the shared lower levels (L2, L3, ...) and main memory
+# attach() and detach() as for cache.CacheSimulator
+class MemoryHierarchy(CacheSimulator):
+    def __init__(self, ilevel=None, dlevel=None, lower=(), memory_latency=100):
+        self.ilevel = ilevel
+        self.dlevel = dlevel
+        self.lower = list(lower)
+        self.memory_latency = memory_latency
+        # levels an instruction fetch and a data access go through, top first
+        self.instruction_path = [level for level in [ilevel] + self.lower if level]
+        self.data_path = [level for level in [dlevel] + self.lower if level]
+        first = [level for level in (ilevel, dlevel) if level]
+        for i, level in enumerate(self.lower):
+            level.upper = [above.cache for above in first + self.lower[:i]]
+        below = {}
+        for path in (self.instruction_path, self.data_path):
+            for i, level in enumerate(path):
+                below[level] = path[i + 1].latency if i + 1 < len(path) else memory_latency
+        for level, latency in below.items():
+            if level.writeback_cost is None:
+                level.writeback_cost = latency
+        self.memory_reads = 0
+        self.memory_writes = 0
+        self.stall_cycles = 0
+        # instruction index -> memory stall cycles
+        self.line_stalls = {}
+        super().__init__(ilevel.cache if ilevel else None, dlevel.cache if dlevel else None)
+
+    def caches(self):
+        return super().caches() + [level.cache for level in self.lower]
+
+    def access_instruction(self, address):
+        self.add_stall(self.demand(self.instruction_path, 0, address, False)[0])
+
+    def access_data(self, address, write):
+        self.add_stall(self.demand(self.data_path, 0, address, write)[0])
+
+    def add_stall(self, cycles):
+        if cycles > PIPELINED_CYCLES:
+            self.stall_cycles += cycles - PIPELINED_CYCLES
+            self.line_stalls[self.index] = self.line_stalls.get(self.index, 0) + cycles - PIPELINED_CYCLES
+
+    # an access reaching path[depth], returns (cycles, True if the line came up dirty from an exclusive level)
+    def demand(self, path, depth, address, write):
+        if depth == len(path):
+            if write:
+                self.memory_writes += 1
+            else:
+                self.memory_reads += 1
+            return self.memory_latency, False
+        level = path[depth]
+        cache = level.cache
+        cycles = level.latency
+        if depth and level.exclusive:
+            # a write sent down by a write-through level updates the line only where it already is
+            if write:
+                if cache.contains(address):
+                    cache.access(address, True)
+                    if cache.write_back:
+                        return cycles, False
+                return cycles + self.demand(path, depth + 1, address, True)[0], False
+            hit, dirty = cache.take(address)
+            if hit:
+                return cycles, dirty
+            below, dirty = self.demand(path, depth + 1, address, False)
+            return cycles + below, dirty
+        hit = cache.access(address, write)
+        cycles += self.evicted(path, depth)
+        if write and not cache.write_back:
+            cycles += self.demand(path, depth + 1, address, True)[0]
+        elif not hit:
+            below, dirty = self.demand(path, depth + 1, address, False)
+            cycles += below
+            if dirty:
+                cache.mark_dirty(address)
+        return cycles, False
+
+    # cost of the line the last access of path[depth] evicted
+    # an exclusive level below takes the victim, otherwise a dirty victim is written back, and an
+    # inclusive lower level also removes the line from the levels above it
+    def evicted(self, path, depth):
+        level = path[depth]
+        address = level.cache.evicted
+        if address is None:
+            return 0
+        dirty = level.cache.evicted_dirty
+        cycles = 0
+        if depth + 1 < len(path) and path[depth + 1].exclusive:
+            # a clean line the other L1 still holds stays there only
+            below = path[depth + 1]
+            if dirty or not any(cache.contains(address) for cache in below.upper if cache is not level.cache):
+                below.cache.insert(address, dirty)
+                if dirty:
+                    cycles += level.writeback_cost
+                cycles += self.evicted(path, depth + 1)
+        elif dirty:
+            cycles += level.writeback_cost
+            self.write_back(path, depth + 1, address)
+        if not level.exclusive:
+            for cache in level.upper:
+                for offset in range(0, level.cache.line_size, cache.line_size):
+                    if cache.invalidate(address + offset):
+                        cycles += level.writeback_cost
+                        self.write_back(path, depth + 1, address + offset)
+        return cycles
+
+    # marks a written back line dirty in the first level below that holds it, or counts a memory write
+    def write_back(self, path, depth, address):
+        for level in path[depth:]:
+            if level.cache.contains(address):
+                level.cache.mark_dirty(address)
+                return
+        self.memory_writes += 1
+
+    # instructions (or pipeline cycles) plus the memory stalls
+    def estimated_cycles(self, base_cycles):
+        return base_cycles + self.stall_cycles
+
+    def report(self, program):
+        levels = [level for level in (self.ilevel, self.dlevel) if level] + self.lower
+        lines = []
+        for index in sorted(self.line_stalls):
+            lines.append({
+                "address": format(program[index].address, '08x'),
+                "line": program[index].line,
+                "stall_cycles": self.line_stalls[index],
+            })
+        return {
+            "levels": [level.report(program) for level in levels],
+            "memory_latency": self.memory_latency,
+            "memory_reads": self.memory_reads,
+            "memory_writes": self.memory_writes,
+            "stall_cycles": self.stall_cycles,
+            "lines": lines,
+        }
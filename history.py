@@ -0,0 +1,247 @@
+# reverse stepping for Engine
+# a snapshot of the machine is kept every interval instructions, and every instruction stepped since the
+# last snapshot leaves an undo entry with the registers, flags and stack before it and the bytes it overwrote
+# the execution profile is put back with the machine, so the instructions stepped again are not counted twice
+# a step back pops the undo log; where the log does not reach (the instructions ran in a compiled block, or they
+# are older than the last snapshot) the nearest earlier snapshot is restored and the program steps forward to the
+# instruction before, so one step back costs at most about interval instructions however long the run was
+# a snapshot only copies the memory pages and profile chunks that changed since the snapshot before it,
+# the others are taken from the earlier snapshots when it is restored
+import bisect
+from collections import namedtuple
+import assembly
+from assembly import Opcode
+from cpu import cpu_state
+from guest_memory import guest_memory
+
+DEFAULT_INTERVAL = 1000
+# the oldest snapshot is dropped past this many, the program cannot step back before the oldest one
+DEFAULT_MAX_SNAPSHOTS = 1000
+# bytes of the profile arrays compared and copied as one piece, 128 counters
+PROFILE_CHUNK = 1024
+
+# machine state after position instructions
+# pages maps a page number to a copy of its bytes and profile maps (array, byte offset) to a copy of a chunk of
+# the engine's profile counts (0), block_runs (1) or taken (2) array, both only for what changed since the
+# snapshot before, page_numbers are all the pages allocated; the oldest snapshot kept holds everything
+MachineSnapshot = namedtuple("MachineSnapshot", ["position", "registers", "nzcv", "current_line_index", "stacked",
+                                                 "pages", "page_numbers", "profile"])
+
+# state before the instruction at position ran, stacked is only kept for PUSH/POP (the only ones changing it)
+# and writes lists the (address, old bytes) of its memory writes
+UndoEntry = namedtuple("UndoEntry", ["position", "current_line_index", "registers", "nzcv", "stacked", "writes"])
+
+# attach() makes it the engine's history and the assembly.data_access_hook (the hook it replaces is still called)
+# Engine.step() calls before_step(), Engine.run_blocks() calls before_block()
+class History:
+    def __init__(self, interval=DEFAULT_INTERVAL, max_snapshots=DEFAULT_MAX_SNAPSHOTS):
+        if interval < 1 or max_snapshots < 1:
+            raise ValueError("snapshot interval and number of snapshots must be at least 1")
+        self.interval = interval
+        self.max_snapshots = max_snapshots
+        self.engine = None
+        self.previous_hook = None
+        self.position = 0
+        self.next_snapshot = 0
+        self.snapshots = []
+        # positions of the snapshots, for bisect
+        self.positions = []
+        # the pages and profile chunks as the last snapshot saw them, shared with the snapshot that copied them
+        self.pages = {}
+        self.profile = {}
+        self.log = []
+        # memory writes of the instruction being stepped, not recorded while a compiled block or PUSH/POP runs
+        self.writes = []
+        self.recording = False
+
+    def attach(self, engine):
+        self.engine = engine
+        engine.history = self
+        self.previous_hook = assembly.data_access_hook
+        assembly.data_access_hook = self.data_access
+        self.restart()
+
+    def detach(self):
+        if self.engine.history is self:
+            self.engine.history = None
+        if assembly.data_access_hook == self.data_access:
+            assembly.data_access_hook = self.previous_hook
+
+    # forgets everything before the current state, which becomes position 0
+    # Engine.set_program calls it, so does the GUI once memory is loaded or a register was edited
+    def restart(self):
+        self.position = 0
+        self.snapshots = []
+        self.positions = []
+        self.pages = {}
+        self.profile = {}
+        self.log = []
+        self.take_snapshot()
+
+    # index is the next instruction, Engine.run_blocks only writes current_line_index when it stops
+    def take_snapshot(self, index=None):
+        engine = self.engine
+        if index is None:
+            index = engine.current_line_index
+        pages = {}
+        seen = self.pages
+        for number, page in guest_memory.pages.items():
+            if seen.get(number) != page:
+                pages[number] = seen[number] = bytes(page)
+        if len(seen) != len(guest_memory.pages):
+            for number in [number for number in seen if number not in guest_memory.pages]:
+                del seen[number]
+        profile = {}
+        seen = self.profile
+        for i, counters in enumerate(profile_arrays(engine.profile)):
+            view = memoryview(counters).cast('B')
+            for offset in range(0, len(view), PROFILE_CHUNK):
+                chunk = view[offset:offset + PROFILE_CHUNK]
+                if seen.get((i, offset)) != chunk:
+                    profile[i, offset] = seen[i, offset] = bytes(chunk)
+            view.release()
+        self.snapshots.append(MachineSnapshot(self.position, tuple(cpu_state.registers), cpu_state.nzcv,
+                                              index, tuple(engine.stacked), pages, tuple(guest_memory.pages), profile))
+        self.positions.append(self.position)
+        if len(self.snapshots) > self.max_snapshots:
+            # the next snapshot becomes the oldest, it takes what it shared with the dropped one
+            oldest, following = self.snapshots[0], self.snapshots[1]
+            for number in following.page_numbers:
+                if number not in following.pages:
+                    following.pages[number] = oldest.pages[number]
+            for key, chunk in oldest.profile.items():
+                following.profile.setdefault(key, chunk)
+            del self.snapshots[0]
+            del self.positions[0]
+        self.next_snapshot = self.position + self.interval
+        # the instructions before a snapshot are stepped back by replaying from the one before it
+        self.log.clear()
+
+    def before_step(self, instruction):
+        if self.position >= self.next_snapshot:
+            self.take_snapshot()
+        engine = self.engine
+        stack = instruction.opcode == Opcode.PUSH or instruction.opcode == Opcode.POP
+        self.writes = []
+        # the stack words of PUSH/POP are in engine.stacked, not guest memory
+        self.recording = not stack
+        self.log.append(UndoEntry(self.position, engine.current_line_index, tuple(cpu_state.registers), cpu_state.nzcv,
+                                  tuple(engine.stacked) if stack else None, self.writes))
+        self.position += 1
+
+    # the compiled block of size instructions at index is about to run, it leaves no undo entries
+    def before_block(self, index, size):
+        if self.position >= self.next_snapshot:
+            self.take_snapshot(index)
+        elif self.log:
+            self.log.clear()
+        self.recording = False
+        self.position += size
+
+    def data_access(self, address, size, write):
+        if write and self.recording:
+            self.writes.append((address, guest_memory.read_bytes(address, size)))
+        if self.previous_hook:
+            self.previous_hook(address, size, write)
+
+    # puts the machine back by one instruction, returns False at the oldest state kept
+    def step_back(self):
+        if self.log and self.log[-1].position == self.position - 1:
+            self.undo(self.log.pop())
+            return True
+        return self.seek(self.position - 1)
+
+    # steps back until the next instruction is at one of the breakpoint addresses, at most limit instructions,
+    # returns the number of instructions stepped back
+    def run_back(self, breakpoints=(), limit=None):
+        stepped = 0
+        while (limit is None or stepped < limit) and self.step_back():
+            stepped += 1
+            if self.engine.at_breakpoint(breakpoints):
+                break
+        return stepped
+
+    # restores the state after target instructions from the snapshot before it, returns False if none is left
+    # the observers and trace do not see the instructions stepped again, the profile counts them again from
+    # the snapshot's counts
+    def seek(self, target):
+        i = bisect.bisect_right(self.positions, target) - 1
+        if target < 0 or i < 0:
+            return False
+        self.restore(i)
+        del self.snapshots[i + 1:]
+        del self.positions[i + 1:]
+        engine = self.engine
+        observers, trace = engine.observers, engine.trace
+        engine.observers, engine.trace = [], None
+        try:
+            while self.position < target:
+                engine.step()
+        finally:
+            engine.observers, engine.trace = observers, trace
+        return True
+
+    # puts back the state of snapshot i, the snapshots after it are about to be dropped
+    def restore(self, i):
+        snapshot = self.snapshots[i]
+        engine = self.engine
+        code = self.code_bytes()
+        # the compiled blocks hold on to the register list, so it is changed in place
+        cpu_state.registers[:] = snapshot.registers
+        cpu_state.nzcv = snapshot.nzcv
+        engine.current_line_index = snapshot.current_line_index
+        engine.stacked[:] = snapshot.stacked
+        pages = {}
+        profile = {}
+        missing = set(snapshot.page_numbers)
+        # each page and chunk as the latest snapshot up to i copied it
+        for earlier in reversed(self.snapshots[:i + 1]):
+            for number in missing.intersection(earlier.pages):
+                pages[number] = earlier.pages[number]
+            missing.difference_update(earlier.pages)
+            for key, chunk in earlier.profile.items():
+                profile.setdefault(key, chunk)
+        self.pages = dict(pages)
+        self.profile = profile
+        guest_memory.pages.clear()
+        for number, page in pages.items():
+            guest_memory.pages[number] = bytearray(page)
+        for i, counters in enumerate(profile_arrays(engine.profile)):
+            view = memoryview(counters).cast('B')
+            for offset in range(0, len(view), PROFILE_CHUNK):
+                view[offset:offset + PROFILE_CHUNK] = profile[i, offset]
+            view.release()
+        if engine.blocks and self.code_bytes() != code:
+            engine.blocks.invalidate()
+        self.position = snapshot.position
+        self.next_snapshot = self.position + self.interval
+        self.log.clear()
+
+    def undo(self, entry):
+        engine = self.engine
+        index = entry.current_line_index
+        # the entry was left by Engine.step(), which counted the instruction and whether it branched
+        engine.profile.counts[index] -= 1
+        if engine.current_line_index != index + 1:
+            engine.profile.taken[index] -= 1
+        cpu_state.registers[:] = entry.registers
+        cpu_state.nzcv = entry.nzcv
+        engine.current_line_index = index
+        if entry.stacked is not None:
+            engine.stacked[:] = entry.stacked
+        blocks = engine.blocks
+        for address, old in reversed(entry.writes):
+            guest_memory.write_bytes(address, old)
+            if blocks and blocks.code_start <= address < blocks.code_end:
+                blocks.invalidate()
+        self.position = entry.position
+
+    # memory holding the program, a restore that changes it drops the compiled blocks
+    def code_bytes(self):
+        program = self.engine.program
+        if not program:
+            return b""
+        return guest_memory.read_bytes(program[0].address, program[-1].address + 4 - program[0].address)
+
+def profile_arrays(profile):
+    return profile.counts, profile.block_runs, profile.taken
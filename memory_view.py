@@ -0,0 +1,178 @@
+# models of the memory view
+# MemoryTableModel is the one model of guest memory, one word per row, every cell is read from
+# guest memory when the view asks for it, so showing or searching a high address costs the same as a low one
+# MemoryLayoutProxy lays those words out 1/2/4/8 per row as words or bytes without copying them
+from PyQt6 import QtCore, QtGui
+from guest_memory import guest_memory, format_word, format_word_bytes
+
+ADDRESS_SPACE = 1 << 32
+# a QTableView scrolls in pixels kept in an int, which overflows long before 2^30 rows,
+# so the model shows a window of the address space and search_address moves it
+WINDOW_WORDS = 1 << 24
+COLUMN_COUNT = 9
+# role giving the bytes of a word in address order, used by the byte view
+BYTES_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+
+# texts of row 0, the label row above the addresses
+header_labels = ["Address", "Memory", " ", " ", " ", " ", " ", " ", " "]
+
+class MemoryTableModel(QtCore.QAbstractTableModel):
+    def __init__(self, memory=guest_memory):
+        super().__init__()
+        self.memory = memory
+        self.window_size = WINDOW_WORDS * 4
+        # first address of the window, shown in row 0
+        self.base_address = 0
+        # word address of the cell found by the last search
+        self.highlight = None
+        self.gray = QtGui.QBrush(QtGui.QColor('gray'))
+        self.yellow = QtGui.QBrush(QtGui.QColor('yellow'))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return min(WINDOW_WORDS, (ADDRESS_SPACE - self.base_address) // 4)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 2
+
+    def row_address(self, row):
+        return self.base_address + 4 * row
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        address = self.row_address(index.row())
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if index.column() == 0:
+                return format(address, '08x')
+            return format_word(self.memory, address)
+        if role == BYTES_ROLE:
+            return format_word_bytes(self.memory, address)
+        if role == QtCore.Qt.ItemDataRole.BackgroundRole:
+            if index.column() == 0:
+                return self.gray
+            if address == self.highlight:
+                return self.yellow
+        return None
+
+    def flags(self, index):
+        return QtCore.Qt.ItemFlag.ItemIsEnabled
+
+    # row of the word holding an address, or None if it is outside the window
+    def find_row(self, address):
+        offset = address - self.base_address
+        if offset < 0 or offset >= self.window_size:
+            return None
+        return offset // 4
+
+    # highlights the word of an address, moving the window first if the address is outside it
+    def search_address(self, address):
+        address &= ADDRESS_SPACE - 1
+        if self.find_row(address) is None:
+            self.beginResetModel()
+            self.base_address = address - address % self.window_size
+            self.endResetModel()
+        self.highlight = address & ~3
+        self.refresh()
+        return self.find_row(address)
+
+    # asks the views to read every cell again, a view only repaints the rows on screen
+    def refresh(self):
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, 1))
+
+    # back to the first window without a highlighted word
+    def reset(self):
+        self.beginResetModel()
+        self.base_address = 0
+        self.highlight = None
+        self.endResetModel()
+
+# shows the words of a MemoryTableModel words_per_row to a row, as words or as bytes
+# row 0 is the label row, row r holds source rows (r - 1) * words_per_row onwards
+class MemoryLayoutProxy(QtCore.QAbstractProxyModel):
+    def __init__(self, source, words_per_row=1, byte_view=False):
+        super().__init__()
+        self.words_per_row = words_per_row
+        self.byte_view = byte_view
+        self.gray = QtGui.QBrush(QtGui.QColor('gray'))
+        self.setSourceModel(source)
+        source.dataChanged.connect(self.source_data_changed)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self.endResetModel)
+
+    # changes the row width or the word/byte format, nothing is copied
+    def set_layout(self, words_per_row, byte_view):
+        self.beginResetModel()
+        self.words_per_row = words_per_row
+        self.byte_view = byte_view
+        self.endResetModel()
+
+    def source_data_changed(self, top_left, bottom_right):
+        first = self.mapFromSource(self.sourceModel().index(top_left.row(), 1))
+        last = self.mapFromSource(self.sourceModel().index(bottom_right.row(), 1))
+        self.dataChanged.emit(self.index(first.row(), 0), self.index(last.row(), COLUMN_COUNT - 1))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 + -(-self.sourceModel().rowCount() // self.words_per_row)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return COLUMN_COUNT
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if parent.isValid() or row < 0 or column < 0 or row >= self.rowCount() or column >= COLUMN_COUNT:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        return QtCore.QModelIndex()
+
+    # the address column maps to the first word of the row, the label row and unused columns map to nothing
+    def mapToSource(self, proxy_index):
+        row = proxy_index.row()
+        column = proxy_index.column()
+        if not proxy_index.isValid() or row == 0 or column > self.words_per_row:
+            return QtCore.QModelIndex()
+        if column == 0:
+            return self.sourceModel().index((row - 1) * self.words_per_row, 0)
+        return self.sourceModel().index((row - 1) * self.words_per_row + column - 1, 1)
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        row = source_index.row() // self.words_per_row + 1
+        if source_index.column() == 0:
+            if source_index.row() % self.words_per_row != 0:
+                return QtCore.QModelIndex()
+            return self.index(row, 0)
+        return self.index(row, source_index.row() % self.words_per_row + 1)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if index.row() == 0:
+            if role == QtCore.Qt.ItemDataRole.DisplayRole:
+                return header_labels[index.column()]
+            if role == QtCore.Qt.ItemDataRole.BackgroundRole:
+                return self.gray
+            return None
+        source_index = self.mapToSource(index)
+        if not source_index.isValid():
+            return None
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and self.byte_view and index.column() > 0:
+            role = BYTES_ROLE
+        return self.sourceModel().data(source_index, role)
+
+    def flags(self, index):
+        return QtCore.Qt.ItemFlag.ItemIsEnabled
+
+    # row and column of the cell holding an address, or None if it is outside the window
+    def find_cell(self, address):
+        row = self.sourceModel().find_row(address)
+        if row is None:
+            return None
+        index = self.mapFromSource(self.sourceModel().index(row, 1))
+        return index.row(), index.column()
+    # print(MemoryLayoutProxy(MemoryTableModel(), 4).find_cell(0x24))  # output: (3, 2), row 3 starts at 0x20
@@ -0,0 +1,17 @@
+# error messages of the assembler and the simulator
+# nothing here imports Qt: the messages are printed unless the GUI installs its message box with set_error_handler
+import sys
+
+def print_error(text):
+    print("Error: " + text, file=sys.stderr)
+
+error_handler = print_error
+
+# replaces the function that shows an error, ui.py installs a QMessageBox here
+def set_error_handler(handler):
+    global error_handler
+    error_handler = handler
+
+def show_error(text):
+    error_handler(text)
+# show_error("Bad arguments to instruction - mov r0")  # output: Error: Bad arguments to instruction - mov r0
@@ -0,0 +1,66 @@
+# mnemonic parser shared by the decoder (assembly.py) and the machine code encoder (memory.py)
+# every spelling of every instruction (base + condition + S flag) is expanded once into a dict,
+# so splitting a mnemonic is a single lookup however many instructions are supported
+from collections import namedtuple
+from cpu import condition_table
+
+# instruction classes, assembly.py and memory.py each keep one handler per class
+DATA_PROCESSING = 0
+TEST = 1
+SINGLE_DATA_TRANSFER = 2
+MULTIPLY = 3
+SATURATE = 4
+REVERSE = 5
+BRANCH = 6
+STACKED = 7
+
+# base instruction -> (instruction class, S suffix allowed)
+base_instruction_dict = {
+    "mov": (DATA_PROCESSING, True), "lsl": (DATA_PROCESSING, True), "lsr": (DATA_PROCESSING, True),
+    "and": (DATA_PROCESSING, True), "bic": (DATA_PROCESSING, True), "orr": (DATA_PROCESSING, True),
+    "orn": (DATA_PROCESSING, True), "eor": (DATA_PROCESSING, True),
+    "add": (DATA_PROCESSING, True), "adc": (DATA_PROCESSING, True), "sub": (DATA_PROCESSING, True),
+    "sbc": (DATA_PROCESSING, True), "rsb": (DATA_PROCESSING, True),
+    "cmp": (TEST, False), "cmn": (TEST, False), "tst": (TEST, False), "teq": (TEST, False),
+    "ldr": (SINGLE_DATA_TRANSFER, False), "ldrb": (SINGLE_DATA_TRANSFER, False), "ldrh": (SINGLE_DATA_TRANSFER, False),
+    "str": (SINGLE_DATA_TRANSFER, False), "strb": (SINGLE_DATA_TRANSFER, False), "strh": (SINGLE_DATA_TRANSFER, False),
+    "mul": (MULTIPLY, True), "mla": (MULTIPLY, True), "mls": (MULTIPLY, True),
+    "umull": (MULTIPLY, True), "smull": (MULTIPLY, True), "umlal": (MULTIPLY, True),
+    "smlal": (MULTIPLY, True), "umlsl": (MULTIPLY, True), "smlsl": (MULTIPLY, True),
+    "udiv": (MULTIPLY, True), "sdiv": (MULTIPLY, True),
+    "ssat": (SATURATE, False), "usat": (SATURATE, False),
+    "rev": (REVERSE, False), "rbit": (REVERSE, False),
+    "b": (BRANCH, False), "bl": (BRANCH, False), "bx": (BRANCH, False),
+    "push": (STACKED, False), "pop": (STACKED, False),
+}
+
+# one parsed mnemonic, base is the lower case base instruction and condition is "al" when none is given
+Mnemonic = namedtuple("Mnemonic", ["base", "condition", "set_flags", "instruction_class"])
+
+# expands every base instruction with every condition and S flag spelling
+# both the UAL order (addseq) and the old order (addeqs, ldreqb) are accepted
+def build_mnemonic_dict():
+    conditions = [condition for condition in condition_table if condition]
+    mnemonic_dict = {}
+    for base, (instruction_class, flag_allowed) in base_instruction_dict.items():
+        spellings = [(base, "al", False)]
+        for condition in conditions:
+            spellings.append((base + condition, condition, False))
+        if instruction_class == SINGLE_DATA_TRANSFER and len(base) == 4:
+            for condition in conditions:
+                spellings.append((base[:3] + condition + base[3], condition, False))
+        if flag_allowed:
+            spellings.append((base + "s", "al", True))
+            for condition in conditions:
+                spellings.append((base + "s" + condition, condition, True))
+                spellings.append((base + condition + "s", condition, True))
+        for spelling, condition, set_flags in spellings:
+            mnemonic_dict.setdefault(spelling, Mnemonic(base, condition, set_flags, instruction_class))
+    return mnemonic_dict
+
+mnemonic_dict = build_mnemonic_dict()
+
+# returns the Mnemonic of an instruction, or None if it is not a valid instruction
+def parse_mnemonic(instruction):
+    return mnemonic_dict.get(instruction.lower())
+# print(parse_mnemonic("ADDSEQ"))  # output: Mnemonic(base='add', condition='eq', set_flags=True, instruction_class=0)
@@ -0,0 +1,206 @@
+# five-stage pipeline timing model: fetch, decode, execute, memory, writeback
+# the interpreter still computes every result, the model follows the executed instruction stream
+# (an Engine observer) and counts the cycles an in-order five-stage pipeline would need for it:
+# RAW hazards, load-use stalls and the flush after a taken branch, with or without forwarding
+from assembly import (Opcode, LOAD_OPCODES, OPERAND_REGISTER, OPERAND_SHIFT_IMMEDIATE, OPERAND_SHIFT_REGISTER,
+                      ADDRESS_LITERAL, ADDRESS_LITERAL_VALUE)
+
+STAGES = ["IF", "ID", "EX", "MEM", "WB"]
+# register number used for the NZCV flags, so a flag dependency is a RAW hazard like any other
+FLAGS = 16
+# a branch is resolved in EX, the two instructions behind it in IF and ID are flushed if they are the wrong ones
+BRANCH_PENALTY = 2
+# the first instruction reaches EX in cycle 3
+FIRST_EXECUTE_CYCLE = 3
+
+DATA_PROCESSING_OPCODES = {
+    Opcode.MOV, Opcode.LSL, Opcode.LSR, Opcode.AND, Opcode.BIC, Opcode.ORR, Opcode.ORN, Opcode.EOR,
+    Opcode.ADD, Opcode.ADC, Opcode.SUB, Opcode.SBC, Opcode.RSB,
+    Opcode.MUL, Opcode.MLA, Opcode.MLS, Opcode.SSAT, Opcode.USAT, Opcode.REV, Opcode.RBIT,
+}
+TEST_OPCODES = {Opcode.CMP, Opcode.CMN, Opcode.TST, Opcode.TEQ}
+LONG_OPCODES = {Opcode.UMULL, Opcode.SMULL, Opcode.UMLAL, Opcode.SMLAL, Opcode.UMLSL, Opcode.SMLSL, Opcode.UDIV, Opcode.SDIV}
+# long multiplies that also read RdLo and RdHi
+ACCUMULATE_OPCODES = {Opcode.UMLAL, Opcode.SMLAL, Opcode.UMLSL, Opcode.SMLSL}
+STORE_OPCODES = {Opcode.STR, Opcode.STRB, Opcode.STRH}
+
+# registers read by the operands of an instruction
+def operand_registers(operands):
+    registers = []
+    for operand in operands:
+        if operand.kind in (OPERAND_REGISTER, OPERAND_SHIFT_IMMEDIATE, OPERAND_SHIFT_REGISTER):
+            registers.append(operand.value)
+        if operand.kind == OPERAND_SHIFT_REGISTER:
+            registers.append(operand.amount)
+    return registers
+
+# (registers read, registers written in EX, registers written in MEM) of a decoded instruction
+# a conditional instruction reads the flags and is counted as writing its destination whether or not it ran,
+# the hazard logic of an in-order pipeline does not know the outcome of the condition in time either
+def register_use(instruction):
+    opcode = instruction.opcode
+    reads = operand_registers(instruction.operands)
+    writes = []
+    loads = []
+    if instruction.condition != "al":
+        reads.append(FLAGS)
+    if opcode in DATA_PROCESSING_OPCODES:
+        writes.append(instruction.registers[0])
+        if opcode in (Opcode.ADC, Opcode.SBC):
+            reads.append(FLAGS)
+    elif opcode in LONG_OPCODES:
+        writes.extend(instruction.registers)
+        if opcode in ACCUMULATE_OPCODES:
+            reads.extend(instruction.registers)
+    elif opcode in TEST_OPCODES:
+        writes.append(FLAGS)
+    elif opcode in LOAD_OPCODES or opcode in STORE_OPCODES:
+        rt, base = instruction.registers
+        if instruction.mode not in (ADDRESS_LITERAL, ADDRESS_LITERAL_VALUE):
+            reads.append(base)
+        if instruction.writeback:
+            writes.append(base)
+        if opcode in STORE_OPCODES:
+            reads.append(rt)
+        elif instruction.mode == ADDRESS_LITERAL_VALUE:
+            writes.append(rt)
+        else:
+            loads.append(rt)
+    elif opcode == Opcode.BL:
+        writes.append(14)
+    elif opcode == Opcode.BX:
+        reads.append(instruction.registers[0])
+    elif opcode == Opcode.PUSH:
+        reads.extend(instruction.registers)
+        reads.append(13)
+        writes.append(13)
+    elif opcode == Opcode.POP:
+        reads.append(13)
+        writes.append(13)
+        loads.extend(register for register in instruction.registers if register != 15)
+    if instruction.set_flags and opcode not in TEST_OPCODES:
+        writes.append(FLAGS)
+    return tuple(reads), tuple(writes), tuple(loads)
+# print(register_use(assembly.decode_line(0, 0, "ldr r0, [r1, #4]", [], {}, {})[0]))  # output: ((1,), (), (0,))
+
+# counts the cycles of the instructions an Engine executes
+# attach it with engine.observers.append(pipeline), the engine then steps one instruction at a time
+# without a predictor every taken branch flushes, with a predictor.BranchPredictor only mispredicted ones do
+class Pipeline:
+    def __init__(self, forwarding=True, predictor=None):
+        self.forwarding = forwarding
+        self.predictor = predictor
+        # decoded instruction index -> register_use of that instruction
+        self.uses = {}
+        self.reset()
+
+    def reset(self):
+        self.instructions = 0
+        # cycle the last instruction spent in EX
+        self.execute_cycle = FIRST_EXECUTE_CYCLE - 1
+        # register -> (first cycle an instruction can use it in EX, True if it comes from a load)
+        self.ready = {}
+        # index of the taken branch whose flush the next instruction waits for, and the cycle it can enter EX
+        self.flush_index = None
+        self.flush_cycle = 0
+        self.data_stalls = 0
+        self.load_use_stalls = 0
+        self.flush_cycles = 0
+        # instruction index -> [executed, data stalls, load-use stalls, flush cycles]
+        self.line_stats = {}
+
+    # called by Engine.step after an instruction ran, next_index is the index the engine continues at
+    def executed(self, instruction, next_index):
+        index = instruction.index
+        uses = self.uses.get(index)
+        if uses is None:
+            uses = self.uses[index] = register_use(instruction)
+        reads, writes, loads = uses
+        stats = self.line_stats.get(index)
+        if stats is None:
+            stats = self.line_stats[index] = [0, 0, 0, 0]
+        stats[0] += 1
+        self.instructions += 1
+
+        cycle = self.execute_cycle + 1
+        if self.flush_index is not None:
+            if self.flush_cycle > cycle:
+                self.flush_cycles += self.flush_cycle - cycle
+                self.line_stats[self.flush_index][3] += self.flush_cycle - cycle
+                cycle = self.flush_cycle
+            self.flush_index = None
+
+        # the latest operand decides the stall, it is a load-use stall if that value comes from a load
+        ready_cycle = cycle
+        from_load = False
+        for register in reads:
+            entry = self.ready.get(register)
+            if entry and entry[0] > ready_cycle:
+                ready_cycle, from_load = entry
+        if ready_cycle > cycle:
+            if from_load:
+                self.load_use_stalls += ready_cycle - cycle
+                stats[2] += ready_cycle - cycle
+            else:
+                self.data_stalls += ready_cycle - cycle
+                stats[1] += ready_cycle - cycle
+            cycle = ready_cycle
+        self.execute_cycle = cycle
+
+        # forwarding: an EX result is ready for the next EX, a loaded value one cycle later (MEM -> EX)
+        # no forwarding: values are read from the register file in ID, at the earliest in the cycle WB writes them
+        if self.forwarding:
+            for register in writes:
+                self.ready[register] = (cycle + 1, False)
+            for register in loads:
+                self.ready[register] = (cycle + 2, True)
+        else:
+            for register in writes:
+                self.ready[register] = (cycle + 3, False)
+            for register in loads:
+                self.ready[register] = (cycle + 3, True)
+
+        if self.predictor:
+            flush = not self.predictor.resolve(instruction, next_index)
+        else:
+            flush = next_index != index + 1
+        if flush:
+            self.flush_index = index
+            self.flush_cycle = cycle + 1 + BRANCH_PENALTY
+
+    # cycles until the last instruction left WB
+    def cycles(self):
+        if not self.instructions:
+            return 0
+        return self.execute_cycle + 2
+
+    def cpi(self):
+        if not self.instructions:
+            return 0.0
+        return self.cycles() / self.instructions
+
+    # totals and the per line breakdown as a dict, program gives the address and source text of each line
+    def report(self, program):
+        lines = []
+        for index in sorted(self.line_stats):
+            executed, data_stalls, load_use_stalls, flush_cycles = self.line_stats[index]
+            lines.append({
+                "address": format(program[index].address, '08x'),
+                "line": program[index].line,
+                "executed": executed,
+                "data_stalls": data_stalls,
+                "load_use_stalls": load_use_stalls,
+                "flush_cycles": flush_cycles,
+            })
+        return {
+            "forwarding": self.forwarding,
+            "instructions": self.instructions,
+            "cycles": self.cycles(),
+            "cpi": round(self.cpi(), 4),
+            "stalls": {
+                "data": self.data_stalls,
+                "load_use": self.load_use_stalls,
+                "branch_flush": self.flush_cycles,
+            },
+            "lines": lines,
+        }
@@ -0,0 +1,161 @@
+# branch predictors
+# a BranchPredictor follows the executed instruction stream like pipeline.Pipeline does, predicts the next
+# index of every branch before it is resolved and counts hits and misses per branch site
+# the direction policies are interchangeable, the return address stack predicts bx lr / pop {pc} after a bl
+# targets of direct branches are taken as known when the prediction is made (a branch target buffer)
+from assembly import Opcode
+from pipeline import BRANCH_PENALTY
+
+RETURN_STACK_DEPTH = 8
+
+# always predicts the fallthrough, the same flushes as a pipeline without a predictor
+class StaticNotTaken:
+    def __init__(self, table_bits, history_bits):
+        pass
+
+    def predict(self, instruction):
+        return False
+
+    def update(self, instruction, taken):
+        pass
+
+# backward taken, forward not taken: loops close with a backward branch
+# an unconditional branch is known to be taken once it is decoded
+class BackwardTaken(StaticNotTaken):
+    def predict(self, instruction):
+        return instruction.condition == "al" or instruction.target <= instruction.index
+
+# 2^table_bits entries indexed by the branch address, each one remembers the last outcome
+class OneBit:
+    def __init__(self, table_bits, history_bits):
+        self.mask = (1 << table_bits) - 1
+        self.table = [False] * (1 << table_bits)
+
+    def slot(self, instruction):
+        return (instruction.address >> 2) & self.mask
+
+    def predict(self, instruction):
+        return instruction.condition == "al" or self.table[self.slot(instruction)]
+
+    def update(self, instruction, taken):
+        self.table[self.slot(instruction)] = taken
+
+# 2-bit saturating counters, 0 and 1 predict not taken, 2 and 3 taken, they start weakly not taken
+class TwoBit(OneBit):
+    def __init__(self, table_bits, history_bits):
+        super().__init__(table_bits, history_bits)
+        self.table = [1] * (1 << table_bits)
+
+    def predict(self, instruction):
+        return instruction.condition == "al" or self.table[self.slot(instruction)] >= 2
+
+    def update(self, instruction, taken):
+        slot = self.slot(instruction)
+        if taken:
+            self.table[slot] = min(3, self.table[slot] + 1)
+        else:
+            self.table[slot] = max(0, self.table[slot] - 1)
+
+# 2-bit counters indexed by the branch address xor the global history of the last history_bits outcomes
+class Gshare(TwoBit):
+    def __init__(self, table_bits, history_bits):
+        super().__init__(table_bits, history_bits)
+        self.history = 0
+        self.history_mask = (1 << history_bits) - 1
+
+    def slot(self, instruction):
+        return ((instruction.address >> 2) ^ self.history) & self.mask
+
+    def update(self, instruction, taken):
+        super().update(instruction, taken)
+        self.history = ((self.history << 1) | taken) & self.history_mask
+
+# policy name -> class, the names the runner accepts
+predictor_policy_dict = {
+    "not-taken": StaticNotTaken,
+    "btfn": BackwardTaken,
+    "1-bit": OneBit,
+    "2-bit": TwoBit,
+    "gshare": Gshare,
+}
+
+# True for the instructions that can change the next index
+def is_branch(instruction):
+    opcode = instruction.opcode
+    return opcode in (Opcode.B, Opcode.BL, Opcode.BX) or (opcode == Opcode.POP and 15 in instruction.registers)
+
+# True for the instructions the return address stack predicts
+def is_return(instruction):
+    return instruction.opcode == Opcode.POP or (instruction.opcode == Opcode.BX and instruction.registers[0] == 14)
+
+class BranchPredictor:
+    def __init__(self, policy="2-bit", return_stack=True, table_bits=10, history_bits=8):
+        self.policy_name = policy
+        self.policy = predictor_policy_dict[policy](table_bits, history_bits)
+        self.use_return_stack = return_stack
+        # return indexes pushed by bl, the oldest one is dropped when it is full
+        self.return_stack = []
+        # branch instruction index -> [executed, taken, mispredicted]
+        self.sites = {}
+
+    # index the fetch stage would continue at after a branch
+    def predict(self, instruction):
+        if instruction.opcode in (Opcode.B, Opcode.BL):
+            if self.policy.predict(instruction):
+                return instruction.target
+        elif self.use_return_stack and is_return(instruction) and self.return_stack:
+            return self.return_stack.pop()
+        return instruction.index + 1
+
+    # predicts a branch and trains the predictor with its outcome, returns True if the prediction was right
+    # any other instruction is right when it continues with the next one
+    def resolve(self, instruction, next_index):
+        index = instruction.index
+        if not is_branch(instruction):
+            return next_index == index + 1
+        predicted = self.predict(instruction)
+        taken = next_index != index + 1
+        if instruction.opcode in (Opcode.B, Opcode.BL):
+            taken = next_index == instruction.target
+            self.policy.update(instruction, taken)
+            if instruction.opcode == Opcode.BL and taken and self.use_return_stack:
+                if len(self.return_stack) == RETURN_STACK_DEPTH:
+                    del self.return_stack[0]
+                self.return_stack.append(index + 1)
+        site = self.sites.get(index)
+        if site is None:
+            site = self.sites[index] = [0, 0, 0]
+        site[0] += 1
+        site[1] += taken
+        site[2] += predicted != next_index
+        return predicted == next_index
+
+    # Engine observer, used when the predictor runs without a pipeline
+    def executed(self, instruction, next_index):
+        self.resolve(instruction, next_index)
+
+    # accuracy and mispredict penalty in total and per branch site
+    def report(self, program, penalty=BRANCH_PENALTY):
+        branches = sum(site[0] for site in self.sites.values())
+        mispredicted = sum(site[2] for site in self.sites.values())
+        sites = []
+        for index in sorted(self.sites):
+            executed, taken, missed = self.sites[index]
+            sites.append({
+                "address": format(program[index].address, '08x'),
+                "line": program[index].line,
+                "executed": executed,
+                "taken": taken,
+                "mispredicted": missed,
+                "accuracy": round(1 - missed / executed, 4),
+                "penalty_cycles": missed * penalty,
+            })
+        return {
+            "policy": self.policy_name,
+            "return_stack": self.use_return_stack,
+            "branches": branches,
+            "mispredicted": mispredicted,
+            "accuracy": round(1 - mispredicted / branches, 4) if branches else 1.0,
+            "penalty_cycles": mispredicted * penalty,
+            "sites": sites,
+        }
@@ -0,0 +1,236 @@
+# headless runner, assembles a .s file, runs it and prints the final registers, flags and memory
+# usage: python -m runner Demo/factorial.s [--limit 100000] [--json] [--memory 0x100:16 ...] [--pipeline [--no-forwarding]] [--predictor 2-bit]
+#        [--icache 1024:16:2] [--dcache 4096:32:4:write-back:lru] [--l2 65536:64:8 [--l2-exclusive] [--memory-latency 100]]
+#        [--profile profile.csv|profile.json] [--trace run.trace] [--save-checkpoint state.ckpt]
+#        python -m runner --resume state.ckpt [...] continues a saved run instead of assembling a file
+# only the simulator modules are imported, so it starts fast and works where no display exists
+import argparse
+import csv
+import json
+import sys
+from engine import assemble, Engine
+from pipeline import Pipeline
+from predictor import BranchPredictor, predictor_policy_dict
+from cache import Cache, CacheSimulator, parse_cache_spec
+from hierarchy import Level, MemoryHierarchy
+from execution_profile import COLUMNS as PROFILE_COLUMNS
+from execution_trace import TraceRecorder
+from checkpoint import save_checkpoint, load_checkpoint
+from cpu import cpu_state, register_names
+from guest_memory import guest_memory, format_word
+
+DEFAULT_LIMIT = 1000000
+
+# "0x100:16" -> (0x100, 16), a start address in hex and a number of words
+def parse_memory_range(text):
+    start, _, count = text.partition(":")
+    return int(start, 16) & ~3, int(count) if count else 1
+# print(parse_memory_range("0x100:4"))  # output: (256, 4)
+
+# final state as a dict, memory maps each range start to its words
+def collect_state(engine, executed, memory_ranges):
+    state = {
+        "instructions": executed,
+        "finished": engine.finished(),
+        "registers": {name: format(cpu_state.registers[i], '08x') for i, name in enumerate(register_names)},
+        "flags": {name: cpu_state.flag(name) for name in "NZCV"},
+        "memory": {},
+    }
+    for start, count in memory_ranges:
+        state["memory"][format(start, '08x')] = [format_word(guest_memory, start + 4 * i) for i in range(count)]
+    return state
+
+def format_text(state):
+    lines = ["instructions: %d%s" % (state["instructions"], "" if state["finished"] else " (limit reached)")]
+    for name, value in state["registers"].items():
+        lines.append("%-3s = %s" % (name, value))
+    lines.append(" ".join("%s=%d" % (name, value) for name, value in state["flags"].items()))
+    for start, words in state["memory"].items():
+        for i in range(0, len(words), 4):
+            lines.append(format(int(start, 16) + 4 * i, '08x') + ": " + " ".join(words[i:i + 4]))
+    if "pipeline" in state:
+        lines.extend(format_pipeline(state["pipeline"]))
+    if "predictor" in state:
+        lines.extend(format_predictor(state["predictor"]))
+    if "cache" in state:
+        lines.extend(format_cache(state["cache"]))
+    if "hierarchy" in state:
+        lines.extend(format_hierarchy(state["hierarchy"], state["estimated_cycles"]))
+    return "\n".join(lines)
+
+# cycle totals and the stalls of every executed line, lines that never stalled only show their count
+def format_pipeline(report):
+    stalls = report["stalls"]
+    lines = ["cycles: %d  CPI: %.2f  (%s forwarding)" % (report["cycles"], report["cpi"], "with" if report["forwarding"] else "no"),
+             "stalls: data %d, load-use %d, branch flush %d" % (stalls["data"], stalls["load_use"], stalls["branch_flush"]),
+             "%-8s %9s %6s %8s %6s  %s" % ("address", "executed", "data", "load-use", "flush", "line")]
+    for line in report["lines"]:
+        lines.append("%-8s %9d %6d %8d %6d  %s" % (line["address"], line["executed"], line["data_stalls"],
+                                                   line["load_use_stalls"], line["flush_cycles"], line["line"]))
+    return lines
+
+# prediction totals and one line per branch site
+def format_predictor(report):
+    lines = ["branches: %d  mispredicted: %d  accuracy: %.2f%%  penalty: %d cycles  (%s%s)" % (
+        report["branches"], report["mispredicted"], 100 * report["accuracy"], report["penalty_cycles"],
+        report["policy"], ", return stack" if report["return_stack"] else ""),
+             "%-8s %9s %6s %6s %9s %8s  %s" % ("address", "executed", "taken", "missed", "accuracy", "penalty", "line")]
+    for site in report["sites"]:
+        lines.append("%-8s %9d %6d %6d %8.2f%% %8d  %s" % (site["address"], site["executed"], site["taken"], site["mispredicted"],
+                                                          100 * site["accuracy"], site["penalty_cycles"], site["line"]))
+    return lines
+
+# totals of each cache and one line per source line that accessed it
+def format_cache(report):
+    lines = []
+    for name, cache in report.items():
+        lines.append("%s: %d bytes, %d byte lines, %d-way, %s, %s" % (name, cache["size"], cache["line_size"],
+                     cache["associativity"], cache["write_policy"], cache["replacement"]))
+        lines.append("  hits %d  misses %d  miss rate %.2f%%  evictions %d  writebacks %d  write-throughs %d" % (
+            cache["hits"], cache["misses"], 100 * cache["miss_rate"], cache["evictions"], cache["writebacks"], cache["write_throughs"]))
+        lines.append("  %-8s %9s %7s %7s %9s %9s  %s" % ("address", "accesses", "hits", "misses", "evictions", "miss rate", "line"))
+        for line in cache["lines"]:
+            lines.append("  %-8s %9d %7d %7d %9d %8.2f%%  %s" % (line["address"], line["accesses"], line["hits"], line["misses"],
+                                                              line["evictions"], 100 * line["miss_rate"], line["line"]))
+    return lines
+
+# latency and stalls of each level, then the lines that stalled
+def format_hierarchy(report, cycles):
+    lines = ["estimated cycles: %d  (memory stalls %d, main memory %d reads %d writes, latency %d)" % (
+        cycles, report["stall_cycles"], report["memory_reads"], report["memory_writes"], report["memory_latency"])]
+    for level in report["levels"]:
+        lines.append("%s: %d bytes, %d byte lines, %d-way, %s, %s, latency %d, %s, writeback %d" % (
+            level["name"], level["size"], level["line_size"], level["associativity"], level["write_policy"],
+            level["replacement"], level["latency"], level["inclusion"], level["writeback_cost"]))
+        lines.append("  hits %d  misses %d  miss rate %.2f%%  evictions %d  writebacks %d" % (
+            level["hits"], level["misses"], 100 * level["miss_rate"], level["evictions"], level["writebacks"]))
+    lines.append("%-8s %7s  %s" % ("address", "stalls", "line"))
+    for line in report["lines"]:
+        lines.append("%-8s %7d  %s" % (line["address"], line["stall_cycles"], line["line"]))
+    return lines
+
+# writes the per line execution profile, CSV if the file name ends in .csv, JSON otherwise
+def write_profile(path, report):
+    with open(path, "w", newline="") as file:
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(file, fieldnames=PROFILE_COLUMNS)
+            writer.writeheader()
+            writer.writerows(report["lines"])
+        else:
+            json.dump(report, file, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m runner", description="Run an ARMv7 assembly file without the GUI")
+    parser.add_argument("source", nargs="?", help="assembly file (.s)")
+    parser.add_argument("--resume", metavar="FILE", help="continue from a checkpoint instead of assembling a source file")
+    parser.add_argument("--save-checkpoint", metavar="FILE", help="write the machine state to a checkpoint when the run stops")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="stop after this many instructions")
+    parser.add_argument("--json", action="store_true", help="print the final state as JSON")
+    parser.add_argument("--interpret", action="store_true", help="interpret one instruction at a time instead of running compiled basic blocks")
+    parser.add_argument("--memory", action="append", default=[], metavar="ADDR:WORDS",
+                        help="memory range to print, hex start address and word count")
+    parser.add_argument("--profile", metavar="FILE", help="write executions, taken branches, loads, stores and cycles per line (.csv or .json)")
+    parser.add_argument("--trace", metavar="FILE", help="record every executed instruction to a binary trace (read it with python -m execution_trace)")
+    parser.add_argument("--pipeline", action="store_true", help="count cycles and stalls on a five-stage pipeline")
+    parser.add_argument("--no-forwarding", action="store_true", help="pipeline model without forwarding paths")
+    parser.add_argument("--predictor", choices=list(predictor_policy_dict), help="branch prediction policy, with --pipeline only mispredicts flush")
+    parser.add_argument("--no-return-stack", action="store_true", help="predict bx lr / pop {pc} without a return address stack")
+    parser.add_argument("--icache", metavar="SPEC", help="instruction cache, size:line:ways[:write policy[:replacement]]")
+    parser.add_argument("--dcache", metavar="SPEC", help="data cache, size:line:ways[:write-back|write-through[:lru|fifo|random]]")
+    parser.add_argument("--l2", metavar="SPEC", help="shared L2 cache below the L1 caches, same spec, turns on the latency model")
+    parser.add_argument("--l2-exclusive", action="store_true", help="L2 holds only lines evicted from L1 (default inclusive)")
+    parser.add_argument("--l1-latency", type=int, default=1, help="L1 hit latency in cycles")
+    parser.add_argument("--l2-latency", type=int, default=10, help="L2 hit latency in cycles")
+    parser.add_argument("--memory-latency", type=int, help="main memory latency in cycles, turns on the latency model (default 100)")
+    args = parser.parse_args(argv)
+    if (args.source is None) == (args.resume is None):
+        parser.error("give either a source file or --resume")
+    engine = Engine(compiled=not args.interpret)
+    try:
+        if args.resume:
+            image, text = load_checkpoint(args.resume, engine)
+        else:
+            with open(args.source) as file:
+                text = file.read()
+        memory_ranges = [parse_memory_range(item) for item in args.memory]
+        icache = Cache(**parse_cache_spec(args.icache)) if args.icache else None
+        dcache = Cache(**parse_cache_spec(args.dcache)) if args.dcache else None
+        l2 = Cache(**parse_cache_spec(args.l2)) if args.l2 else None
+    except (OSError, ValueError) as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+    if not args.resume:
+        image, error = assemble(text)
+        if error:
+            print("Error: " + error, file=sys.stderr)
+            return 1
+        engine.load(image)
+    pipeline = None
+    predictor = None
+    if args.predictor:
+        predictor = BranchPredictor(args.predictor, return_stack=not args.no_return_stack)
+    if args.pipeline:
+        pipeline = Pipeline(forwarding=not args.no_forwarding, predictor=predictor)
+        engine.observers.append(pipeline)
+    elif predictor:
+        engine.observers.append(predictor)
+    caches = None
+    hierarchy = None
+    if l2 or args.memory_latency is not None:
+        hierarchy = MemoryHierarchy(Level("L1I", icache, args.l1_latency) if icache else None,
+                                    Level("L1D", dcache, args.l1_latency) if dcache else None,
+                                    [Level("L2", l2, args.l2_latency, "exclusive" if args.l2_exclusive else "inclusive")] if l2 else [],
+                                    100 if args.memory_latency is None else args.memory_latency)
+        hierarchy.attach(engine)
+    elif icache or dcache:
+        caches = CacheSimulator(icache, dcache)
+        caches.attach(engine)
+    # attached last, so the data accesses still reach the caches through it
+    trace = None
+    if args.trace:
+        try:
+            trace = TraceRecorder(args.trace)
+        except OSError as e:
+            print("Error: " + str(e), file=sys.stderr)
+            return 2
+        trace.attach(engine)
+    executed = engine.run(args.limit)
+    state = collect_state(engine, executed, memory_ranges)
+    if trace:
+        try:
+            trace.close()
+        except OSError as e:
+            print("Error: " + str(e), file=sys.stderr)
+            return 2
+        state["trace_records"] = trace.records
+    if args.save_checkpoint:
+        try:
+            save_checkpoint(args.save_checkpoint, engine, image, text)
+        except OSError as e:
+            print("Error: " + str(e), file=sys.stderr)
+            return 2
+    if pipeline:
+        state["pipeline"] = pipeline.report(engine.program)
+    if predictor:
+        state["predictor"] = predictor.report(engine.program)
+    if caches:
+        caches.detach()
+        state["cache"] = caches.report(engine.program)
+    if hierarchy:
+        hierarchy.detach()
+        state["hierarchy"] = hierarchy.report(engine.program)
+        state["estimated_cycles"] = hierarchy.estimated_cycles(pipeline.cycles() if pipeline else executed)
+    if args.profile:
+        try:
+            write_profile(args.profile, engine.profile.report())
+        except OSError as e:
+            print("Error: " + str(e), file=sys.stderr)
+            return 2
+    if args.json:
+        print(json.dumps(state, indent=2))
+    else:
+        print(format_text(state))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
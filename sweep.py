@@ -0,0 +1,109 @@
+# scaling sweep, runs a generated workload (workload.py) for a list of array sizes and tabulates
+# guest instructions, assembly and run time, time per guest instruction and peak memory for each size
+# usage: python -m sweep bubble_sort [--sizes 10,100,1000] [--order random] [--seed 0] [--limit 10000000] [--csv out.csv]
+# every size runs in a fresh worker process so its peak memory is its own
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from engine import assemble, Engine
+from guest_memory import guest_memory, PAGE_SIZE
+from workload import generate, workload_dict, ORDERS
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_SIZES = "10,100,1000,10000"
+DEFAULT_LIMIT = 10000000
+COLUMNS = ["size", "instructions", "finished", "assemble_seconds", "run_seconds", "us_per_instruction",
+           "instructions_per_second", "peak_rss_mb", "guest_kib"]
+
+# "10,100,1e3" -> [10, 100, 1000]
+def parse_sizes(text):
+    return [int(float(item)) for item in text.split(",") if item.strip()]
+# print(parse_sizes("10,1e3"))  # output: [10, 1000]
+
+# peak resident memory of this process in MiB, None where the resource module does not exist
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+# one sweep point, run in a worker process
+def measure_point(name, size, order, seed, limit, compiled):
+    text = generate(name, size, order, seed)
+    start = time.perf_counter()
+    image, error = assemble(text)
+    assemble_seconds = time.perf_counter() - start
+    if error:
+        raise ValueError(error)
+    engine = Engine(compiled=compiled)
+    engine.load(image)
+    start = time.perf_counter()
+    executed = engine.run(limit)
+    run_seconds = time.perf_counter() - start
+    return {
+        "size": size,
+        "instructions": executed,
+        "finished": engine.finished(),
+        "assemble_seconds": round(assemble_seconds, 4),
+        "run_seconds": round(run_seconds, 4),
+        "us_per_instruction": round(1e6 * run_seconds / executed, 3) if executed else 0.0,
+        "instructions_per_second": round(executed / run_seconds) if run_seconds else 0,
+        "peak_rss_mb": peak_rss_mb(),
+        "guest_kib": len(guest_memory.pages) * PAGE_SIZE // 1024,
+    }
+
+def sweep(name, sizes, order="random", seed=0, limit=DEFAULT_LIMIT, compiled=True):
+    rows = []
+    for size in sizes:
+        with multiprocessing.Pool(1) as pool:
+            rows.append(pool.apply(measure_point, (name, size, order, seed, limit, compiled)))
+    return rows
+
+def format_table(rows):
+    lines = ["%8s %12s %10s %10s %8s %12s %9s %9s" % ("size", "instructions", "assemble s", "run s", "us/instr",
+                                                     "instr/s", "peak MB", "guest KiB")]
+    for row in rows:
+        lines.append("%8d %12d%1s %9.4f %10.4f %8.3f %12d %9s %9d" % (
+            row["size"], row["instructions"], " " if row["finished"] else "+", row["assemble_seconds"], row["run_seconds"],
+            row["us_per_instruction"], row["instructions_per_second"], row["peak_rss_mb"], row["guest_kib"]))
+    if not all(row["finished"] for row in rows):
+        lines.append("+ stopped at --limit")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sweep", description="Run a generated workload over growing array sizes")
+    parser.add_argument("name", choices=list(workload_dict), help="workload to scale")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated array sizes")
+    parser.add_argument("--order", choices=ORDERS, default="random", help="order of the array values")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random values")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="stop each run after this many instructions")
+    parser.add_argument("--interpret", action="store_true", help="interpret one instruction at a time instead of compiled blocks")
+    parser.add_argument("--csv", help="also write the table to this CSV file")
+    parser.add_argument("--json", help="also write the rows to this JSON file")
+    args = parser.parse_args(argv)
+    try:
+        rows = sweep(args.name, parse_sizes(args.sizes), args.order, args.seed, args.limit, not args.interpret)
+        print(format_table(rows))
+        if args.csv:
+            with open(args.csv, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=COLUMNS)
+                writer.writeheader()
+                writer.writerows(rows)
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump({"workload": args.name, "order": args.order, "seed": args.seed, "rows": rows}, file, indent=2)
+    except (OSError, ValueError) as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
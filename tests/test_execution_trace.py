@@ -0,0 +1,27 @@
+# trace records of conditional instructions, interpreted and in compiled blocks
+import pytest
+from engine import assemble, Engine
+from execution_trace import TraceRecorder, TraceReader, INFO_REGISTER
+
+SOURCE = "mov r1, #1\ncmp r1, #1\nmovne r2, #7\naddseq r1, r1, #1\nmov r3, #3\n"
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_failed_condition_records_pc_and_flags_only(tmp_path, compiled):
+    image, error = assemble(SOURCE)
+    assert error is None
+    engine = Engine(compiled=compiled)
+    engine.load(image)
+    recorder = TraceRecorder(str(tmp_path / "run.trace"))
+    recorder.attach(engine)
+    engine.run(100)
+    recorder.close()
+    reader = TraceReader(str(tmp_path / "run.trace"))
+    records = list(reader)
+    reader.close()
+    assert len(records) == 5
+    # movne r2, #7 did not run
+    pc, info, value, address, data = records[2]
+    assert pc == 8 and info == 0x6 and (value, address, data) == (0, 0, 0)
+    # addseq ran and cleared Z, its register is still recorded
+    pc, info, value, _, _ = records[3]
+    assert pc == 12 and info & INFO_REGISTER and info >> 8 & 15 == 1 and value == 2
@@ -0,0 +1,18 @@
+# grading the final memory of a data label
+import os
+from grader import grade
+
+DEMO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Demo")
+
+def job(expected):
+    return {"id": "bubble_sort", "source": os.path.join(DEMO, "bubble_sort.s"), "expected": expected,
+            "limit": 100000, "timeout": 10.0}
+
+def test_array_label_is_its_data():
+    result = grade(job({"finished": True, "memory": {"array": [-7, 1, 2, 4, 5, 8], "length": [6]}}))
+    assert result["status"] == "pass", result
+
+def test_array_label_mismatch():
+    result = grade(job({"memory": {"array": [5, 1, 4, 2, 8, -7]}}))
+    assert result["status"] == "fail"
+    assert result["mismatches"][0].startswith("memory 0000006c")
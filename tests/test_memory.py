@@ -0,0 +1,22 @@
+# encoding of data processing instructions with a shifted register operand
+from engine import assemble, Engine
+from cpu import cpu_state
+
+def run(text):
+    image, error = assemble(text)
+    assert error is None
+    engine = Engine()
+    engine.load(image)
+    engine.run(100)
+    assert engine.finished()
+    return image
+
+def test_cmp_shifted_register():
+    image = run("mov r1, #4\nmov r2, #1\ncmp r1, r2, lsl #2\n")
+    assert len(image.words) == 3
+    assert cpu_state.flag("Z") == 1 and cpu_state.flag("C") == 1
+
+def test_tst_shifted_register():
+    image = run("mov r1, #5\nmov r2, #1\ntst r1, r2, lsl #1\n")
+    assert len(image.words) == 3
+    assert cpu_state.flag("Z") == 1
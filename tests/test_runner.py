@@ -0,0 +1,15 @@
+# command line runs of python -m runner
+import json
+import os
+import runner
+
+DEMO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Demo")
+
+def test_memory_latency_without_caches(capsys):
+    assert runner.main([os.path.join(DEMO, "factorial.s"), "--memory-latency", "50", "--json"]) == 0
+    state = json.loads(capsys.readouterr().out)
+    hierarchy = state["hierarchy"]
+    assert hierarchy["levels"] == []
+    # every fetch goes to memory
+    assert hierarchy["memory_reads"] >= state["instructions"]
+    assert hierarchy["stall_cycles"] > 0
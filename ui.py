@@ -1,25 +1,52 @@
 # GUI interface for the application
 from PyQt6 import QtCore, QtGui, QtWidgets
+import math
 import sys
-import assembly
-import data
-from dict import line_edit_dict, condition_dict, parse_labels, replace_memory, replace_memory_byte
-import memory
+import time
+from dict import line_edit_dict, condition_dict
+from cpu import cpu_state, register_names, flag_bit_dict
+from guest_memory import guest_memory
+from memory_view import MemoryTableModel, MemoryLayoutProxy
+from engine import assemble, Engine
+from history import History
+from checkpoint import save_checkpoint, decode_checkpoint, checkpoint_image, restore_checkpoint
+from message import set_error_handler
 from encoder import Encoder
-from decoder import Decoder
 
+# errors of the assembler and the simulator are shown in a message box
+def show_error_box(text):
+    QtWidgets.QMessageBox.critical(None, "Error", text)
+
+# instructions the worker runs between two checks of the stop flag and the refresh clock
+RUN_BATCH = 1000
+# seconds between two snapshots sent to the GUI while a program runs
+REFRESH_INTERVAL = 1 / 30
+# milliseconds between two repaints of the whole heat column while a program runs or is stepped
+HEAT_INTERVAL = 500
+
+# runs the engine back to back in the worker thread
+# the GUI only receives a snapshot of the cpu state every REFRESH_INTERVAL seconds and once when the run stops
 class RunCode(QtCore.QObject):
     finished = QtCore.pyqtSignal()
-    progress = QtCore.pyqtSignal()
+    progress = QtCore.pyqtSignal(object)
     def __init__(self):
         super().__init__()
         self._running = False
+        self.engine = None
+        self.breakpoints = set()
     def start_run_code(self):
         self._running = True
-        while self._running:
-            self.progress.emit()
-            for _ in range(500000):
-                pass
+        engine = self.engine
+        next_refresh = time.monotonic() + REFRESH_INTERVAL
+        at_breakpoint = False
+        while self._running and not engine.finished() and not at_breakpoint:
+            engine.run(RUN_BATCH, self.breakpoints)
+            at_breakpoint = engine.at_breakpoint(self.breakpoints)
+            if time.monotonic() >= next_refresh:
+                self.progress.emit(engine.snapshot())
+                next_refresh = time.monotonic() + REFRESH_INTERVAL
+        self._running = False
+        self.progress.emit(engine.snapshot())
         self.finished.emit()
     def stop_run_code(self):
         self._running = False
@@ -104,6 +131,7 @@ class CustomTableView(QtWidgets.QTableView):
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("MainWindow")
+        set_error_handler(show_error_box)
         MainWindow.resize(1080, 720)
         self.centralwidget = QtWidgets.QWidget(parent=MainWindow)
         self.centralwidget.setObjectName("centralwidget")
@@ -153,6 +181,12 @@ class Ui_MainWindow(object):
         self.RunBtn = QtWidgets.QPushButton(parent=self.tab_1)
         self.RunBtn.setGeometry(QtCore.QRect(270, 70, 111, 51))
         self.RunBtn.setObjectName("RunBtn")
+        self.StepBackBtn = QtWidgets.QPushButton(parent=self.tab_1)
+        self.StepBackBtn.setGeometry(QtCore.QRect(270, 250, 111, 41))
+        self.StepBackBtn.setObjectName("StepBackBtn")
+        self.RunBackBtn = QtWidgets.QPushButton(parent=self.tab_1)
+        self.RunBackBtn.setGeometry(QtCore.QRect(270, 300, 111, 41))
+        self.RunBackBtn.setObjectName("RunBackBtn")
         self.stackedCodeWidget = QtWidgets.QStackedWidget(parent=self.tab_1)
         self.stackedCodeWidget.setGeometry(QtCore.QRect(400, 0, 631, 601))
         self.stackedCodeWidget.setObjectName("stackedCodeWidget")
@@ -175,6 +209,8 @@ class Ui_MainWindow(object):
         self.RunBtn.clicked.connect(self.RunCode)
         self.QuitBtn.clicked.connect(self.Quit)
         self.StepBtn.clicked.connect(self.check_next_line)
+        self.StepBackBtn.clicked.connect(self.step_back)
+        self.RunBackBtn.clicked.connect(self.run_back)
         self.ImportBtn.clicked.connect(self.Import)
         self.ExportBtn.clicked.connect(self.Export)
 
@@ -315,7 +351,7 @@ class Ui_MainWindow(object):
         line_edit_dict["pc"] = self.pc_LineEdit
 
         self.formLayoutWidget_2 = QtWidgets.QWidget(parent=self.tab_1)
-        self.formLayoutWidget_2.setGeometry(QtCore.QRect(240, 300, 160, 138))
+        self.formLayoutWidget_2.setGeometry(QtCore.QRect(240, 350, 160, 138))
         self.formLayoutWidget_2.setObjectName("formLayoutWidget_2")
         self.Layout_condition = QtWidgets.QFormLayout(self.formLayoutWidget_2)
         self.Layout_condition.setContentsMargins(10, 10, 10, 10)
@@ -354,8 +390,11 @@ class Ui_MainWindow(object):
         condition_dict["c"] = self.c_LineEdit
         condition_dict["v"] = self.v_LineEdit
 
+        for line_edit in list(line_edit_dict.values()) + list(condition_dict.values()):
+            line_edit.editingFinished.connect(self.sync_register_from_view)
+
         self.formLayoutWidget_4 = QtWidgets.QWidget(parent=self.tab_1)
-        self.formLayoutWidget_4.setGeometry(QtCore.QRect(240, 470, 161, 80))
+        self.formLayoutWidget_4.setGeometry(QtCore.QRect(240, 500, 161, 80))
         self.formLayoutWidget_4.setObjectName("formLayoutWidget_4")
         self.formLayout_2 = QtWidgets.QFormLayout(self.formLayoutWidget_4)
         self.formLayout_2.setContentsMargins(0, 0, 0, 0)
@@ -434,7 +473,6 @@ class Ui_MainWindow(object):
         self.Addrr_Mem_View.setObjectName("Addrr_Mem_View")
         self.Addrr_Mem_View.verticalHeader().setVisible(False)
         self.Addrr_Mem_View.horizontalHeader().setVisible(False)
-        self.Addrr_Mem_View.verticalScrollBar().valueChanged.connect(self.on_scroll)
         self.tabWidget.addTab(self.tab_memory, "")
         self.gridLayout.addWidget(self.tabWidget, 1, 0, 1, 1)
         self.scrollArea.setWidget(self.scrollAreaWidgetContents)
@@ -446,63 +484,40 @@ class Ui_MainWindow(object):
         self.worker.moveToThread(self.thread)
         self.worker.progress.connect(self.check)
         self.worker.finished.connect(self.thread.quit)
+        self.worker.finished.connect(self.update_heat)
+        self.thread.started.connect(self.worker.start_run_code)
+        self.engine = Engine(compiled=True)
+        self.worker.engine = self.engine
+        # snapshots and undo log for Step Back / Run Back
+        self.history = History()
+        self.history.attach(self.engine)
+        self.breakpoints = set()
+        self.worker.breakpoints = self.breakpoints
+        self.registers_shown = list(cpu_state.registers)
+        # the whole heat column is repainted at most every HEAT_INTERVAL, a step only repaints its own row
+        self.heat_timer = QtCore.QTimer()
+        self.heat_timer.setSingleShot(True)
+        self.heat_timer.setInterval(HEAT_INTERVAL)
+        self.heat_timer.timeout.connect(self.update_heat)
 
         self.retranslateUi(MainWindow)
         self.tabWidget.setCurrentIndex(0)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
 
-        self.model_code = QtGui.QStandardItemModel(0, 3)
+        self.model_code = QtGui.QStandardItemModel(0, 5)
         self.CodeView.setModel(self.model_code)
         self.CodeView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
         self.model_code = self.add_header_model_code(self.model_code)
 
-        self.model = QtGui.QStandardItemModel(0, 7)
-        self.model = self.add_header_model_mem(self.model)
-
-        self.model_2 = QtGui.QStandardItemModel(0, 7)
-        self.model_2 = self.add_header_model_mem(self.model_2)
-
-        self.model_4 = QtGui.QStandardItemModel(0, 7)
-        self.model_4 = self.add_header_model_mem(self.model_4)
-
-        self.model_8 = QtGui.QStandardItemModel(0, 7)
-        self.model_8 = self.add_header_model_mem(self.model_8)
-
-        self.model_byte = QtGui.QStandardItemModel(0, 7)
-        self.model_byte = self.add_header_model_mem(self.model_byte)
-
-        self.model_2_byte = QtGui.QStandardItemModel(0, 7)
-        self.model_2_byte = self.add_header_model_mem(self.model_2_byte)
-
-        self.model_4_byte = QtGui.QStandardItemModel(0, 7)
-        self.model_4_byte = self.add_header_model_mem(self.model_4_byte)
-
-        self.model_8_byte = QtGui.QStandardItemModel(0, 7)
-        self.model_8_byte = self.add_header_model_mem(self.model_8_byte)
-
-        self.current_index = 0
-        self.current_index_x2 = 0
-        self.current_index_x4 = 0
-        self.current_index_x8 = 0
-        self.current_index_byte = 0
-        self.current_index_x2_byte = 0
-        self.current_index_x4_byte = 0
-        self.current_index_x8_byte = 0
-        self.total_items = 1073741823
-        self.items_per_batch = 100
-
-        self.load_mem_x1()
-        self.load_mem_x2()
-        self.load_mem_x4()
-        self.load_mem_x8()
-        self.load_mem_x1_byte()
-        self.load_mem_x2_byte()
-        self.load_mem_x4_byte()
-        self.load_mem_x8_byte()
+        self.model = MemoryTableModel()
+        self.model_layout = MemoryLayoutProxy(self.model)
+        self.Addrr_Mem_View.setModel(self.model_layout)
+        self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
         self.check_mem_per_row_option()
 
         delegate = CustomCheckBoxDelegate(self.CodeView)
         self.CodeView.setItemDelegateForColumn(0, delegate)
+        self.model_code.itemChanged.connect(self.code_breakpoint)
 
         self.GotoAddr.clicked.connect(self.search_memory)
         self.comboBox_memory_words_per_row.currentIndexChanged.connect(self.check_mem_per_row_option)
@@ -526,334 +541,59 @@ class Ui_MainWindow(object):
         label_assembly.setFlags(label_assembly.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
         label_assembly.setBackground(QtGui.QColor('gray'))
         label_assembly.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        model_code.appendRow([label_bkpt, label_address_code, label_opcode, label_assembly])
+        label_heat = QtGui.QStandardItem('Heat')
+        label_heat.setFlags(label_heat.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
+        label_heat.setBackground(QtGui.QColor('gray'))
+        label_heat.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        model_code.appendRow([label_bkpt, label_address_code, label_opcode, label_assembly, label_heat])
         self.CodeView.setColumnWidth(0, 25)
         self.CodeView.setColumnWidth(1, 80)
         self.CodeView.setColumnWidth(2, 80)
-        self.CodeView.setColumnWidth(3, 380)
+        self.CodeView.setColumnWidth(3, 320)
+        self.CodeView.setColumnWidth(4, 60)
         return model_code
 
-    def add_header_model_mem(self, model):
-        # self.Addrr_Mem_View.setSpan(0, 1, 1, 8)
-        label_address = QtGui.QStandardItem('Address')
-        label_address.setFlags(label_address.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_address.setBackground(QtGui.QColor('gray'))
-        label_memory = QtGui.QStandardItem('Memory')
-        label_memory.setFlags(label_memory.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_memory.setBackground(QtGui.QColor('gray'))
-        label_space_1 = QtGui.QStandardItem(" ")
-        label_space_1.setFlags(label_space_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_1.setBackground(QtGui.QColor('gray'))
-        label_space_2 = QtGui.QStandardItem(" ")
-        label_space_2.setFlags(label_space_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_2.setBackground(QtGui.QColor('gray'))
-        label_space_3 = QtGui.QStandardItem(" ")
-        label_space_3.setFlags(label_space_3.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_3.setBackground(QtGui.QColor('gray'))
-        label_space_4 = QtGui.QStandardItem(" ")
-        label_space_4.setFlags(label_space_4.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_4.setBackground(QtGui.QColor('gray'))
-        label_space_5 = QtGui.QStandardItem(" ")
-        label_space_5.setFlags(label_space_5.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_5.setBackground(QtGui.QColor('gray'))
-        label_space_6 = QtGui.QStandardItem(" ")
-        label_space_6.setFlags(label_space_6.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_6.setBackground(QtGui.QColor('gray'))
-        label_space_7 = QtGui.QStandardItem(" ")
-        label_space_7.setFlags(label_space_7.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        label_space_7.setBackground(QtGui.QColor('gray'))
-        model.appendRow([label_address, label_memory, label_space_1, label_space_2, label_space_3, label_space_4, label_space_5, label_space_6, label_space_7])
-        return model
-
     def check_mem_per_row_option(self):
-        if self.comboBox_size_memory.currentIndex() == 0:
-            if self.comboBox_memory_words_per_row.currentIndex() == 0:
-                self.Addrr_Mem_View.setModel(self.model)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-            if self.comboBox_memory_words_per_row.currentIndex() == 1:
-                self.Addrr_Mem_View.setModel(self.model_2)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-            if self.comboBox_memory_words_per_row.currentIndex() == 2:
-                self.Addrr_Mem_View.setModel(self.model_4)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-            if self.comboBox_memory_words_per_row.currentIndex() == 3:
-                self.Addrr_Mem_View.setModel(self.model_8)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-        if self.comboBox_size_memory.currentIndex() == 1:
-            if self.comboBox_memory_words_per_row.currentIndex() == 0:
-                self.Addrr_Mem_View.setModel(self.model_byte)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-            if self.comboBox_memory_words_per_row.currentIndex() == 1:
-                self.Addrr_Mem_View.setModel(self.model_2_byte)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-            if self.comboBox_memory_words_per_row.currentIndex() == 2:
-                self.Addrr_Mem_View.setModel(self.model_4_byte)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-            if self.comboBox_memory_words_per_row.currentIndex() == 3:
-                self.Addrr_Mem_View.setModel(self.model_8_byte)
-                self.Addrr_Mem_View.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
-    def load_mem_x1(self):
-        for i in range(self.current_index, min(self.current_index + self.items_per_batch * 8, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 4, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aaaaaaaa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model.appendRow([addr, mem_1])
-        self.current_index += self.items_per_batch * 8
-    def load_mem_x1_byte(self):
-        for i in range(self.current_index_byte, min(self.current_index_byte + self.items_per_batch * 8, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 4, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_byte.appendRow([addr, mem_1])
-        self.current_index_byte += self.items_per_batch * 8
-    def load_mem_x2(self):
-        for i in range(self.current_index_x2, min(self.current_index_x2 + self.items_per_batch * 4, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 8, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aaaaaaaa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_2 = QtGui.QStandardItem('aaaaaaaa')
-            mem_2.setFlags(mem_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_2.appendRow([addr, mem_1, mem_2])
-        self.current_index_x2 += self.items_per_batch * 4
-    def load_mem_x2_byte(self):
-        for i in range(self.current_index_x2_byte, min(self.current_index_x2_byte + self.items_per_batch * 4, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 8, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_2 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_2.setFlags(mem_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_2_byte.appendRow([addr, mem_1, mem_2])
-        self.current_index_x2_byte += self.items_per_batch * 4
-    def load_mem_x4(self):
-        for i in range(self.current_index_x4, min(self.current_index_x4 + self.items_per_batch * 2, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 16, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aaaaaaaa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_2 = QtGui.QStandardItem('aaaaaaaa')
-            mem_2.setFlags(mem_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_3 = QtGui.QStandardItem('aaaaaaaa')
-            mem_3.setFlags(mem_3.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_4 = QtGui.QStandardItem('aaaaaaaa')
-            mem_4.setFlags(mem_4.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_4.appendRow([addr, mem_1, mem_2, mem_3, mem_4])
-        self.current_index_x4 += self.items_per_batch * 2
-    def load_mem_x4_byte(self):
-        for i in range(self.current_index_x4_byte, min(self.current_index_x4_byte + self.items_per_batch * 2, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 16, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_2 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_2.setFlags(mem_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_3 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_3.setFlags(mem_3.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_4 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_4.setFlags(mem_4.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_4_byte.appendRow([addr, mem_1, mem_2, mem_3, mem_4])
-        self.current_index_x4_byte += self.items_per_batch * 2
-    def load_mem_x8(self):
-        for i in range(self.current_index_x8, min(self.current_index_x8 + self.items_per_batch, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 32, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aaaaaaaa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_2 = QtGui.QStandardItem('aaaaaaaa')
-            mem_2.setFlags(mem_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_3 = QtGui.QStandardItem('aaaaaaaa')
-            mem_3.setFlags(mem_3.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_4 = QtGui.QStandardItem('aaaaaaaa')
-            mem_4.setFlags(mem_4.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_5 = QtGui.QStandardItem('aaaaaaaa')
-            mem_5.setFlags(mem_5.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_6 = QtGui.QStandardItem('aaaaaaaa')
-            mem_6.setFlags(mem_6.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_7 = QtGui.QStandardItem('aaaaaaaa')
-            mem_7.setFlags(mem_7.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_8 = QtGui.QStandardItem('aaaaaaaa')
-            mem_8.setFlags(mem_8.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_8.appendRow([addr, mem_1, mem_2, mem_3, mem_4, mem_5, mem_6, mem_7, mem_8])
-        self.current_index_x8 += self.items_per_batch
-    def load_mem_x8_byte(self):
-        for i in range(self.current_index_x8_byte, min(self.current_index_x8_byte + self.items_per_batch, self.total_items)):
-            addr = QtGui.QStandardItem(format(i * 32, '08x'))
-            addr.setFlags(addr.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            addr.setBackground(QtGui.QColor('gray'))
-            mem_1 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_1.setFlags(mem_1.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_2 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_2.setFlags(mem_2.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_3 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_3.setFlags(mem_3.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_4 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_4.setFlags(mem_4.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_5 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_5.setFlags(mem_5.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_6 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_6.setFlags(mem_6.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_7 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_7.setFlags(mem_7.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            mem_8 = QtGui.QStandardItem('aa' + " " + 'aa' + " " + 'aa' + " " + 'aa')
-            mem_8.setFlags(mem_8.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_8_byte.appendRow([addr, mem_1, mem_2, mem_3, mem_4, mem_5, mem_6, mem_7, mem_8])
-        self.current_index_x8_byte += self.items_per_batch
-    def on_scroll(self, value):
-        max_scroll = self.Addrr_Mem_View.verticalScrollBar().maximum()
-        if value >= max_scroll and self.current_index < self.total_items:
-            self.load_mem_x1()
-            self.load_mem_x2()
-            self.load_mem_x4()
-            self.load_mem_x8()
-            self.load_mem_x1_byte()
-            self.load_mem_x2_byte()
-            self.load_mem_x4_byte()
-            self.load_mem_x8_byte()
-    def search_memory(self):
-        self.reset_search_memory(self.model)
-        self.reset_search_memory(self.model_2)
-        self.reset_search_memory(self.model_4)
-        self.reset_search_memory(self.model_8)
-        self.reset_search_memory(self.model_byte)
-        self.reset_search_memory(self.model_2_byte)
-        self.reset_search_memory(self.model_4_byte)
-        self.reset_search_memory(self.model_8_byte)
+        words_per_row = [1, 2, 4, 8][max(self.comboBox_memory_words_per_row.currentIndex(), 0)]
+        self.model_layout.set_layout(words_per_row, self.comboBox_size_memory.currentIndex() == 1)
+        self.refresh_memory_view()
+
+    # the memory model reads guest memory when a cell is painted, so a refresh only repaints the view
+    def refresh_memory_view(self):
+        guest_memory.dirty_words.clear()
+        self.model.refresh()
 
-        self.highlight_search_memory(self.model)
-        self.highlight_search_memory(self.model_2)
-        self.highlight_search_memory(self.model_4)
-        self.highlight_search_memory(self.model_8)
-        self.highlight_search_memory(self.model_byte)
-        self.highlight_search_memory(self.model_2_byte)
-        self.highlight_search_memory(self.model_4_byte)
-        self.highlight_search_memory(self.model_8_byte)
-    def reset_search_memory(self, model):
-        for row in range(1, model.rowCount()):
-            for col in range(1, model.columnCount()):
-                if model.item(row, col):
-                    model.item(row, col).setBackground(QtGui.QColor("white"))
-    def highlight_search_memory(self, model):
+    def search_memory(self):
         search_text = self.Address_search_LineEdit.text()
-        if search_text:
-            found = False
-            search_value  = int(search_text, 16)
-            while not found and self.current_index > 0:
-                max_row = model.rowCount() - 1
-                for row in range(1, model.rowCount()):
-                    item_addr = model.item(row, 0)
-                    if row != max_row:
-                        item_addr_next = model.item(row + 1, 0)
-                        addr_next = item_addr_next.text()
-                    if item_addr:
-                        addr = item_addr.text()
-                    if search_value == int(addr, 16):
-                        model.item(row, 1).setBackground(QtGui.QColor("yellow"))
-                        self.Addrr_Mem_View.scrollTo(model.index(row, 1))
-                        break
-                    if addr_next and search_value > int(addr, 16) and search_value < int(addr_next, 16):
-                        num = int((search_value - int(addr, 16)) / 4) + 1
-                        model.item(row, num).setBackground(QtGui.QColor("yellow"))
-                        self.Addrr_Mem_View.scrollTo(model.index(row, num))
-                        break
-                    if not addr_next and search_value > int(addr, 16):
-                        num = int((search_value - int(addr, 16)) / 4) + 1
-                        model.item(row, num).setBackground(QtGui.QColor("yellow"))
-                        self.Addrr_Mem_View.scrollTo(model.index(row, num))
-                        break
-                if not found:
-                    last_item_value = int(model.item(model.rowCount() - 1, 0).text(), 16)
-                    if search_value < last_item_value:
-                        break
-                    self.load_mem_x1()
-                    self.load_mem_x2()
-                    self.load_mem_x4()
-                    self.load_mem_x8()
-                    self.load_mem_x1_byte()
-                    self.load_mem_x2_byte()
-                    self.load_mem_x4_byte()
-                    self.load_mem_x8_byte()
+        if not search_text:
+            return
+        try:
+            search_value = int(search_text, 16)
+        except ValueError:
+            QtWidgets.QMessageBox.critical(None, "Error", "Invalid address - " + search_text)
+            return
+        self.model.search_address(search_value)
+        cell = self.model_layout.find_cell(search_value)
+        if cell:
+            self.Addrr_Mem_View.scrollTo(self.model_layout.index(cell[0], cell[1]))
 
+    # assembles the editor text, keeps the image for show_code_view and returns True on error
     def check_code_assembly(self):
-        text = self.CodeEditText.toPlainText()
-        lines = text.split("\n")
-        lines, data_lines = data.parse_data(lines)
-        labels, lines_clean = parse_labels(lines)
-        lines = [item for item in lines if item not in [" ", None]]
-        lines = [' '.join(item.split()) for item in lines if item.strip()]
-        lines_clean = [item for item in lines_clean if item not in [" ", None]]
-        lines_clean = [' '.join(item.split()) for item in lines_clean if item.strip()]
-        for index, line in enumerate(lines_clean, start=1):
-            pc_binary = format(self.pc, '08x')
-            self.address.append(pc_binary)
-            self.pc += self.instruction_size
-        self.data_labels, data_address, data_memory = data.process_data(data_lines, self.address)
-        if data_address:
-            self.address.extend(data_address)
-        for index, line in enumerate(lines_clean, start=1):
-            memory_line = memory.check_memory(self, line, self.address, lines_clean, self.data_labels)
-            if memory_line:
-                int_memory_line = Decoder(memory_line)
-                memory_line = format(int_memory_line, '08x')
-                self.memory_current_line.append(memory_line)
-            memory_line_branch = memory.memory_branch(self, line, lines_clean, self.address, labels)
-            if memory_line_branch:
-                int_memory_line_branch = Decoder(memory_line_branch)
-                memory_line_branch = format(int_memory_line_branch, '08x')
-                self.memory_current_line.append(memory_line_branch)
-            memory_line_stacked = memory.memory_stacked(self, line, lines_clean, self.address, labels)
-            if memory_line_stacked:
-                int_memory_line_stacked = Decoder(memory_line_stacked)
-                memory_line_stacked = format(int_memory_line_stacked, '08x')
-                self.memory_current_line.append(memory_line_stacked)
-            if not memory_line and not memory_line_branch and not memory_line_stacked:
-                print(line)
-        if data_memory:
-            self.memory_current_line.extend(data_memory)
-        if len(self.address) != len(self.memory_current_line):
-            QtWidgets.QMessageBox.critical(None, "Error", "Error memory")
+        image, error = assemble(self.CodeEditText.toPlainText())
+        if error == "Error memory":
+            QtWidgets.QMessageBox.critical(None, "Error", error)
             self.Quit()
             return True
-        replace_memory(self.model, self.address, self.memory_current_line)
-        replace_memory(self.model_2, self.address, self.memory_current_line)
-        replace_memory(self.model_4, self.address, self.memory_current_line)
-        replace_memory(self.model_8, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_byte, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_2_byte, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_4_byte, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_8_byte, self.address, self.memory_current_line)
-        for i in range(len(lines_clean)):
-            line = lines_clean[i]
-            if line.strip():
-                _, arguments, label, flag_B, _, _, _, _, flag_T = assembly.check_assembly_line(self, lines_clean, line, self.address, self.memory_current_line, self.data_labels
-                                                                                                    , self.model, self.model_2, self.model_4, self.model_8
-                                                                                                    , self.model_byte, self.model_2_byte, self.model_4_byte, self.model_8_byte
-                                                                                                    , self.stacked)
-            if flag_B == 3:
-                QtWidgets.QMessageBox.critical(None, "Error", "Out of range to POP!")
-                return True
-            if label != None and (label not in labels) and (label not in lines_clean):
-                QtWidgets.QMessageBox.critical(None, "Error", "Label not found: " + label + " in line [" + line + "] in program")
-                return True
-            if flag_B or (arguments is None and flag_T):
-                pass
-            elif arguments is None:
-                QtWidgets.QMessageBox.critical(None, "Error", "Command in line " + "[" + line + "]"+ " is invalid")
-                return True
+        if error:
+            QtWidgets.QMessageBox.critical(None, "Error", error)
+            return True
         self.Quit()
+        self.image = image
+        self.engine.set_program(image.program)
         return False
 
     def show_code_edit(self):
-        self.worker.stop_run_code()
+        self.stop_running()
         self.stackedCodeWidget.setCurrentIndex(0)
 
     have_compile = False
@@ -867,59 +607,37 @@ class Ui_MainWindow(object):
         eror = self.check_code_assembly()
         if eror:
             return
-        lines = text.split("\n")
-        lines, data_lines = data.parse_data(lines)
-        labels, lines_clean = parse_labels(lines)
-        lines = [item for item in lines if item not in [" ", None]]
-        lines = [' '.join(item.split()) for item in lines if item.strip()]
-        lines_clean = [item for item in lines_clean if item not in [" ", None]]
-        lines_clean = [' '.join(item.split()) for item in lines_clean if item.strip()]
-        for index, line in enumerate(lines_clean, start=1):
-            pc_binary = format(self.pc, '08x')
-            self.address.append(pc_binary)
-            self.pc += self.instruction_size
-        self.data_labels, data_address, data_memory = data.process_data(data_lines, self.address)
-        if data_address:
-            self.address.extend(data_address)
-        for index, line in enumerate(lines_clean, start=1):
-            memory_line = memory.check_memory(self, line, self.address, lines_clean, self.data_labels)
-            if memory_line:
-                int_memory_line = Decoder(memory_line)
-                memory_line = format(int_memory_line, '08x')
-                self.memory_current_line.append(memory_line)
-            memory_line_branch = memory.memory_branch(self, line, lines_clean, self.address, labels)
-            if memory_line_branch:
-                int_memory_line_branch = Decoder(memory_line_branch)
-                memory_line_branch = format(int_memory_line_branch, '08x')
-                self.memory_current_line.append(memory_line_branch)
-            memory_line_stacked = memory.memory_stacked(self, line, lines_clean, self.address, labels)
-            if memory_line_stacked:
-                int_memory_line_stacked = Decoder(memory_line_stacked)
-                memory_line_stacked = format(int_memory_line_stacked, '08x')
-                self.memory_current_line.append(memory_line_stacked)
-        if data_memory:
-            self.memory_current_line.extend(data_memory)
-        replace_memory(self.model, self.address, self.memory_current_line)
-        replace_memory(self.model_2, self.address, self.memory_current_line)
-        replace_memory(self.model_4, self.address, self.memory_current_line)
-        replace_memory(self.model_8, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_byte, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_2_byte, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_4_byte, self.address, self.memory_current_line)
-        replace_memory_byte(self.model_8_byte, self.address, self.memory_current_line)
-        mapping_addr_mem = {key: value for key, value in zip(self.address, self.memory_current_line)}
+        self.show_image()
+
+    # fills the code view and memory from self.image, the program the engine runs
+    def show_image(self):
+        lines = self.image.lines
+        self.address = list(self.image.address)
+        self.memory_current_line = list(self.image.words)
+        self.data_labels = self.image.data_labels
+        self.pc = self.instruction_size * len(self.image.lines_clean)
+        guest_memory.load_image(self.address, self.memory_current_line)
+        self.history.restart()
+        self.refresh_memory_view()
+        # code address <-> row of model_code, built once here and read by every step
+        self.code_row_dict = {}
+        self.row_address_dict = {}
+        self.highlighted_rows = []
         temp = 0
         for i in range(len(lines)):
             line = lines[i]
             if not line.endswith(':'):
                 addr_text = self.address[temp]
+                opcode_text = self.memory_current_line[temp]
                 temp += 1
+                self.code_row_dict[int(addr_text, 16)] = self.model_code.rowCount()
+                self.row_address_dict[self.model_code.rowCount()] = int(addr_text, 16)
                 bkpt = QtGui.QStandardItem()
                 bkpt.setCheckable(True)
                 bkpt.setCheckState(QtCore.Qt.CheckState.Unchecked)
                 bkpt.setFlags(QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
                 addr = QtGui.QStandardItem(addr_text)
-                opcode = QtGui.QStandardItem(mapping_addr_mem.get(addr_text))
+                opcode = QtGui.QStandardItem(opcode_text)
                 assembly = QtGui.QStandardItem("    " + line)
             if line.endswith(':'):
                 bkpt = QtGui.QStandardItem()
@@ -936,22 +654,31 @@ class Ui_MainWindow(object):
             opcode.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
             opcode.setBackground(QtGui.QColor('gray'))
             assembly.setFlags(assembly.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-            self.model_code.appendRow([bkpt, addr, opcode, assembly])
+            assembly.setBackground(QtGui.QColor('gray'))
+            heat = QtGui.QStandardItem(" ")
+            heat.setFlags(heat.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
+            heat.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+            heat.setBackground(QtGui.QColor('gray'))
+            self.model_code.appendRow([bkpt, addr, opcode, assembly, heat])
+        self.heat_counts = [0] * len(self.engine.program)
+        self.heat_hottest = 0
         self.highlight_line("00000000")
         self.stackedCodeWidget.setCurrentIndex(1)
         self.have_compile = True
-        if self.thread.isRunning():
-            self.worker.stop_run_code()
+        self.stop_running()
 
-    bkpt = []
-    def code_breakpoint(self):
-        self.bkpt = []
-        for row in range(1, self.model_code.rowCount()):
-            item_checkbox = self.model_code.item(row, 0)
-            item_line = self.model_code.item(row, 3)
-            if item_checkbox.isCheckable() and item_checkbox.checkState() == QtCore.Qt.CheckState.Checked:
-                line = item_line.text().strip()
-                self.bkpt.append(line)
+    # addresses of the checked breakpoints, shared with the worker so a change applies to a running program
+    breakpoints = set()
+    def code_breakpoint(self, item):
+        if item.column() != 0 or not item.isCheckable():
+            return
+        address = self.row_address_dict.get(item.row())
+        if address == None:
+            return
+        if item.checkState() == QtCore.Qt.CheckState.Checked:
+            self.breakpoints.add(address)
+        else:
+            self.breakpoints.discard(address)
 
     def reset_backgroud_register(self):
         self.r0_LineEdit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
@@ -975,12 +702,53 @@ class Ui_MainWindow(object):
         self.c_LineEdit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
         self.v_LineEdit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
 
+    # mirror the cpu state, or the registers and flags of a snapshot, into the register and flag widgets
+    def update_register_view(self, changed=(), registers=None, nzcv=None):
+        if registers is None:
+            registers = cpu_state.registers
+        if nzcv is None:
+            nzcv = cpu_state.nzcv
+        for i in range(16):
+            line_edit = line_edit_dict.get(register_names[i])
+            line_edit.setText(format(registers[i], '08x'))
+        for name in changed:
+            line_edit = line_edit_dict.get(name.lower())
+            if line_edit != None:
+                line_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
+        for name, line_edit in condition_dict.items():
+            flag = 1 if nzcv & flag_bit_dict[name] else 0
+            line_edit.setText(str(flag))
+            if flag == 1:
+                line_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
+
+    # values typed into the register or flag widgets are copied back into the cpu state
+    def sync_register_from_view(self):
+        state_before = (list(cpu_state.registers), cpu_state.nzcv)
+        for name, line_edit in line_edit_dict.items():
+            try:
+                cpu_state.write(name, int(line_edit.text(), 16))
+            except ValueError:
+                line_edit.setText(format(cpu_state.read(name), '08x'))
+        flags = []
+        for name, line_edit in condition_dict.items():
+            if line_edit.text() in ("0", "1"):
+                flags.append(line_edit.text())
+            else:
+                flags.append(str(cpu_state.flag(name)))
+                line_edit.setText(flags[-1])
+        cpu_state.set_flags(flags[0], flags[1], flags[2], flags[3])
+        # stepping back must not undo an edit, the edited state becomes the oldest one
+        if (list(cpu_state.registers), cpu_state.nzcv) != state_before:
+            self.history.restart()
+
     def retranslateUi(self, MainWindow):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "ARMv7 Simulator"))
         self.CompileBtn.setText(_translate("MainWindow", "Compile"))
         self.QuitBtn.setText(_translate("MainWindow", "Quit"))
         self.StepBtn.setText(_translate("MainWindow", "Step"))
+        self.StepBackBtn.setText(_translate("MainWindow", "Step Back"))
+        self.RunBackBtn.setText(_translate("MainWindow", "Run Back"))
         self.RunBtn.setText(_translate("MainWindow", "Run"))
         self.r0_Label.setText(_translate("MainWindow", "r0"))
         self.r0_LineEdit.setText(_translate("MainWindow", format(0, '08x')))
@@ -1075,252 +843,170 @@ class Ui_MainWindow(object):
     memory_current_line = []
     data_labels = []
     address = []
-    current_line_index = 0
     row = []
-    stacked = []
-    def check(self):
-        global pc
-        text = self.CodeEditText.toPlainText()
-        lines = text.split("\n")
-        lines, _ = data.parse_data(lines)
-        labels, lines = parse_labels(lines)
-        lines = [item for item in lines if item not in ["", None]]
-        lines = [' '.join(item.split()) for item in lines if item.strip()]
-        mapping = {key: value for key, value in zip(self.address, lines)}
-        self.code_breakpoint()
-        if self.current_line_index < len(lines):
-            if len(self.address) == None or self.current_line_index >= len(self.address):
-                return
-            line = lines[self.current_line_index]
-            if line.strip() in self.bkpt:
-                if self.thread.isRunning():
-                    self.worker.stop_run_code()
-                return
-            self.reset_backgroud_register()
+    code_row_dict = {}
+    row_address_dict = {}
+    highlighted_rows = []
+    # shows a snapshot sent by the worker while the program runs
+    def check(self, snapshot):
+        self.show_execution_state(self.registers_shown, snapshot)
+        self.registers_shown = list(snapshot.registers)
+        self.schedule_heat()
+
+    # execute the decoded instruction at current_line_index and refresh the views
+    def execute_current_line(self):
+        registers_before = list(cpu_state.registers)
+        index = self.engine.current_line_index
+        self.engine.step()
+        self.show_execution_state(registers_before, self.engine.snapshot())
+        self.count_heat(index)
+
+    # highlights the next line and the registers changed since registers_before
+    def show_execution_state(self, registers_before, snapshot):
+        self.reset_backgroud_register()
+        if snapshot.current_line_index >= len(self.engine.program):
             self.reset_highlight()
-            pc_binary = self.address[self.current_line_index]
-            self.pc_LineEdit.setText(pc_binary)
-            if line.strip():
-                reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T = assembly.check_assembly_line(self, lines, line, self.address, self.memory_current_line, self.data_labels
-                                                                                                      , self.model, self.model_2, self.model_4, self.model_8
-                                                                                                      , self.model_byte, self.model_2_byte, self.model_4_byte, self.model_8_byte
-                                                                                                      , self.stacked)
-                self.current_line_index += 1
-            if flag_B == 2:
-                self.stacked = []
-            if label in labels:
-                position = lines.index(labels[label][0])
-                self.current_line_index = position
-            elif label in lines:
-                position = lines.index(label)
-                self.current_line_index = position
-            if self.current_line_index >= len(lines):
-                self.worker.stop_run_code()
-                self.reset_highlight()
-                for row in range(1, self.model_code.rowCount()):
-                    item = self.model_code.item(row, 3)
-                    if item != None:
-                        item.setBackground(QtGui.QColor('darkGray'))
-            else:
-                pc_binary = self.address[self.current_line_index]
-                self.highlight_line(pc_binary)
-            if flag_T:
-                pass
-            elif arguments and len(reg) == len(arguments):
-                for i in range(len(arguments)):
-                    line_edit = line_edit_dict.get(reg[i])
-                    result_int = int(arguments[i], 2)
-                    result_str = format(result_int, '08x')
-                    line_edit.setText(result_str)
-                    line_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            n_edit = condition_dict.get("n")
-            z_edit = condition_dict.get("z")
-            c_edit = condition_dict.get("c")
-            v_edit = condition_dict.get("v")
-            n_edit.setText(flag_N)
-            z_edit.setText(flag_Z)
-            c_edit.setText(flag_C)
-            v_edit.setText(flag_V)
-            if flag_N == '1':
-                n_edit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            if flag_Z == '1':
-                z_edit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            if flag_C == '1':
-                c_edit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            if flag_V == '1':
-                v_edit.setStyleSheet("background-color: gray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
+            for row in range(1, self.model_code.rowCount()):
+                item = self.model_code.item(row, 3)
+                if item != None:
+                    item.setBackground(QtGui.QColor('darkGray'))
+                    self.highlighted_rows.append(row)
         else:
-            self.worker.stop_run_code()
+            pc_binary = format(self.engine.program[snapshot.current_line_index].address, '08x')
+            self.highlight_line(pc_binary)
+        changed = []
+        for i in range(15):
+            if snapshot.registers[i] != registers_before[i]:
+                changed.append(register_names[i])
+        self.update_register_view(changed, snapshot.registers, snapshot.nzcv)
+        if guest_memory.dirty_words:
+            self.refresh_memory_view()
+
+    # heat column: times each line has run, from white (rarely) to red (the hottest line) on a log scale
+    # heat_counts are the counts shown, heat_hottest the count the shades were scaled to
+    heat_counts = []
+    heat_hottest = 0
+    def update_heat(self):
+        self.heat_timer.stop()
+        executions = self.engine.profile.executions()
+        self.heat_counts = executions
+        self.heat_hottest = max(executions, default=0)
+        for i in range(len(executions)):
+            self.paint_heat(i)
+
+    # a step ran the instruction at index once more, only its row is repainted
+    # a count past the scale is shown at full red until the next repaint of the whole column
+    def count_heat(self, index):
+        if index >= len(self.heat_counts):
+            return
+        self.heat_counts[index] += 1
+        if self.heat_counts[index] > self.heat_hottest:
+            self.schedule_heat()
+        self.paint_heat(index)
+
+    def schedule_heat(self):
+        if not self.heat_timer.isActive():
+            self.heat_timer.start()
+
+    def paint_heat(self, index):
+        row = self.code_row_dict.get(self.engine.program[index].address)
+        item = self.model_code.item(row, 4) if row != None else None
+        if item == None:
+            return
+        count = self.heat_counts[index]
+        if count:
+            shade = int(255 * (1 - math.log1p(count) / math.log1p(max(self.heat_hottest, count))))
+            item.setText(str(count))
+            item.setBackground(QtGui.QColor(255, shade, shade))
+        else:
+            item.setText(" ")
+            item.setBackground(QtGui.QColor('gray'))
+
+    # only the rows highlighted since the last reset are painted back
     def reset_highlight(self):
-        for row in range(1, self.model_code.rowCount()):
+        for row in self.highlighted_rows:
             item = self.model_code.item(row, 3)
             if item != None:
                 item.setBackground(QtGui.QColor("gray"))
+        self.highlighted_rows = []
     def highlight_line(self, pc_binary):
         self.reset_highlight()
-        search_value  = int(pc_binary, 16)
-        for row in range(1, self.model_code.rowCount()):
-            addr_line = self.model_code.item(row, 1)
-            addr_line_text = addr_line.text()
-            try:
-                if search_value == int(addr_line_text, 16):
-                    item = self.model_code.item(row, 3)
-                    item.setBackground(QtGui.QColor("darkGray"))
-            except ValueError:
-                pass
+        row = self.code_row_dict.get(int(pc_binary, 16))
+        if row != None:
+            self.model_code.item(row, 3).setBackground(QtGui.QColor("darkGray"))
+            self.highlighted_rows.append(row)
 
-    def check_next_line(self):
+    # stops the worker and waits for it, so the cpu state is not written by two threads
+    def stop_running(self):
         if self.thread.isRunning():
             self.worker.stop_run_code()
+            self.thread.quit()
+            self.thread.wait()
+
+    def check_next_line(self):
+        self.stop_running()
         if self.stackedCodeWidget.currentIndex() == 0:
             QtWidgets.QMessageBox.critical(None, "Error", "Please compile code")
             self.Quit()
             return
-        global current_line_index
-        text = self.CodeEditText.toPlainText()
-        lines = text.split("\n")
-        lines, _ = data.parse_data(lines)
-        labels, lines = parse_labels(lines)
-        lines = [item for item in lines if item not in ["", None]]
-        mapping = {key: value for key, value in zip(self.address, lines)}
-        if self.current_line_index < len(lines):
-            self.reset_backgroud_register()
-            self.reset_highlight()
-            pc_binary = self.address[self.current_line_index]
-            self.pc_LineEdit.setText(pc_binary)
-            current_line = lines[self.current_line_index]
-            if current_line.strip():
-                reg, arguments, label, flag_B, flag_N, flag_Z, flag_C, flag_V, flag_T = assembly.check_assembly_line(self, lines, current_line, self.address, self.memory_current_line, self.data_labels
-                                                                                                      , self.model, self.model_2, self.model_4, self.model_8
-                                                                                                      , self.model_byte, self.model_2_byte, self.model_4_byte, self.model_8_byte
-                                                                                                      , self.stacked)
-                self.current_line_index += 1
-            if flag_B == 2:
-                self.stacked = []
-            if label in labels:
-                position = lines.index(labels[label][0])
-                self.current_line_index = position
-            elif label in lines:
-                position = lines.index(label)
-                self.current_line_index = position
-            if self.current_line_index >= len(lines):
-                self.reset_highlight()
-                for row in range(1, self.model_code.rowCount()):
-                    item = self.model_code.item(row, 3)
-                    if item != None:
-                        item.setBackground(QtGui.QColor('darkGray'))
-            else:
-                pc_binary = self.address[self.current_line_index]
-                self.highlight_line(pc_binary)
-            if flag_T:
-                pass
-            elif arguments and len(reg) == len(arguments):
-                for i in range(len(arguments)):
-                    line_edit = line_edit_dict.get(reg[i])
-                    result_int = int(arguments[i], 2)
-                    result_str = format(result_int, '08x')
-                    line_edit.setText(result_str)
-                    line_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            n_edit = condition_dict.get("n")
-            z_edit = condition_dict.get("z")
-            c_edit = condition_dict.get("c")
-            v_edit = condition_dict.get("v")
-            n_edit.setText(flag_N)
-            z_edit.setText(flag_Z)
-            c_edit.setText(flag_C)
-            v_edit.setText(flag_V)
-            if flag_N == '1':
-                n_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            if flag_Z == '1':
-                z_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            if flag_C == '1':
-                c_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
-            if flag_V == '1':
-                v_edit.setStyleSheet("background-color: darkGray; font-family: 'Open Sans', Verdana, Arial, sans-serif; font-size: 16px;")
+        if not self.engine.finished():
+            self.execute_current_line()
+
+    # puts the program back by one instruction, or back to the last breakpoint it passed with Run Back
+    def step_back(self):
+        self.move_back(1)
+    def run_back(self):
+        self.move_back(None)
+    def move_back(self, limit):
+        self.stop_running()
+        if self.stackedCodeWidget.currentIndex() == 0:
+            QtWidgets.QMessageBox.critical(None, "Error", "Please compile code")
+            self.Quit()
+            return
+        registers_before = list(cpu_state.registers)
+        if self.history.run_back(self.breakpoints, limit):
+            self.registers_shown = list(cpu_state.registers)
+            self.show_execution_state(registers_before, self.engine.snapshot())
+            self.update_heat()
+            self.refresh_memory_view()
 
     def RunCode(self):
-        thread_connected = False
         if self.stackedCodeWidget.currentIndex() == 0:
             QtWidgets.QMessageBox.critical(None, "Error", "Please compile code")
             self.Quit()
             return
-        if not self.thread.isRunning():
-            if not thread_connected:
-                self.thread.started.connect(self.worker.start_run_code)
-                thread_connected = True
+        if not self.thread.isRunning() and not self.engine.finished():
+            self.registers_shown = list(cpu_state.registers)
             self.thread.start()
 
     def Quit(self):
-        self.worker.stop_run_code()
+        self.stop_running()
         self.show_code_edit()
         self.address = []
         self.memory_current_line = []
         self.reset_backgroud_register()
         self.reset_highlight()
-        self.stacked = []
-        self.r0_LineEdit.setText(format(0, '08x'))
-        self.r1_LineEdit.setText(format(0, '08x'))
-        self.r2_LineEdit.setText(format(0, '08x'))
-        self.r3_LineEdit.setText(format(0, '08x'))
-        self.r4_LineEdit.setText(format(0, '08x'))
-        self.r5_LineEdit.setText(format(0, '08x'))
-        self.r6_LineEdit.setText(format(0, '08x'))
-        self.r7_LineEdit.setText(format(0, '08x'))
-        self.r8_LineEdit.setText(format(0, '08x'))
-        self.r9_LineEdit.setText(format(0, '08x'))
-        self.r10_LineEdit.setText(format(0, '08x'))
-        self.r11_LineEdit.setText(format(0, '08x'))
-        self.r12_LineEdit.setText(format(0, '08x'))
-        self.sp_LineEdit.setText(format(0, '08x'))
-        self.lr_LineEdit.setText(format(0, '08x'))
-        self.pc_LineEdit.setText(format(0, '08x'))
+        self.engine.set_program(())
+        cpu_state.reset()
+        guest_memory.reset()
+        self.update_register_view()
         self.pc = 0
-        self.current_line_index = 0
-        self.n_LineEdit.setText("0")
-        self.z_LineEdit.setText("0")
-        self.c_LineEdit.setText("0")
-        self.v_LineEdit.setText("0")
-        self.current_index = 0
-        self.current_index_x2 = 0
-        self.current_index_x4 = 0
-        self.current_index_x8 = 0
-        self.current_index_byte = 0
-        self.current_index_x2_byte = 0
-        self.current_index_x4_byte = 0
-        self.current_index_x8_byte = 0
-        self.model.clear()
-        self.model = self.add_header_model_mem(self.model)
-        self.model_2.clear()
-        self.model_2 = self.add_header_model_mem(self.model_2)
-        self.model_4.clear()
-        self.model_4 = self.add_header_model_mem(self.model_4)
-        self.model_8.clear()
-        self.model_8 = self.add_header_model_mem(self.model_8)
-        self.model_byte.clear()
-        self.model_byte = self.add_header_model_mem(self.model_byte)
-        self.model_2_byte.clear()
-        self.model_2_byte = self.add_header_model_mem(self.model_2_byte)
-        self.model_4_byte.clear()
-        self.model_4_byte = self.add_header_model_mem(self.model_4_byte)
-        self.model_8_byte.clear()
-        self.model_8_byte = self.add_header_model_mem(self.model_8_byte)
-        self.load_mem_x1()
-        self.load_mem_x2()
-        self.load_mem_x4()
-        self.load_mem_x8()
-        self.load_mem_x1_byte()
-        self.load_mem_x2_byte()
-        self.load_mem_x4_byte()
-        self.load_mem_x8_byte()
+        self.model.reset()
         self.Address_search_LineEdit.setText(format(0, '08x'))
         self.row = []
-        self.bkpt = []
+        self.code_row_dict = {}
+        self.row_address_dict = {}
+        self.breakpoints.clear()
         self.have_compile = False
         self.model_code.clear()
         self.model_code = self.add_header_model_code(self.model_code)
 
+    # a .ckpt file gets the whole machine state of the compiled program, any other file the source text
     def Export(self):
-        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(None, "Save File", "", "Text Files (*.txt);;Assembly Files (*.s)")
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(None, "Save File", "", "Text Files (*.txt);;Assembly Files (*.s);;Checkpoint Files (*.ckpt)")
+        if file_path.endswith(".ckpt"):
+            self.export_checkpoint(file_path)
+            return
         if file_path:
             try:
                 file_content = self.CodeEditText.toPlainText()
@@ -1337,7 +1023,10 @@ class Ui_MainWindow(object):
             QtWidgets.QMessageBox.critical(None, "Error", "Please click Quit button to return to the tab_1")
             self.Quit()
             return
-        file_path, _ = QtWidgets.QFileDialog.getOpenFileName(None, "Import File", "", "Assembly Files (*.s);;Text Files (*.txt)")
+        file_path, _ = QtWidgets.QFileDialog.getOpenFileName(None, "Import File", "", "Assembly Files (*.s);;Text Files (*.txt);;Checkpoint Files (*.ckpt)")
+        if file_path.endswith(".ckpt"):
+            self.import_checkpoint(file_path)
+            return
         if file_path:
             try:
                 with open(file_path, 'r') as file:
@@ -1349,6 +1038,41 @@ class Ui_MainWindow(object):
                 QtWidgets.QMessageBox.critical(None, "Error", f"Open file {file_name}\n{e} failed, please try again")
                 self.Quit()
 
+    def export_checkpoint(self, file_path):
+        if self.stackedCodeWidget.currentIndex() == 0:
+            QtWidgets.QMessageBox.critical(None, "Error", "Please compile code")
+            return
+        self.stop_running()
+        try:
+            save_checkpoint(file_path, self.engine, self.image, self.CodeEditText.toPlainText())
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(None, "Error", f"File {file_path}\n{e} save failed, please try again")
+            return
+        file_name = file_path.split('/')[-1]
+        QtWidgets.QMessageBox.information(None, "Success", f"Checkpoint {file_name} saved successfully")
+
+    # runs the program image saved in the checkpoint from its saved registers, stack and memory
+    # the saved source is only put in the editor, it is not assembled again
+    def import_checkpoint(self, file_path):
+        try:
+            with open(file_path, "rb") as file:
+                state, pages = decode_checkpoint(file.read())
+            image = checkpoint_image(state)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(None, "Error", f"Open file {file_path}\n{e}")
+            return
+        self.Quit()
+        self.CodeEditText.setPlainText(state["source"])
+        self.image = image
+        self.engine.set_program(image.program)
+        self.show_image()
+        registers_before = list(cpu_state.registers)
+        restore_checkpoint(self.engine, self.image, state, pages)
+        self.registers_shown = list(cpu_state.registers)
+        self.show_execution_state(registers_before, self.engine.snapshot())
+        self.update_heat()
+        self.refresh_memory_view()
+
     def close_event(self, event):
         super().close_event(event)
         self.worker.stop_run_code()
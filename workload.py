@@ -0,0 +1,74 @@
+# workload generator, writes the sort and search demos with an N element array in place of the six in Demo/
+# usage: python -m workload bubble_sort 1000 [--order random|sorted|reverse] [--seed 0] [--output big.s]
+# the arrays come from a seeded random generator, so the same arguments always give the same program
+import argparse
+import os
+import random
+import re
+import sys
+
+DEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Demo")
+ORDERS = ["random", "sorted", "reverse"]
+MAX_SIZE = 100000
+# random values are drawn from this range, negatives included like the -7 of the demos
+VALUE_RANGE = (-50000, 50000)
+
+# workload name -> demo file whose array is replaced
+workload_dict = {
+    "bubble_sort": "bubble_sort.s",
+    "selection_sort": "selection_sort.s",
+    "find_max_thumb": "find_max_thumb.s",
+}
+
+# the first .word line of the .data section holds the array, "length: .word n" its size
+regex_array = re.compile(r"^(\s*\w+:\s*\.word\s+)(.*)$", re.MULTILINE)
+regex_length = re.compile(r"^(\s*length:\s*\.word\s+)(.*)$", re.MULTILINE)
+
+def make_array(size, order="random", seed=0):
+    generator = random.Random(seed)
+    values = [generator.randint(*VALUE_RANGE) for _ in range(size)]
+    if order == "sorted":
+        values.sort()
+    elif order == "reverse":
+        values.sort(reverse=True)
+    return values
+# print(make_array(4, "sorted", 1))  # output: [-41729, -32389, -16568, 24606]
+
+# source text of a workload with an array of size values, raises ValueError for a bad name, size or order
+def generate(name, size, order="random", seed=0, demo_dir=DEMO_DIR):
+    if name not in workload_dict:
+        raise ValueError("unknown workload %s, expected one of %s" % (name, ", ".join(workload_dict)))
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError("array size must be between 1 and %d" % MAX_SIZE)
+    if order not in ORDERS:
+        raise ValueError("order must be one of " + ", ".join(ORDERS))
+    with open(os.path.join(demo_dir, workload_dict[name])) as file:
+        text = file.read()
+    head, separator, data = text.partition(".data")
+    values = ", ".join(str(value) for value in make_array(size, order, seed))
+    data = regex_array.sub(lambda match: match.group(1) + values, data, count=1)
+    data = regex_length.sub(lambda match: match.group(1) + str(size), data, count=1)
+    return head + separator + data
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m workload", description="Write a demo program with an N element array")
+    parser.add_argument("name", choices=list(workload_dict), help="demo to scale")
+    parser.add_argument("size", type=int, help="number of array elements, up to %d" % MAX_SIZE)
+    parser.add_argument("--order", choices=ORDERS, default="random", help="order of the array values")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random values")
+    parser.add_argument("--output", help="write the program to this file instead of stdout")
+    args = parser.parse_args(argv)
+    try:
+        text = generate(args.name, args.size, args.order, args.seed)
+        if args.output:
+            with open(args.output, "w") as file:
+                file.write(text)
+        else:
+            sys.stdout.write(text)
+    except (OSError, ValueError) as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())